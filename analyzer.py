@@ -1,53 +1,545 @@
-from typing import List, Dict
-from data_sources import YahooFinanceSource, AlphaVantageSource, FinnhubSource
+import asyncio
+import contextvars
+import math
+import time
+from typing import List, Dict, Union
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from data_sources import (YahooFinanceSource, AlphaVantageSource, FinnhubSource,
+                          AsyncYahooFinanceSource, AsyncAlphaVantageSource, AsyncFinnhubSource)
+from history_sources import YahooFinanceHistorySource, AlphaVantageHistorySource, FinnhubHistorySource
+from history_store import BarStore, bar_store, aligned_range, interval_seconds, settled_until
+from indicators import INDICATORS, IndicatorEngine, last_close, trading_session
+from streaming import TickStore, tick_store
+from demand import DemandTracker, symbol_demand
+from rate_limit import INTERACTIVE, current_priority
+from bar_aggregator import BarAggregator, bar_aggregator
+from config import Config
+from models import ProviderError, QuoteBatch, QuoteResult, to_epoch
 import pandas as pd
 
-class StockAnalyzer:
+class BaseStockAnalyzer:
+    """Source selection and comparison shared by the sync and async analyzers"""
+    
+    # Priority: Yahoo (free, reliable) > Finnhub > Alpha Vantage
+    PRIORITY = ['yahoo', 'finnhub', 'alphavantage']
+    
+    def pick_best(self, results: Dict[str, QuoteResult]) -> QuoteResult:
+        """Pick the highest-priority successful quote from per-source results"""
+        for source in self.PRIORITY:
+            if source in results and 'error' not in results[source]:
+                return results[source]
+        
+        return ProviderError('No data available from any source')
+    
+    def _comparison_frame(self, results: Dict) -> pd.DataFrame:
+        data = []
+        for source, quote in results.items():
+            if 'error' not in quote:
+                data.append({
+                    'Source': source,
+                    'Price': quote.get('price'),
+                    'Change': quote.get('change'),
+                    'Change %': quote.get('change_percent'),
+                    'Volume': quote.get('volume')
+                })
+        
+        return pd.DataFrame(data)
+    
+    def _quotes_frame(self, results: Dict[str, Dict[str, QuoteResult]]) -> pd.DataFrame:
+        batch = QuoteBatch.from_quotes(
+            quote for by_source in results.values() for quote in by_source.values()
+        )
+        return batch.to_frame()
+    
+    def _record_demand(self, symbols: List[str]):
+        """Count user-facing lookups; background refreshes run at a lower priority and are not demand"""
+        if current_priority() == INTERACTIVE:
+            self.demand.record(symbols)
+    
+    def _timeout_error(self, source_name: str, timeout: float) -> ProviderError:
+        return ProviderError(f'Timed out after {timeout}s', self.sources[source_name].name)
+    
+    def _missing_error(self, source_name: str) -> ProviderError:
+        return ProviderError('No data available', self.sources[source_name].name)
+    
+    def _history(self, symbol: str, interval: str, start, end, sources: List[str] = None,
+                 refresh: bool = False) -> Union[pd.DataFrame, ProviderError]:
+        """Fill the bar store's gaps for the range from the first sources that can, then read it"""
+        start, end = aligned_range(interval, to_epoch(start), to_epoch(end))
+        settled = min(end, settled_until(interval))
+        if refresh:
+            self.bars.forget(symbol, interval, start, end)
+        
+        errors = []
+        for source_name in self.PRIORITY:
+            if sources is not None and source_name not in sources:
+                continue
+            source = self.history_sources[source_name]
+            errors += [result for result in source.fill(symbol, interval, start, end, self.bars)
+                       if isinstance(result, ProviderError)]
+            if not self.bars.missing(symbol, interval, start, settled):
+                break
+        
+        bars = self.bars.read(symbol, interval, start, end)
+        if bars.empty and errors:
+            return ProviderError('No data available from any source')
+        return bars
+    
+    def _live_trades(self, symbol: str, limit: int) -> Union[Dict, ProviderError]:
+        latest = self.ticks.latest(symbol)
+        if latest is None:
+            return ProviderError('No streamed trades for this symbol yet', 'Finnhub')
+        timestamp, price, volume = latest
+        trades = self.ticks.ticks(symbol, limit=limit)
+        return {
+            'symbol': symbol,
+            'price': price,
+            'volume': volume,
+            'timestamp': timestamp,
+            'trades': [
+                {'timestamp': t, 'price': p, 'volume': v}
+                for t, p, v in zip(trades.index.as_unit('ms').asi8 / 1000, trades['price'].tolist(),
+                                   trades['volume'].tolist())
+            ]
+        }
+    
+    def _indicator_engine(self, interval: str) -> IndicatorEngine:
+        interval_seconds(interval)
+        engine = self.indicators.get(interval)
+        if engine is None:
+            created = IndicatorEngine(interval)
+            engine = self.indicators.setdefault(interval, created)
+            if engine is created and interval in self.aggregator.intervals:
+                # Bars built from streamed trades keep the indicators current in O(1) each
+                self.aggregator.add_listener(
+                    lambda symbol, bar_interval, start, open_, high, low, close, volume:
+                    engine.update(symbol, start, high, low, close, volume) if bar_interval == interval else None
+                )
+        return engine
+    
+    @staticmethod
+    def _stale_indicators(engine: IndicatorEngine, symbols: List[str], refresh: bool = False,
+                          now: pd.Timestamp = None) -> List[str]:
+        """Symbols whose indicator state is missing or a settled bar behind
+        
+        Bars settle on the NYSE calendar, so outside regular sessions (nights,
+        weekends, holidays) state that ends with the last session is current.
+        """
+        step = interval_seconds(engine.interval)
+        close = last_close(now)
+        if engine.interval == '1d':
+            # Daily bars start at UTC midnight of their session's date; the session in progress comes from quotes
+            current = int(pd.Timestamp(close.date(), tz='UTC').timestamp())
+        elif trading_session(now) is not None:
+            current = settled_until(engine.interval) - step
+        else:
+            current = int(close.timestamp()) - step
+        stale = []
+        for symbol in symbols:
+            timestamp = engine.timestamp(symbol)
+            if refresh or timestamp is None or timestamp < current:
+                stale.append(symbol)
+        return stale
+    
+    def _indicators(self, engine: IndicatorEngine, symbols: List[str], histories: Dict,
+                    quotes: Dict[str, Dict[str, QuoteResult]]) -> Dict[str, Union[Dict, ProviderError]]:
+        """Seed state from fresh histories, fold in live quotes, and read every symbol's latest values"""
+        errors = {symbol: bars for symbol, bars in histories.items() if isinstance(bars, ProviderError)}
+        engine.seed({symbol: bars for symbol, bars in histories.items() if symbol not in errors})
+        for symbol, by_source in quotes.items():
+            quote = self.pick_best(by_source)
+            if 'error' not in quote:
+                engine.update_quote(quote)
+        
+        rows = engine.snapshot(symbols).to_dict('index')
+        results = {}
+        for symbol in symbols:
+            row = rows.get(symbol)
+            if row is None:
+                results[symbol] = errors.get(symbol) or ProviderError('No data available from any source')
+                continue
+            results[symbol] = {
+                'symbol': symbol,
+                'interval': engine.interval,
+                'timestamp': engine.timestamp(symbol),
+                # NaN (not enough bars yet) is reported as null
+                **{name: None if math.isnan(row[name]) else float(row[name]) for name in ('close', *INDICATORS)}
+            }
+        return results
+
+class StockAnalyzer(BaseStockAnalyzer):
     """Main analyzer that aggregates data from multiple sources"""
     
-    def __init__(self):
+    def __init__(self, bars: BarStore = None, ticks: TickStore = None, aggregator: BarAggregator = None,
+                 demand: DemandTracker = None):
         self.sources = {
             'yahoo': YahooFinanceSource(),
             'alphavantage': AlphaVantageSource(),
             'finnhub': FinnhubSource()
         }
+        self.history_sources = {
+            'yahoo': YahooFinanceHistorySource(),
+            'alphavantage': AlphaVantageHistorySource(),
+            'finnhub': FinnhubHistorySource()
+        }
+        self.bars = bars or bar_store
+        self.indicators = {}  # interval -> IndicatorEngine
+        self.ticks = ticks or tick_store
+        self.aggregator = aggregator or bar_aggregator
+        self.demand = demand or symbol_demand
+        self.executor = ThreadPoolExecutor(max_workers=Config.MAX_WORKERS, thread_name_prefix='quote')
+    
+    def _submit(self, fn, *args, **kwargs):
+        """Submit to the pool in a copy of the caller's context so its rate-limit priority applies"""
+        return self.executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
     
-    def get_quote(self, symbol: str, sources: List[str] = None) -> Dict:
-        """Get quote from specified sources or all sources"""
+    def get_quote(self, symbol: str, sources: List[str] = None, timeout: float = None,
+                  use_cache: bool = True, refresh: bool = False) -> Dict:
+        """Get quote from specified sources or all sources, queried in parallel
+        
+        Sources that have not answered within `timeout` seconds (default
+        Config.QUOTE_TIMEOUT) are reported as a timeout error entry. Cached
+        quotes are served unless `use_cache` is False or `refresh` is True.
+        """
+        self._record_demand([symbol])
         if sources is None:
             sources = list(self.sources.keys())
+        if timeout is None:
+            timeout = Config.QUOTE_TIMEOUT
+        
+        futures = {}
+        for source_name in sources:
+            if source_name in self.sources:
+                futures[source_name] = self._submit(
+                    self.sources[source_name].get_quote, symbol, use_cache=use_cache, refresh=refresh
+                )
+        
+        wait(futures.values(), timeout=timeout)
         
         results = {}
+        for source_name, future in futures.items():
+            if future.done():
+                results[source_name] = future.result()
+            else:
+                future.cancel()
+                results[source_name] = self._timeout_error(source_name, timeout)
+        
+        return results
+    
+    def get_quotes(self, symbols: List[str], sources: List[str] = None, timeout: float = None,
+                   use_cache: bool = True, refresh: bool = False) -> Dict[str, Dict[str, QuoteResult]]:
+        """Get quotes for many symbols, keyed by symbol and then by source
+        
+        Each source receives the whole symbol list so it can use bulk upstream
+        requests; sources are queried in parallel under `timeout` seconds
+        (default Config.BATCH_TIMEOUT).
+        """
+        self._record_demand(symbols)
+        if sources is None:
+            sources = list(self.sources.keys())
+        if timeout is None:
+            timeout = Config.BATCH_TIMEOUT
+        symbols = list(dict.fromkeys(symbols))
+        
+        futures = {}
         for source_name in sources:
             if source_name in self.sources:
-                results[source_name] = self.sources[source_name].get_quote(symbol)
+                futures[source_name] = self._submit(
+                    self.sources[source_name].get_quotes, symbols, use_cache=use_cache, refresh=refresh
+                )
+        
+        wait(futures.values(), timeout=timeout)
+        
+        results = {symbol: {} for symbol in symbols}
+        for source_name, future in futures.items():
+            if not future.done():
+                future.cancel()
+                for symbol in symbols:
+                    results[symbol][source_name] = self._timeout_error(source_name, timeout)
+                continue
+            quotes = future.result()
+            for symbol in symbols:
+                results[symbol][source_name] = quotes.get(symbol) or self._missing_error(source_name)
         
         return results
     
-    def compare_sources(self, symbol: str) -> pd.DataFrame:
+    def compare_sources(self, symbol: str, results: Dict = None) -> pd.DataFrame:
         """Compare data from all sources in a DataFrame"""
-        results = self.get_quote(symbol)
+        if results is None:
+            results = self.get_quote(symbol)
         
-        data = []
-        for source, quote in results.items():
-            if 'error' not in quote:
-                data.append({
-                    'Source': source,
-                    'Price': quote.get('price'),
-                    'Change': quote.get('change'),
-                    'Change %': quote.get('change_percent'),
-                    'Volume': quote.get('volume')
-                })
+        return self._comparison_frame(results)
+    
+    def get_quotes_frame(self, symbols: List[str], sources: List[str] = None, **kwargs) -> pd.DataFrame:
+        """Get quotes for many symbols as one columnar DataFrame, one row per (symbol, source)"""
+        return self._quotes_frame(self.get_quotes(symbols, sources, **kwargs))
+    
+    def get_history(self, symbol: str, interval: str = '1d', start=None, end=None, sources: List[str] = None,
+                    refresh: bool = False) -> Union[pd.DataFrame, ProviderError]:
+        """OHLCV bars for [start, end) from the local store, fetching only the ranges it lacks
         
-        return pd.DataFrame(data)
+        `start`/`end` take epoch seconds, datetimes or ISO dates; without
+        `start` the range goes back the configured lookback. Missing ranges
+        are fetched in priority order, falling back to the next source for
+        whatever a source could not fill. With `refresh` the range is fetched
+        again.
+        """
+        return self._history(symbol.upper(), interval, start, end, sources, refresh)
+    
+    def get_histories(self, symbols: List[str], interval: str = '1d', start=None, end=None,
+                      sources: List[str] = None) -> Dict[str, Union[pd.DataFrame, ProviderError]]:
+        """Bars for many symbols, filled in parallel, keyed by symbol"""
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        futures = {symbol: self._submit(self._history, symbol, interval, start, end, sources) for symbol in symbols}
+        return {symbol: future.result() for symbol, future in futures.items()}
+    
+    def get_live_trades(self, symbol: str, limit: int = 100) -> Union[Dict, ProviderError]:
+        """Latest streamed trade and up to `limit` recent ones from the in-memory tick buffer, without any request"""
+        return self._live_trades(symbol.upper(), limit)
+    
+    def get_live_bars(self, symbol: str, interval: str = '1m', limit: int = 100) -> pd.DataFrame:
+        """Up to `limit` recent bars built from streamed trades, including the one in progress, from memory"""
+        return self.aggregator.bars(symbol.upper(), interval, limit)
     
-    def get_best_quote(self, symbol: str) -> Dict:
-        """Get the most recent/reliable quote from available sources"""
-        results = self.get_quote(symbol)
+    def get_indicators(self, symbols: List[str], interval: str = '1d', sources: List[str] = None,
+                       live: bool = True, refresh: bool = False) -> Dict[str, Union[Dict, ProviderError]]:
+        """Latest SMA, EMA, RSI, MACD, Bollinger, ATR and VWAP values for many symbols, keyed by symbol
         
-        # Priority: Yahoo (free, reliable) > Finnhub > Alpha Vantage
-        for source in ['yahoo', 'finnhub', 'alphavantage']:
-            if source in results and 'error' not in results[source]:
-                return results[source]
+        Symbols without current indicator state are seeded in one vectorized
+        pass over their stored history; after that each call only folds in the
+        live quotes (daily interval), which costs O(1) per symbol.
+        """
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        engine = self._indicator_engine(interval)
+        stale = self._stale_indicators(engine, symbols, refresh)
+        histories = self.get_histories(stale, interval, sources=sources) if stale else {}
+        quotes = self.get_quotes(symbols) if live and interval == '1d' else {}
+        return self._indicators(engine, symbols, histories, quotes)
+    
+    def get_best_quote(self, symbol: str, hedged: bool = True, hedge_delay: float = None,
+                       use_cache: bool = True, refresh: bool = False) -> QuoteResult:
+        """Get the most recent/reliable quote from available sources
+        
+        In hedged mode only the top-priority source is queried at first; the
+        next fallback is launched once `hedge_delay` seconds (default
+        Config.HEDGE_DELAY) pass without an answer, or as soon as a source
+        fails. The first successful answer wins and the rest are discarded.
+        """
+        if not hedged:
+            return self.pick_best(self.get_quote(symbol, use_cache=use_cache, refresh=refresh))
+        
+        self._record_demand([symbol])
+        
+        if hedge_delay is None:
+            hedge_delay = Config.HEDGE_DELAY
+        deadline = time.monotonic() + Config.QUOTE_TIMEOUT
+        pending = [source for source in self.PRIORITY if source in self.sources]
+        running = {}
+        next_launch = time.monotonic()
+        
+        try:
+            while pending or running:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                
+                if pending and (not running or now >= next_launch):
+                    source = pending.pop(0)
+                    future = self._submit(
+                        self.sources[source].get_quote, symbol, use_cache=use_cache, refresh=refresh
+                    )
+                    running[future] = source
+                    next_launch = now + hedge_delay
+                    continue
+                
+                wait_for = deadline - now
+                if pending:
+                    wait_for = min(wait_for, next_launch - now)
+                done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+                
+                # Prefer the higher-priority source when several finish together
+                for future in sorted(done, key=lambda f: self.PRIORITY.index(running[f])):
+                    del running[future]
+                    quote = future.result()
+                    if 'error' not in quote:
+                        return quote
+                    next_launch = time.monotonic()
+        finally:
+            for future in running:
+                future.cancel()
+        
+        return ProviderError('No data available from any source')
+
+class AsyncStockAnalyzer(BaseStockAnalyzer):
+    """Asyncio analyzer that aggregates data from multiple sources on one event loop"""
+    
+    def __init__(self, bars: BarStore = None, ticks: TickStore = None, aggregator: BarAggregator = None,
+                 demand: DemandTracker = None):
+        self.sources = {
+            'yahoo': AsyncYahooFinanceSource(),
+            'alphavantage': AsyncAlphaVantageSource(),
+            'finnhub': AsyncFinnhubSource()
+        }
+        self.history_sources = {
+            'yahoo': YahooFinanceHistorySource(),
+            'alphavantage': AlphaVantageHistorySource(),
+            'finnhub': FinnhubHistorySource()
+        }
+        self.bars = bars or bar_store
+        self.indicators = {}  # interval -> IndicatorEngine
+        self.ticks = ticks or tick_store
+        self.aggregator = aggregator or bar_aggregator
+        self.demand = demand or symbol_demand
+    
+    async def get_quote(self, symbol: str, sources: List[str] = None, timeout: float = None,
+                        use_cache: bool = True, refresh: bool = False) -> Dict:
+        """Get quote from specified sources or all sources, queried concurrently"""
+        self._record_demand([symbol])
+        if sources is None:
+            sources = list(self.sources.keys())
+        if timeout is None:
+            timeout = Config.QUOTE_TIMEOUT
+        
+        tasks = {}
+        for source_name in sources:
+            if source_name in self.sources:
+                tasks[source_name] = asyncio.ensure_future(
+                    self.sources[source_name].get_quote(symbol, use_cache=use_cache, refresh=refresh)
+                )
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=timeout)
+        
+        results = {}
+        for source_name, task in tasks.items():
+            if task.done():
+                results[source_name] = task.result()
+            else:
+                task.cancel()
+                results[source_name] = self._timeout_error(source_name, timeout)
+        
+        return results
+    
+    async def get_quotes(self, symbols: List[str], sources: List[str] = None, timeout: float = None,
+                         use_cache: bool = True, refresh: bool = False) -> Dict[str, Dict[str, QuoteResult]]:
+        """Get quotes for many symbols, keyed by symbol and then by source"""
+        self._record_demand(symbols)
+        if sources is None:
+            sources = list(self.sources.keys())
+        if timeout is None:
+            timeout = Config.BATCH_TIMEOUT
+        symbols = list(dict.fromkeys(symbols))
+        
+        tasks = {}
+        for source_name in sources:
+            if source_name in self.sources:
+                tasks[source_name] = asyncio.ensure_future(
+                    self.sources[source_name].get_quotes(symbols, use_cache=use_cache, refresh=refresh)
+                )
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=timeout)
+        
+        results = {symbol: {} for symbol in symbols}
+        for source_name, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                for symbol in symbols:
+                    results[symbol][source_name] = self._timeout_error(source_name, timeout)
+                continue
+            quotes = task.result()
+            for symbol in symbols:
+                results[symbol][source_name] = quotes.get(symbol) or self._missing_error(source_name)
+        
+        return results
+    
+    async def compare_sources(self, symbol: str, results: Dict = None) -> pd.DataFrame:
+        """Compare data from all sources in a DataFrame"""
+        if results is None:
+            results = await self.get_quote(symbol)
+        
+        return self._comparison_frame(results)
+    
+    async def get_quotes_frame(self, symbols: List[str], sources: List[str] = None, **kwargs) -> pd.DataFrame:
+        """Get quotes for many symbols as one columnar DataFrame, one row per (symbol, source)"""
+        return self._quotes_frame(await self.get_quotes(symbols, sources, **kwargs))
+    
+    async def get_history(self, symbol: str, interval: str = '1d', start=None, end=None,
+                          sources: List[str] = None, refresh: bool = False) -> Union[pd.DataFrame, ProviderError]:
+        """OHLCV bars like StockAnalyzer.get_history; gap fills and file reads run in a worker thread"""
+        return await asyncio.to_thread(self._history, symbol.upper(), interval, start, end, sources, refresh)
+    
+    async def get_histories(self, symbols: List[str], interval: str = '1d', start=None, end=None,
+                            sources: List[str] = None) -> Dict[str, Union[pd.DataFrame, ProviderError]]:
+        """Bars for many symbols, filled concurrently, keyed by symbol"""
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        results = await asyncio.gather(*(self.get_history(symbol, interval, start, end, sources) for symbol in symbols))
+        return dict(zip(symbols, results))
+    
+    async def get_live_trades(self, symbol: str, limit: int = 100) -> Union[Dict, ProviderError]:
+        """Latest streamed trades like StockAnalyzer.get_live_trades; a memory read, so no thread hop"""
+        return self._live_trades(symbol.upper(), limit)
+    
+    async def get_live_bars(self, symbol: str, interval: str = '1m', limit: int = 100) -> pd.DataFrame:
+        """Recent streamed bars like StockAnalyzer.get_live_bars"""
+        return self.aggregator.bars(symbol.upper(), interval, limit)
+    
+    async def get_indicators(self, symbols: List[str], interval: str = '1d', sources: List[str] = None,
+                             live: bool = True, refresh: bool = False) -> Dict[str, Union[Dict, ProviderError]]:
+        """Latest indicator values for many symbols like StockAnalyzer.get_indicators"""
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        engine = self._indicator_engine(interval)
+        stale = self._stale_indicators(engine, symbols, refresh)
+        histories, quotes = await asyncio.gather(
+            self.get_histories(stale, interval, sources=sources) if stale else asyncio.sleep(0, {}),
+            self.get_quotes(symbols) if live and interval == '1d' else asyncio.sleep(0, {})
+        )
+        # Seeding is CPU-bound NumPy work; keep it off the event loop
+        return await asyncio.to_thread(self._indicators, engine, symbols, histories, quotes)
+    
+    async def get_best_quote(self, symbol: str, hedged: bool = True, hedge_delay: float = None,
+                             use_cache: bool = True, refresh: bool = False) -> QuoteResult:
+        """Get the most recent/reliable quote from available sources, hedged like StockAnalyzer"""
+        if not hedged:
+            return self.pick_best(await self.get_quote(symbol, use_cache=use_cache, refresh=refresh))
+        
+        self._record_demand([symbol])
+        
+        if hedge_delay is None:
+            hedge_delay = Config.HEDGE_DELAY
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + Config.QUOTE_TIMEOUT
+        pending = [source for source in self.PRIORITY if source in self.sources]
+        running = {}
+        next_launch = loop.time()
+        
+        try:
+            while pending or running:
+                now = loop.time()
+                if now >= deadline:
+                    break
+                
+                if pending and (not running or now >= next_launch):
+                    source = pending.pop(0)
+                    task = asyncio.ensure_future(
+                        self.sources[source].get_quote(symbol, use_cache=use_cache, refresh=refresh)
+                    )
+                    running[task] = source
+                    next_launch = now + hedge_delay
+                    continue
+                
+                wait_for = deadline - now
+                if pending:
+                    wait_for = min(wait_for, next_launch - now)
+                done, _ = await asyncio.wait(running, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+                
+                # Prefer the higher-priority source when several finish together
+                for task in sorted(done, key=lambda t: self.PRIORITY.index(running[t])):
+                    del running[task]
+                    quote = task.result()
+                    if 'error' not in quote:
+                        return quote
+                    next_launch = loop.time()
+        finally:
+            for task in running:
+                task.cancel()
         
-        return {'error': 'No data available from any source'}
+        return ProviderError('No data available from any source')
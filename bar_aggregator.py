@@ -0,0 +1,276 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import Config
+from history_store import BAR_COLUMNS, BarStore, bar_store, empty_bars, interval_seconds
+from models import Quote
+from streaming import TickStore
+
+# Callback for every bar a batch touched: (symbol, interval, start, open, high, low, close, volume)
+BarListener = Callable[[str, str, int, float, float, float, float, float], None]
+
+class BarSeries:
+    """OHLCV bars of one resolution for one symbol, in preallocated arrays sorted by start
+    
+    `watermark` is the newest tick time seen. A bar is final once the
+    watermark passes its end by `lateness` seconds: until then late ticks
+    still amend it (open and close follow tick time, not arrival order), and
+    afterwards they are dropped and counted in `late`. Final bars before
+    `flushed` have been written to the history store. When the arrays fill
+    up, the oldest half is discarded.
+    """
+    
+    __slots__ = ('step', 'lateness', 'size', 'starts', 'opens', 'highs', 'lows', 'closes', 'volumes',
+                 'first_times', 'last_times', 'count', 'flushed', 'watermark', 'late', 'evicted')
+    
+    def __init__(self, step: int, lateness: float, size: int):
+        self.step = step
+        self.lateness = lateness
+        self.size = size
+        self.starts = np.zeros(size, dtype=np.int64)
+        self.opens = np.zeros(size)
+        self.highs = np.zeros(size)
+        self.lows = np.zeros(size)
+        self.closes = np.zeros(size)
+        self.volumes = np.zeros(size)
+        self.first_times = np.zeros(size)  # time of the tick that set the open
+        self.last_times = np.zeros(size)   # time of the tick that set the close
+        self.count = 0
+        self.flushed = 0
+        self.watermark = 0.0
+        self.late = 0
+        self.evicted = 0  # bars discarded before they were flushed
+    
+    def _arrays(self):
+        return (self.starts, self.opens, self.highs, self.lows, self.closes, self.volumes,
+                self.first_times, self.last_times)
+    
+    def final_until(self) -> int:
+        """Bars starting before this are final"""
+        return int(np.floor(self.watermark - self.lateness)) - self.step + 1
+    
+    def merge(self, start: int, open_: float, high: float, low: float, close: float, volume: float,
+              first_time: float, last_time: float) -> Optional[int]:
+        """Fold aggregated ticks for one bar in; returns the bar's index, or None if they came too late"""
+        if start < self.final_until():
+            self.late += 1
+            return None
+        
+        # Late ticks only reach the last few bars, so scan back from the end
+        i = self.count - 1
+        while i >= 0 and self.starts[i] > start:
+            i -= 1
+        if i >= 0 and self.starts[i] == start:
+            if first_time < self.first_times[i]:
+                self.opens[i], self.first_times[i] = open_, first_time
+            if last_time >= self.last_times[i]:
+                self.closes[i], self.last_times[i] = close, last_time
+            self.highs[i] = max(self.highs[i], high)
+            self.lows[i] = min(self.lows[i], low)
+            self.volumes[i] += volume
+        else:
+            if self.count == self.size:
+                i = max(i - self._evict(), -1)
+            i += 1
+            for array in self._arrays():
+                array[i + 1:self.count + 1] = array[i:self.count].copy()
+            for array, value in zip(self._arrays(), (start, open_, high, low, close, volume, first_time, last_time)):
+                array[i] = value
+            self.count += 1
+        self.watermark = max(self.watermark, last_time)
+        return i
+    
+    def _evict(self) -> int:
+        drop = self.count // 2
+        self.evicted += max(drop - self.flushed, 0)
+        for array in self._arrays():
+            array[:self.count - drop] = array[drop:self.count].copy()
+        self.count -= drop
+        self.flushed = max(self.flushed - drop, 0)
+        return drop
+    
+    def bar(self, i: int) -> Tuple[int, float, float, float, float, float]:
+        return (int(self.starts[i]), float(self.opens[i]), float(self.highs[i]), float(self.lows[i]),
+                float(self.closes[i]), float(self.volumes[i]))
+    
+    def frame(self, first: int = 0, last: int = None) -> pd.DataFrame:
+        """Bars [first, last) as a bar frame (copies)"""
+        last = self.count if last is None else last
+        if last <= first:
+            return empty_bars()
+        return pd.DataFrame(
+            {column: array[first:last].copy() for column, array in zip(BAR_COLUMNS, self._arrays()[1:6])},
+            index=pd.DatetimeIndex(pd.to_datetime(self.starts[first:last], unit='s', utc=True), name='timestamp')
+        )
+    
+    def unflushed(self) -> Tuple[int, int]:
+        """[first, last) index range of final bars not yet flushed"""
+        last = int(np.searchsorted(self.starts[:self.count], self.final_until()))
+        return self.flushed, max(last, self.flushed)
+
+class BarAggregator:
+    """Builds OHLCV bars at several resolutions at once from ticks or quotes
+    
+    Attach it to a TickStore and every stored batch of trades is sorted into
+    each resolution's current bars with a few vectorized reductions. Bars are
+    readable from memory at any time; flush() (run periodically by start())
+    adds the bars that became final to the local history store wherever it
+    holds no fetched history, so charts and indicators can read pre-built bars.
+    """
+    
+    def __init__(self, intervals: Iterable[str] = None, store: BarStore = None, lateness: float = None,
+                 size: int = None):
+        self.intervals = tuple(Config.BAR_INTERVALS if intervals is None else intervals)
+        self.steps = {interval: interval_seconds(interval) for interval in self.intervals}
+        self.store = store or bar_store
+        self.lateness = Config.BAR_LATENESS if lateness is None else lateness
+        self.size = size or Config.BAR_BUFFER_SIZE
+        self._series = {}  # (symbol, interval) -> BarSeries
+        self._volumes = {}  # symbol -> last cumulative quote volume
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+    
+    def add_listener(self, listener: BarListener):
+        with self._lock:
+            self._listeners.append(listener)
+    
+    def attach(self, ticks: TickStore):
+        """Aggregate every batch of trades stored in `ticks` from now on"""
+        ticks.add_listener(self.add_ticks)
+    
+    def detach(self, ticks: TickStore):
+        ticks.remove_listener(self.add_ticks)
+    
+    def add_ticks(self, symbol: str, timestamps: np.ndarray, prices: np.ndarray, volumes: np.ndarray):
+        """Fold a batch of trades for one symbol into every resolution"""
+        timestamps = np.asarray(timestamps, dtype=float)
+        prices = np.asarray(prices, dtype=float)
+        volumes = np.asarray(volumes, dtype=float)
+        if len(timestamps) == 0:
+            return
+        
+        touched = []
+        with self._lock:
+            for interval, step in self.steps.items():
+                series = self._series.get((symbol, interval))
+                if series is None:
+                    series = self._series[(symbol, interval)] = BarSeries(step, self.lateness, self.size)
+                
+                for start, bar in self._group(timestamps, prices, volumes, step):
+                    i = series.merge(start, *bar)
+                    if i is not None:
+                        touched.append((interval, series.bar(i)))
+            listeners = list(self._listeners)
+        
+        for interval, bar in touched:
+            for listener in listeners:
+                listener(symbol, interval, *bar)
+    
+    @staticmethod
+    def _group(timestamps: np.ndarray, prices: np.ndarray, volumes: np.ndarray, step: int):
+        """(start, (open, high, low, close, volume, first time, last time)) for each bar the ticks fall in"""
+        if len(timestamps) == 1:
+            # Single trades are the common case; skip the sort and reductions
+            time, price = float(timestamps[0]), float(prices[0])
+            return [(int(time // step) * step, (price, price, price, price, float(volumes[0]), time, time))]
+        
+        # Group ticks by bar, in time order within each bar
+        buckets = (timestamps // step).astype(np.int64) * step
+        order = np.lexsort((timestamps, buckets))
+        buckets, times, prices, volumes = buckets[order], timestamps[order], prices[order], volumes[order]
+        firsts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        lasts = np.r_[firsts[1:], len(buckets)] - 1
+        highs = np.maximum.reduceat(prices, firsts)
+        lows = np.minimum.reduceat(prices, firsts)
+        sums = np.add.reduceat(volumes, firsts)
+        return [
+            (int(buckets[first]), (prices[first], highs[k], lows[k], prices[last], sums[k], times[first], times[last]))
+            for k, (first, last) in enumerate(zip(firsts, lasts))
+        ]
+    
+    def add_quote(self, quote: Quote, timestamp: float):
+        """Fold a polled quote in as a trade at `timestamp`
+        
+        Quote volume is cumulative for the day, so the change since the
+        symbol's previous quote is used as the trade's volume.
+        """
+        if quote.price is None:
+            return
+        volume = 0.0
+        if quote.volume is not None:
+            with self._lock:
+                previous = self._volumes.get(quote.symbol)
+                self._volumes[quote.symbol] = quote.volume
+            if previous is not None and quote.volume > previous:
+                volume = float(quote.volume - previous)
+        self.add_ticks(quote.symbol, np.array([timestamp]), np.array([quote.price]), np.array([volume]))
+    
+    def bars(self, symbol: str, interval: str, limit: int = None) -> pd.DataFrame:
+        """The symbol's most recent bars from memory, including ones still in progress"""
+        with self._lock:
+            series = self._series.get((symbol, interval))
+            if series is None:
+                return empty_bars()
+            return series.frame(0 if limit is None else max(series.count - limit, 0))
+    
+    def flush(self) -> int:
+        """Add bars that became final to the history store. Returns bars added"""
+        with self._flush_lock:
+            pending = []
+            with self._lock:
+                for (symbol, interval), series in self._series.items():
+                    first, last = series.unflushed()
+                    if last > first:
+                        pending.append((symbol, interval, series.frame(first, last)))
+                        series.flushed = last
+            # Streamed bars only fill in where providers have not been asked yet
+            # and are not recorded as coverage: fetched history is never
+            # overwritten, and gaps in the feed are still filled from providers
+            return sum(self.store.supplement(symbol, interval, frame) for symbol, interval, frame in pending)
+    
+    def start(self, every: float = None) -> threading.Thread:
+        """Flush every `every` seconds (default Config.BAR_FLUSH_INTERVAL) in a daemon thread"""
+        every = Config.BAR_FLUSH_INTERVAL if every is None else every
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._flush_loop, args=(every,), name='bar-flush', daemon=True)
+            self._thread.start()
+        return self._thread
+    
+    def _flush_loop(self, every: float):
+        while not self._stopping.wait(every):
+            self.flush()
+    
+    def stop(self, timeout: float = 5.0):
+        """Stop the flush thread and write out the final bars
+        
+        Bars still in progress are dropped rather than stored truncated: the
+        store would keep them over the complete bars fetched later.
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+    
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return sorted(set(symbol for symbol, _ in self._series))
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            series = list(self._series.values())
+            return {
+                'intervals': list(self.intervals),
+                'symbols': len(set(symbol for symbol, _ in self._series)),
+                'bars_held': sum(s.count for s in series),
+                'bars_unflushed': sum(s.count - s.flushed for s in series),
+                'late_ticks_dropped': sum(s.late for s in series),
+                'bars_evicted_unflushed': sum(s.evicted for s in series)
+            }
+
+# Shared by every stream, analyzer and dashboard in the process
+bar_aggregator = BarAggregator()
@@ -0,0 +1,305 @@
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+from config import Config
+from models import NewsItem, ProviderError, Quote, Record
+from singleflight import single_flight
+
+# Records the shared cache can rebuild from their JSON form
+RECORD_TYPES = {record.__name__: record for record in (Quote, NewsItem, ProviderError)}
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, Record):
+        return {'__record__': type(value).__name__, **value.to_dict()}
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'{type(value).__name__} cannot be stored in the shared cache')
+
+def _decode(fields: Dict) -> Any:
+    if '__record__' in fields:
+        return RECORD_TYPES[fields.pop('__record__')](**fields)
+    return fields
+
+class SharedCache:
+    """Cache entries in a SQLite file that every process on the machine can read and write
+    
+    Lets a standalone refresher (refresher.py) warm the cache of a dashboard or
+    MCP server running in another process. Keys are stored by repr() and values
+    as JSON that records are rebuilt from, so reading an entry never runs code
+    from the file; entries expire by wall-clock time. The file is opened on first use, and errors (a locked or
+    unwritable file, an entry that does not decode) read as misses instead of
+    failing the lookup.
+    """
+    
+    PRUNE_EVERY = 256  # writes between sweeps of expired entries
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._writes = 0
+        self._lock = threading.Lock()
+    
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=1.0, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, expires REAL NOT NULL, value BLOB)')
+            self._conn = conn
+        return self._conn
+    
+    def get(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        """(seconds left, value) for an entry that has not expired, else None"""
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    'SELECT expires, value FROM entries WHERE key = ?', (repr(key),)
+                ).fetchone()
+            if row is None or row[0] <= time.time():
+                return None
+            return row[0] - time.time(), json.loads(row[1], object_hook=_decode)
+        except (sqlite3.Error, OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def set(self, key: Hashable, value: Any, ttl: float):
+        now = time.time()
+        try:
+            encoded = json.dumps(value, default=_encode)
+            with self._lock:
+                conn = self._connection()
+                with conn:
+                    conn.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?)', (repr(key), now + ttl, encoded))
+                    self._writes += 1
+                    if self._writes % self.PRUNE_EVERY == 0:
+                        conn.execute('DELETE FROM entries WHERE expires <= ?', (now,))
+        except (sqlite3.Error, OSError, ValueError, TypeError):
+            pass
+    
+    def invalidate(self, key: Hashable):
+        try:
+            with self._lock:
+                conn = self._connection()
+                with conn:
+                    conn.execute('DELETE FROM entries WHERE key = ?', (repr(key),))
+        except (sqlite3.Error, OSError):
+            pass
+
+class TTLCache:
+    """Thread-safe in-process cache with per-entry expiry and LRU eviction
+    
+    With a `shared` cache, entries are also written through to it, and local
+    misses are looked up there before counting as misses.
+    """
+    
+    def __init__(self, max_size: int = None, shared: SharedCache = None):
+        self.max_size = max_size or Config.CACHE_MAX_SIZE
+        self.shared = shared
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+        
+        shared = self.shared.get(key) if self.shared is not None else None
+        with self._lock:
+            if shared is None:
+                self.misses += 1
+                return None
+            ttl, value = shared
+            self._put(key, value, ttl)
+            self.hits += 1
+            self.shared_hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: float):
+        """Store a value for `ttl` seconds, evicting the least recently used entries"""
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._put(key, value, ttl)
+        if self.shared is not None:
+            self.shared.set(key, value, ttl)
+    
+    def _put(self, key: Hashable, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.shared is not None:
+            self.shared.invalidate(key)
+    
+    def clear(self):
+        """Drop this process's entries; the shared cache keeps its own until they expire"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0,
+                'shared': self.shared.path if self.shared is not None else None,
+                'shared_hits': self.shared_hits
+            }
+
+# Shared by every data and news source unless a source is given its own
+default_cache = TTLCache(shared=SharedCache(Config.SHARED_CACHE_PATH) if Config.SHARED_CACHE_PATH else None)
+
+def is_error(value: Any) -> bool:
+    """Whether a source result is an error and must not be cached"""
+    if isinstance(value, Mapping):
+        return 'error' in value
+    if isinstance(value, list):
+        return all(isinstance(item, Mapping) and 'error' in item for item in value)
+    return value is None
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+def cache_key(provider: str, symbol: str, kind: str, params: Dict = None) -> tuple:
+    """Key a cached result by (provider, symbol, kind) plus any non-default call parameters"""
+    return (provider, symbol, kind, _freeze(params or {}))
+
+def _call_params(signature: inspect.Signature, args: tuple, kwargs: Dict) -> Dict:
+    """Parameters of a (self, symbol, ...) call that differ from their defaults"""
+    bound = signature.bind(None, None, *args, **kwargs)
+    params = list(signature.parameters.values())[2:]
+    return {
+        p.name: bound.arguments[p.name]
+        for p in params
+        if p.name in bound.arguments and bound.arguments[p.name] != p.default
+    }
+
+def _store(source: Any, key: tuple, value: Any, ttls: Dict[str, float]):
+    if not is_error(value):
+        source.cache.set(key, value, ttls.get(source.name, Config.DEFAULT_CACHE_TTL))
+
+def cached(kind: str, ttls: Dict[str, float]) -> Callable:
+    """Cache a source's `method(self, symbol, ...)` results in `self.cache`
+    
+    Works for both plain and `async def` methods. Upstream calls go through
+    the shared single-flight group, so concurrent identical lookups share one
+    request. Callers may pass `use_cache=False` to bypass the cache or
+    `refresh=True` to force an upstream call whose result replaces the cached one.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(self, symbol: str, *args, use_cache: bool = True, refresh: bool = False, **kwargs):
+                key = cache_key(self.name, symbol, kind, _call_params(signature, args, kwargs))
+                use_cache = use_cache and self.cache is not None
+                
+                value = self.cache.get(key) if use_cache and not refresh else None
+                if value is None:
+                    async def fetch():
+                        result = await func(self, symbol, *args, **kwargs)
+                        if use_cache:
+                            _store(self, key, result, ttls)
+                        return result
+                    
+                    value = await single_flight.do_async(key, fetch)
+                return value
+            return async_wrapper
+        
+        @wraps(func)
+        def wrapper(self, symbol: str, *args, use_cache: bool = True, refresh: bool = False, **kwargs):
+            key = cache_key(self.name, symbol, kind, _call_params(signature, args, kwargs))
+            use_cache = use_cache and self.cache is not None
+            
+            value = self.cache.get(key) if use_cache and not refresh else None
+            if value is None:
+                def fetch():
+                    result = func(self, symbol, *args, **kwargs)
+                    if use_cache:
+                        _store(self, key, result, ttls)
+                    return result
+                
+                value = single_flight.do(key, fetch)
+            return value
+        return wrapper
+    return decorator
+
+def _split_cached(source: Any, symbols: List[str], kind: str, refresh: bool):
+    """Split symbols into cached results and the symbols that still need fetching"""
+    results = {}
+    misses = []
+    for symbol in symbols:
+        value = None if refresh else source.cache.get(cache_key(source.name, symbol, kind))
+        if value is None:
+            misses.append(symbol)
+        else:
+            results[symbol] = value
+    return results, misses
+
+def cached_batch(kind: str, ttls: Dict[str, float]) -> Callable:
+    """Cache a source's `method(self, symbols)` results per symbol in `self.cache`
+    
+    Entries are shared with the single-symbol `cached` method of the same kind,
+    and only the symbols that miss are passed on to the wrapped method.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(self, symbols: List[str], use_cache: bool = True, refresh: bool = False) -> Dict:
+                if self.cache is None or not use_cache:
+                    return await func(self, symbols)
+                
+                results, misses = _split_cached(self, symbols, kind, refresh)
+                if misses:
+                    for symbol, value in (await func(self, misses)).items():
+                        _store(self, cache_key(self.name, symbol, kind), value, ttls)
+                        results[symbol] = value
+                return {symbol: results[symbol] for symbol in symbols if symbol in results}
+            return async_wrapper
+        
+        @wraps(func)
+        def wrapper(self, symbols: List[str], use_cache: bool = True, refresh: bool = False) -> Dict:
+            if self.cache is None or not use_cache:
+                return func(self, symbols)
+            
+            results, misses = _split_cached(self, symbols, kind, refresh)
+            if misses:
+                for symbol, value in func(self, misses).items():
+                    _store(self, cache_key(self.name, symbol, kind), value, ttls)
+                    results[symbol] = value
+            return {symbol: results[symbol] for symbol in symbols if symbol in results}
+        return wrapper
+    return decorator
@@ -3,6 +3,18 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Files the app keeps (article archive, bar history, watchlist) live here unless
+# configured with an absolute path, so nothing depends on the working directory
+DATA_DIR = os.path.abspath(os.path.expanduser(os.getenv('DATA_DIR') or os.path.join(
+    os.getenv('XDG_DATA_HOME') or os.path.join('~', '.local', 'share'), 'stock-market-analyzer'
+)))
+
+def data_path(path: str) -> str:
+    """`path` resolved against DATA_DIR unless absolute; '' and SQLite's ':memory:' pass through"""
+    if not path or path == ':memory:':
+        return path
+    return os.path.join(DATA_DIR, os.path.expanduser(path))
+
 class Config:
     ALPHA_VANTAGE_API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY', '')
     FINNHUB_API_KEY = os.getenv('FINNHUB_API_KEY', '')
@@ -10,3 +22,126 @@ class Config:
     # API endpoints
     ALPHA_VANTAGE_BASE_URL = 'https://www.alphavantage.co/query'
     FINNHUB_BASE_URL = 'https://finnhub.io/api/v1'
+    
+    # HTTP transport: pooled keep-alive sessions per host with retry/backoff
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '20'))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '10'))
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '2'))
+    HTTP_BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', '0.5'))
+    HTTP_BACKOFF_MAX = float(os.getenv('HTTP_BACKOFF_MAX', '8'))
+    ASYNC_MAX_CONNECTIONS = int(os.getenv('ASYNC_MAX_CONNECTIONS', '100'))
+    
+    # Per-key rate limits as (requests, period in seconds) per endpoint; requests
+    # that would wait longer than RATE_LIMIT_MAX_WAIT fail fast instead
+    RATE_LIMITS = {
+        ALPHA_VANTAGE_BASE_URL: (int(os.getenv('ALPHA_VANTAGE_RATE_LIMIT', '5')), 60),
+        FINNHUB_BASE_URL: (int(os.getenv('FINNHUB_RATE_LIMIT', '60')), 60)
+    }
+    RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', '5'))
+    
+    # Yahoo Finance: read quotes from fast_info unless full info fields are requested
+    YAHOO_FAST_QUOTE = os.getenv('YAHOO_FAST_QUOTE', 'true').lower() == 'true'
+    
+    # Concurrency
+    MAX_WORKERS = int(os.getenv('MAX_WORKERS', '16'))
+    QUOTE_TIMEOUT = float(os.getenv('QUOTE_TIMEOUT', '8'))
+    HEDGE_DELAY = float(os.getenv('HEDGE_DELAY', '1.5'))
+    BATCH_TIMEOUT = float(os.getenv('BATCH_TIMEOUT', '60'))
+    YAHOO_BATCH_SIZE = int(os.getenv('YAHOO_BATCH_SIZE', '100'))
+    ASYNC_CONCURRENCY = int(os.getenv('ASYNC_CONCURRENCY', '50'))
+    
+    # Batch sentiment scoring: batches larger than SENTIMENT_CHUNK_SIZE are split
+    # across SENTIMENT_PROCESSES worker processes (0 or 1 scores in-process)
+    SENTIMENT_PROCESSES = int(os.getenv('SENTIMENT_PROCESSES', '0'))
+    SENTIMENT_CHUNK_SIZE = int(os.getenv('SENTIMENT_CHUNK_SIZE', '50000'))
+    
+    # News fetches: overall timeout, and how long slower providers still get
+    # once enough articles have arrived from the faster ones
+    NEWS_TIMEOUT = float(os.getenv('NEWS_TIMEOUT', '10'))
+    NEWS_GRACE_PERIOD = float(os.getenv('NEWS_GRACE_PERIOD', '0.5'))
+    
+    # Articles per source fetched for a NewsSnapshot, the shared basis for
+    # news listings, sentiment, correlation and summaries
+    NEWS_SNAPSHOT_LIMIT = int(os.getenv('NEWS_SNAPSHOT_LIMIT', '50'))
+    
+    # Local SQLite article archive filled by news ingestion (and by fetches when
+    # ARCHIVE_FETCHED_NEWS is on); articles older than the retention are pruned
+    ARTICLE_STORE_PATH = data_path(os.getenv('ARTICLE_STORE_PATH', 'articles.db'))
+    ARTICLE_STORE_RETENTION_DAYS = float(os.getenv('ARTICLE_STORE_RETENTION_DAYS', '365'))
+    ARCHIVE_FETCHED_NEWS = os.getenv('ARCHIVE_FETCHED_NEWS', 'true').lower() == 'true'
+    ALPHA_VANTAGE_NEWS_MAX = 1000  # most items NEWS_SENTIMENT returns per call
+    
+    # Per-symbol sentiment decayed with each of these half-lives (seconds);
+    # on startup the last SENTIMENT_REPLAY_HALF_LIVES longest half-lives of
+    # stored articles are replayed into the aggregates
+    SENTIMENT_HALF_LIVES = tuple(float(h) for h in os.getenv('SENTIMENT_HALF_LIVES', '3600,86400,604800').split(','))
+    SENTIMENT_REPLAY_HALF_LIVES = float(os.getenv('SENTIMENT_REPLAY_HALF_LIVES', '10'))
+    
+    # Near-duplicate article detection: MinHash similarity of headline words
+    # and word pairs at or above DEDUP_THRESHOLD (or a matching canonical URL)
+    # marks the same story; entries expire after DEDUP_TTL seconds
+    DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', '0.7'))
+    DEDUP_TTL = float(os.getenv('DEDUP_TTL', str(48 * 3600)))
+    DEDUP_MAX_ENTRIES = int(os.getenv('DEDUP_MAX_ENTRIES', '10000'))
+    
+    # Local OHLCV history: one memory-mapped Feather file per symbol and interval
+    # under HISTORY_STORE_PATH; requests without a start go back the lookback
+    HISTORY_STORE_PATH = data_path(os.getenv('HISTORY_STORE_PATH', 'history'))
+    HISTORY_DAILY_LOOKBACK_DAYS = float(os.getenv('HISTORY_DAILY_LOOKBACK_DAYS', '365'))
+    HISTORY_INTRADAY_LOOKBACK_DAYS = float(os.getenv('HISTORY_INTRADAY_LOOKBACK_DAYS', '5'))
+    
+    # Real-time trades: the Finnhub websocket feed (started by the dashboards
+    # and MCP server when STREAMING is true) keeps the last TICK_BUFFER_SIZE
+    # trades per symbol in memory
+    STREAMING = os.getenv('STREAMING', 'false').lower() == 'true'
+    FINNHUB_STREAM_URL = os.getenv('FINNHUB_STREAM_URL', 'wss://ws.finnhub.io')
+    STREAM_SYMBOLS = tuple(s.strip().upper() for s in os.getenv('STREAM_SYMBOLS', '').split(',') if s.strip())
+    TICK_BUFFER_SIZE = int(os.getenv('TICK_BUFFER_SIZE', '4096'))
+    
+    # Streamed trades are aggregated into bars at each of BAR_INTERVALS; a bar
+    # accepts late trades until trades BAR_LATENESS seconds past its end have
+    # arrived, and final bars are written to the history store every
+    # BAR_FLUSH_INTERVAL seconds. Each symbol holds up to BAR_BUFFER_SIZE bars
+    # per interval in memory
+    BAR_INTERVALS = tuple(os.getenv('BAR_INTERVALS', '1s,1m,5m').split(','))
+    BAR_LATENESS = float(os.getenv('BAR_LATENESS', '2'))
+    BAR_FLUSH_INTERVAL = float(os.getenv('BAR_FLUSH_INTERVAL', '30'))
+    BAR_BUFFER_SIZE = int(os.getenv('BAR_BUFFER_SIZE', '2048'))
+    
+    # Background refresher (refresher.py; embedded in the dashboards and MCP
+    # server when REFRESHER is true): polls symbols listed in WATCHLIST_PATH,
+    # plus any requested at least REFRESH_DEMAND_THRESHOLD times per
+    # DEMAND_HALF_LIFE, from REFRESH_SOURCES. Each symbol is polled every
+    # REFRESH_BASE_INTERVAL seconds, sooner when its price moves (by multiples
+    # of REFRESH_VOLATILITY_SCALE percent per base interval) or it is in
+    # demand, later when less than the rate budget is left, and always within
+    # [REFRESH_MIN_INTERVAL, REFRESH_MAX_INTERVAL]
+    REFRESHER = os.getenv('REFRESHER', 'false').lower() == 'true'
+    WATCHLIST_PATH = data_path(os.getenv('WATCHLIST_PATH', 'watchlist.txt'))
+    REFRESH_SOURCES = tuple(os.getenv('REFRESH_SOURCES', 'yahoo,finnhub').split(','))
+    REFRESH_BASE_INTERVAL = float(os.getenv('REFRESH_BASE_INTERVAL', '60'))
+    REFRESH_MIN_INTERVAL = float(os.getenv('REFRESH_MIN_INTERVAL', '5'))
+    REFRESH_MAX_INTERVAL = float(os.getenv('REFRESH_MAX_INTERVAL', '600'))
+    REFRESH_VOLATILITY_SCALE = float(os.getenv('REFRESH_VOLATILITY_SCALE', '0.25'))
+    REFRESH_MIN_BUDGET = 0.1  # below this share of tokens left, intervals stop growing
+    REFRESH_BATCH_SIZE = int(os.getenv('REFRESH_BATCH_SIZE', '50'))
+    REFRESH_DEMAND_THRESHOLD = float(os.getenv('REFRESH_DEMAND_THRESHOLD', '3'))
+    DEMAND_HALF_LIFE = float(os.getenv('DEMAND_HALF_LIFE', '900'))
+    
+    # In-process cache: bounded LRU with per-provider TTLs in seconds. With
+    # SHARED_CACHE_PATH set, entries are also shared through that SQLite file
+    # with other processes, such as a standalone refresher
+    CACHE_MAX_SIZE = int(os.getenv('CACHE_MAX_SIZE', '4096'))
+    SHARED_CACHE_PATH = data_path(os.getenv('SHARED_CACHE_PATH', ''))
+    DEFAULT_CACHE_TTL = 30
+    QUOTE_CACHE_TTL = {
+        'Yahoo Finance': float(os.getenv('YAHOO_QUOTE_TTL', '15')),
+        'Alpha Vantage': float(os.getenv('ALPHA_VANTAGE_QUOTE_TTL', '60')),
+        'Finnhub': float(os.getenv('FINNHUB_QUOTE_TTL', '15'))
+    }
+    NEWS_CACHE_TTL = {
+        'Yahoo Finance': float(os.getenv('YAHOO_NEWS_TTL', '300')),
+        'Alpha Vantage': float(os.getenv('ALPHA_VANTAGE_NEWS_TTL', '900')),
+        'Finnhub': float(os.getenv('FINNHUB_NEWS_TTL', '300'))
+    }
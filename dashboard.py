@@ -1,6 +1,7 @@
 import streamlit as st
 import plotly.graph_objects as go
 from analyzer import StockAnalyzer
+from cache import default_cache
 import pandas as pd
 from datetime import datetime
 
@@ -65,6 +66,7 @@ if use_finnhub:
 # Refresh button
 if st.sidebar.button("🔄 Refresh Data", type="primary"):
     st.cache_data.clear()
+    default_cache.clear()
     st.rerun()
 
 st.sidebar.markdown("---")
@@ -74,11 +76,13 @@ st.sidebar.caption(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 if not symbols:
     st.warning("Please enter at least one stock symbol")
 else:
+    # Get data for every symbol from all sources in bulk
+    all_results = analyzer.get_quotes(symbols, sources=sources)
+    
     for symbol in symbols:
         st.markdown(f"## {symbol}")
         
-        # Get data from all sources
-        results = analyzer.get_quote(symbol, sources=sources)
+        results = all_results[symbol]
         
         # Create columns for metrics
         cols = st.columns(len(sources))
@@ -115,7 +119,7 @@ else:
         
         # Comparison table
         st.subheader("📊 Source Comparison")
-        df = analyzer.compare_sources(symbol)
+        df = analyzer.compare_sources(symbol, results=results)
         
         if not df.empty:
             # Style the dataframe
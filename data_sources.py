@@ -1,107 +1,317 @@
-import requests
+import asyncio
+import contextvars
 import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
-from typing import Dict, Optional
+import transport
+from cache import default_cache, cached, cached_batch
+from models import Quote, ProviderError, QuoteResult
+from typing import Dict, List, Optional
 
 class StockDataSource:
     """Base class for stock data sources"""
     
-    def get_quote(self, symbol: str) -> Dict:
+    name = 'Unknown'
+    cache = default_cache
+    
+    def get_quote(self, symbol: str) -> QuoteResult:
         raise NotImplementedError
+    
+    @cached_batch('quote', Config.QUOTE_CACHE_TTL)
+    def get_quotes(self, symbols: List[str]) -> Dict[str, QuoteResult]:
+        """Get quotes for many symbols, keyed by symbol"""
+        return self._fetch_quotes(symbols)
+    
+    def _fetch_quotes(self, symbols: List[str]) -> Dict[str, QuoteResult]:
+        """Fetch uncached quotes; sources without a bulk endpoint issue pooled concurrent requests"""
+        if not symbols:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(Config.MAX_WORKERS, len(symbols))) as pool:
+            # Run each request in a copy of the caller's context so its rate-limit priority applies
+            context = contextvars.copy_context()
+            
+            def fetch(symbol):
+                return context.copy().run(self.get_quote, symbol, use_cache=False)
+            
+            return dict(zip(symbols, pool.map(fetch, symbols)))
 
 class YahooFinanceSource(StockDataSource):
     """Yahoo Finance data source (free, no API key needed)"""
     
-    def get_quote(self, symbol: str) -> Dict:
+    name = 'Yahoo Finance'
+    
+    # Fields only available from the full quoteSummary payload (ticker.info)
+    INFO_FIELDS = {'market_cap'}
+    
+    def __init__(self, fast: bool = None):
+        self.fast = Config.YAHOO_FAST_QUOTE if fast is None else fast
+    
+    @cached('quote', Config.QUOTE_CACHE_TTL)
+    def get_quote(self, symbol: str, fields: List[str] = None) -> QuoteResult:
+        if self.fast and not self.INFO_FIELDS.intersection(fields or ()):
+            return self._get_fast_quote(symbol)
+        
         try:
             ticker = yf.Ticker(symbol)
             info = ticker.info
-            return {
-                'symbol': symbol,
-                'price': info.get('currentPrice') or info.get('regularMarketPrice'),
-                'change': info.get('regularMarketChange'),
-                'change_percent': info.get('regularMarketChangePercent'),
-                'volume': info.get('volume'),
-                'market_cap': info.get('marketCap'),
-                'high': info.get('dayHigh') or info.get('regularMarketDayHigh'),
-                'low': info.get('dayLow') or info.get('regularMarketDayLow'),
-                'open': info.get('open') or info.get('regularMarketOpen'),
-                'previous_close': info.get('previousClose') or info.get('regularMarketPreviousClose'),
-                'source': 'Yahoo Finance'
-            }
+            return Quote(
+                symbol=symbol,
+                price=info.get('currentPrice') or info.get('regularMarketPrice'),
+                change=info.get('regularMarketChange'),
+                change_percent=info.get('regularMarketChangePercent'),
+                volume=info.get('volume'),
+                market_cap=info.get('marketCap'),
+                high=info.get('dayHigh') or info.get('regularMarketDayHigh'),
+                low=info.get('dayLow') or info.get('regularMarketDayLow'),
+                open=info.get('open') or info.get('regularMarketOpen'),
+                previous_close=info.get('previousClose') or info.get('regularMarketPreviousClose'),
+                source='Yahoo Finance'
+            )
+        except Exception as e:
+            return ProviderError(str(e), 'Yahoo Finance')
+    
+    def _get_fast_quote(self, symbol: str) -> QuoteResult:
+        """Get price fields from fast_info instead of the full ticker.info payload"""
+        try:
+            fast_info = yf.Ticker(symbol).fast_info
+            price = fast_info.last_price
+            # regular_market_previous_close shares the daily bars already
+            # fetched for last_price; previous_close would cost another request
+            previous_close = fast_info.regular_market_previous_close
+            change = price - previous_close if price is not None and previous_close else None
+            return Quote(
+                symbol=symbol,
+                price=price,
+                change=change,
+                change_percent=change / previous_close * 100 if change is not None else None,
+                volume=fast_info.last_volume,
+                high=fast_info.day_high,
+                low=fast_info.day_low,
+                open=fast_info.open,
+                previous_close=previous_close,
+                source='Yahoo Finance'
+            )
+        except Exception as e:
+            return ProviderError(str(e), 'Yahoo Finance')
+    
+    def _fetch_quotes(self, symbols: List[str]) -> Dict[str, QuoteResult]:
+        """Fetch quotes for many symbols using yfinance multi-ticker downloads"""
+        results = {}
+        batch_size = Config.YAHOO_BATCH_SIZE
+        for i in range(0, len(symbols), batch_size):
+            batch = symbols[i:i + batch_size]
+            try:
+                bars = yf.download(batch, period='5d', interval='1d', group_by='ticker',
+                                   auto_adjust=False, threads=True, progress=False)
+            except Exception as e:
+                results.update({symbol: ProviderError(str(e), 'Yahoo Finance') for symbol in batch})
+                continue
+            for symbol in batch:
+                results[symbol] = self._quote_from_bars(symbol, bars)
+        return results
+    
+    def _quote_from_bars(self, symbol: str, bars) -> QuoteResult:
+        """Build a quote from the latest daily bars of a multi-ticker download"""
+        try:
+            if symbol not in bars.columns.get_level_values(0):
+                return ProviderError('No data available', 'Yahoo Finance')
+            
+            daily = bars[symbol].dropna(subset=['Close'])
+            if daily.empty:
+                return ProviderError('No data available', 'Yahoo Finance')
+            
+            today = daily.iloc[-1]
+            price = float(today['Close'])
+            previous_close = float(daily['Close'].iloc[-2]) if len(daily) > 1 else None
+            change = price - previous_close if previous_close else None
+            return Quote(
+                symbol=symbol,
+                price=price,
+                change=change,
+                change_percent=change / previous_close * 100 if previous_close else None,
+                volume=int(today['Volume']),
+                high=float(today['High']),
+                low=float(today['Low']),
+                open=float(today['Open']),
+                previous_close=previous_close,
+                source='Yahoo Finance'
+            )
         except Exception as e:
-            return {'error': str(e), 'source': 'Yahoo Finance'}
+            return ProviderError(str(e), 'Yahoo Finance')
 
 class AlphaVantageSource(StockDataSource):
     """Alpha Vantage data source"""
     
+    name = 'Alpha Vantage'
+    
     def __init__(self):
         self.api_key = Config.ALPHA_VANTAGE_API_KEY
         self.base_url = Config.ALPHA_VANTAGE_BASE_URL
     
-    def get_quote(self, symbol: str) -> Dict:
+    @cached('quote', Config.QUOTE_CACHE_TTL)
+    def get_quote(self, symbol: str) -> QuoteResult:
         if not self.api_key:
-            return {'error': 'API key not configured', 'source': 'Alpha Vantage'}
+            return ProviderError('API key not configured', 'Alpha Vantage')
         
-        params = {
+        try:
+            response = transport.get(self.base_url, params=self._quote_params(symbol), rate_key=(self.api_key, self.base_url))
+            return self._parse_quote(symbol, response.json())
+        except Exception as e:
+            return ProviderError(str(e), 'Alpha Vantage')
+    
+    def _quote_params(self, symbol: str) -> Dict:
+        return {
             'function': 'GLOBAL_QUOTE',
             'symbol': symbol,
             'apikey': self.api_key
         }
-        
-        try:
-            response = requests.get(self.base_url, params=params, timeout=10)
-            data = response.json()
-            
-            if 'Global Quote' in data:
-                quote = data['Global Quote']
-                return {
-                    'symbol': symbol,
-                    'price': float(quote.get('05. price', 0)),
-                    'change': float(quote.get('09. change', 0)),
-                    'change_percent': quote.get('10. change percent', '0%').rstrip('%'),
-                    'volume': int(quote.get('06. volume', 0)),
-                    'high': float(quote.get('03. high', 0)),
-                    'low': float(quote.get('04. low', 0)),
-                    'open': float(quote.get('02. open', 0)),
-                    'previous_close': float(quote.get('08. previous close', 0)),
-                    'source': 'Alpha Vantage'
-                }
-            return {'error': 'No data available', 'source': 'Alpha Vantage'}
-        except Exception as e:
-            return {'error': str(e), 'source': 'Alpha Vantage'}
+    
+    @staticmethod
+    def _parse_quote(symbol: str, data: Dict) -> QuoteResult:
+        # Throttled requests come back as HTTP 200 with a Note/Information message
+        if 'Note' in data or 'Information' in data:
+            return ProviderError(data.get('Note') or data['Information'], 'Alpha Vantage')
+        if 'Global Quote' in data:
+            quote = data['Global Quote']
+            return Quote(
+                symbol=symbol,
+                price=float(quote.get('05. price', 0)),
+                change=float(quote.get('09. change', 0)),
+                change_percent=float(quote.get('10. change percent', '0%').rstrip('%')),
+                volume=int(quote.get('06. volume', 0)),
+                high=float(quote.get('03. high', 0)),
+                low=float(quote.get('04. low', 0)),
+                open=float(quote.get('02. open', 0)),
+                previous_close=float(quote.get('08. previous close', 0)),
+                source='Alpha Vantage'
+            )
+        return ProviderError('No data available', 'Alpha Vantage')
 
 class FinnhubSource(StockDataSource):
     """Finnhub data source"""
     
+    name = 'Finnhub'
+    
     def __init__(self):
         self.api_key = Config.FINNHUB_API_KEY
         self.base_url = Config.FINNHUB_BASE_URL
     
-    def get_quote(self, symbol: str) -> Dict:
+    @cached('quote', Config.QUOTE_CACHE_TTL)
+    def get_quote(self, symbol: str) -> QuoteResult:
         if not self.api_key:
-            return {'error': 'API key not configured', 'source': 'Finnhub'}
+            return ProviderError('API key not configured', 'Finnhub')
         
         try:
-            response = requests.get(
+            response = transport.get(
                 f'{self.base_url}/quote',
                 params={'symbol': symbol, 'token': self.api_key},
-                timeout=10
+                rate_key=(self.api_key, self.base_url)
             )
-            data = response.json()
-            
-            if 'c' in data:
-                return {
-                    'symbol': symbol,
-                    'price': data['c'],
-                    'change': data['d'],
-                    'change_percent': data['dp'],
-                    'high': data['h'],
-                    'low': data['l'],
-                    'open': data['o'],
-                    'previous_close': data['pc'],
-                    'source': 'Finnhub'
-                }
-            return {'error': 'No data available', 'source': 'Finnhub'}
+            return self._parse_quote(symbol, response.json())
+        except Exception as e:
+            return ProviderError(str(e), 'Finnhub')
+    
+    @staticmethod
+    def _parse_quote(symbol: str, data: Dict) -> QuoteResult:
+        if 'c' in data:
+            return Quote(
+                symbol=symbol,
+                price=data['c'],
+                change=data['d'],
+                change_percent=data['dp'],
+                high=data['h'],
+                low=data['l'],
+                open=data['o'],
+                previous_close=data['pc'],
+                source='Finnhub'
+            )
+        return ProviderError('No data available', 'Finnhub')
+
+class AsyncStockDataSource:
+    """Base class for asyncio stock data sources"""
+    
+    name = 'Unknown'
+    cache = default_cache
+    
+    async def get_quote(self, symbol: str) -> QuoteResult:
+        raise NotImplementedError
+    
+    @cached_batch('quote', Config.QUOTE_CACHE_TTL)
+    async def get_quotes(self, symbols: List[str]) -> Dict[str, QuoteResult]:
+        """Get quotes for many symbols, keyed by symbol"""
+        return await self._fetch_quotes(symbols)
+    
+    async def _fetch_quotes(self, symbols: List[str]) -> Dict[str, QuoteResult]:
+        """Fetch uncached quotes concurrently, at most Config.ASYNC_CONCURRENCY at a time"""
+        semaphore = asyncio.Semaphore(Config.ASYNC_CONCURRENCY)
+        
+        async def fetch(symbol):
+            async with semaphore:
+                return await self.get_quote(symbol, use_cache=False)
+        
+        quotes = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+        return dict(zip(symbols, quotes))
+
+class AsyncYahooFinanceSource(AsyncStockDataSource):
+    """Yahoo Finance async data source
+    
+    yfinance has no async API, so calls run in worker threads.
+    """
+    
+    name = 'Yahoo Finance'
+    
+    def __init__(self, fast: bool = None):
+        self.sync_source = YahooFinanceSource(fast)
+    
+    @cached('quote', Config.QUOTE_CACHE_TTL)
+    async def get_quote(self, symbol: str, fields: List[str] = None) -> QuoteResult:
+        return await asyncio.to_thread(self.sync_source.get_quote, symbol, fields, use_cache=False)
+    
+    async def _fetch_quotes(self, symbols: List[str]) -> Dict[str, QuoteResult]:
+        return await asyncio.to_thread(self.sync_source._fetch_quotes, symbols)
+
+class AsyncAlphaVantageSource(AsyncStockDataSource):
+    """Alpha Vantage async data source"""
+    
+    name = 'Alpha Vantage'
+    
+    def __init__(self):
+        self.sync_source = AlphaVantageSource()
+    
+    @cached('quote', Config.QUOTE_CACHE_TTL)
+    async def get_quote(self, symbol: str) -> QuoteResult:
+        if not self.sync_source.api_key:
+            return ProviderError('API key not configured', 'Alpha Vantage')
+        
+        try:
+            response = await transport.async_get(
+                self.sync_source.base_url,
+                params=self.sync_source._quote_params(symbol),
+                rate_key=(self.sync_source.api_key, self.sync_source.base_url)
+            )
+            return self.sync_source._parse_quote(symbol, response.json())
+        except Exception as e:
+            return ProviderError(str(e), 'Alpha Vantage')
+
+class AsyncFinnhubSource(AsyncStockDataSource):
+    """Finnhub async data source"""
+    
+    name = 'Finnhub'
+    
+    def __init__(self):
+        self.sync_source = FinnhubSource()
+    
+    @cached('quote', Config.QUOTE_CACHE_TTL)
+    async def get_quote(self, symbol: str) -> QuoteResult:
+        if not self.sync_source.api_key:
+            return ProviderError('API key not configured', 'Finnhub')
+        
+        try:
+            response = await transport.async_get(
+                f'{self.sync_source.base_url}/quote',
+                params={'symbol': symbol, 'token': self.sync_source.api_key},
+                rate_key=(self.sync_source.api_key, self.sync_source.base_url)
+            )
+            return self.sync_source._parse_quote(symbol, response.json())
         except Exception as e:
-            return {'error': str(e), 'source': 'Finnhub'}
+            return ProviderError(str(e), 'Finnhub')
@@ -0,0 +1,148 @@
+import itertools
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import numpy as np
+from config import Config
+from models import NewsItem
+
+# Query parameters that only track the click, never select the content
+TRACKING_PARAMS = {'fbclid', 'gclid', 'guccounter', 'guce_referrer', 'guce_referrer_sig', 'mc_cid', 'mc_eid',
+                   'ocid', 'cmpid', 'src', 'soc_src', 'soc_trk', 'yptr', 'ncid'}
+
+_MERSENNE_PRIME = (1 << 31) - 1
+
+def canonical_url(url: Optional[str]) -> Optional[str]:
+    """Normalize a URL so provider variants of one article compare equal
+    
+    Lowercases the scheme and host, drops 'www.'/'m.' prefixes, fragments,
+    trailing slashes and tracking parameters (utm_* and the like), and sorts
+    the remaining query parameters.
+    """
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(('https' if parts.scheme in ('http', 'https') else parts.scheme.lower(),
+                       host, parts.path.rstrip('/'), urlencode(query), ''))
+
+class NearDuplicateIndex:
+    """MinHash LSH index that spots the same story under different URLs and headlines
+    
+    Headlines are compared as sets of words and adjacent word pairs; two
+    articles count as duplicates when their estimated Jaccard similarity
+    reaches `threshold` or their canonical URLs match. Pairs weigh a changed
+    word more than an added one, so a reprint with a source suffix still
+    matches while "stock jumps" and "stock drops" versions of a story do not.
+    Signatures are split into `bands` bands so a lookup only compares against
+    articles sharing a band, and entries expire `ttl` seconds after they are
+    added (oldest first beyond `max_entries`), which keeps memory bounded.
+    """
+    
+    def __init__(self, threshold: float = None, ttl: float = None, max_entries: int = None,
+                 num_perm: int = 192, bands: int = 48):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.threshold = Config.DEDUP_THRESHOLD if threshold is None else threshold
+        self.ttl = Config.DEDUP_TTL if ttl is None else ttl
+        self.max_entries = max_entries or Config.DEDUP_MAX_ENTRIES
+        self.bands = bands
+        self.rows = num_perm // bands
+        
+        # Fixed seed so signatures are comparable across index instances
+        rng = np.random.default_rng(0x5EED)
+        self._a = rng.integers(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        
+        self._ids = itertools.count()
+        self._entries = {}  # id -> (signature, canonical url, band keys)
+        self._expiry = deque()  # (expires_at, id), oldest first
+        self._urls = {}  # canonical url -> id
+        self._buckets = {}  # band key -> set of ids
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def shingles(text: str) -> set:
+        """Lowercased words of the text and each pair of adjacent words"""
+        words = re.findall(r'\w+', (text or '').lower())
+        return set(words) | {f'{first} {second}' for first, second in zip(words, words[1:])} or {''}
+    
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of the text's word shingles"""
+        shingles = self.shingles(text)
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+        hashes %= _MERSENNE_PRIME
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+    
+    def _band_keys(self, signature: np.ndarray) -> list:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+    
+    def _evict(self, now: float):
+        while self._expiry and (self._expiry[0][0] <= now or len(self._entries) > self.max_entries):
+            _, entry_id = self._expiry.popleft()
+            signature, url, band_keys = self._entries.pop(entry_id)
+            if url is not None and self._urls.get(url) == entry_id:
+                del self._urls[url]
+            for key in band_keys:
+                bucket = self._buckets[key]
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+    
+    def _match(self, url: Optional[str], signature: np.ndarray, band_keys: list) -> Optional[int]:
+        if url is not None and url in self._urls:
+            return self._urls[url]
+        candidates = set()
+        for key in band_keys:
+            candidates.update(self._buckets.get(key, ()))
+        for entry_id in candidates:
+            if np.mean(self._entries[entry_id][0] == signature) >= self.threshold:
+                return entry_id
+        return None
+    
+    def contains(self, url: Optional[str], text: str) -> bool:
+        """Whether a near-duplicate of the article is indexed, without indexing it"""
+        signature = self.signature(text)
+        with self._lock:
+            self._evict(time.monotonic())
+            return self._match(canonical_url(url), signature, self._band_keys(signature)) is not None
+    
+    def add_if_new(self, url: Optional[str], text: str) -> bool:
+        """Index the article unless it near-duplicates one already indexed; returns whether it was new"""
+        url = canonical_url(url)
+        signature = self.signature(text)
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            now = time.monotonic()
+            self._evict(now)
+            if self._match(url, signature, band_keys) is not None:
+                return False
+            
+            entry_id = next(self._ids)
+            self._entries[entry_id] = (signature, url, band_keys)
+            self._expiry.append((now + self.ttl, entry_id))
+            if url is not None:
+                self._urls[url] = entry_id
+            for key in band_keys:
+                self._buckets.setdefault(key, set()).add(entry_id)
+            self._evict(now)
+            return True
+    
+    def seen(self, item: NewsItem) -> bool:
+        """Whether a news item duplicates one already indexed; new items are indexed"""
+        return not self.add_if_new(item.get('url'), item.get('headline', ''))
+    
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,49 @@
+import math
+import threading
+import time
+from typing import Dict, Iterable, List
+from config import Config
+
+class DemandTracker:
+    """Exponentially decayed count of interactive requests per symbol
+    
+    Each request adds 1 and counts fade with Config.DEMAND_HALF_LIFE, so a
+    symbol's demand reads as roughly its recent requests per half-life.
+    """
+    
+    def __init__(self, half_life: float = None):
+        self.half_life = Config.DEMAND_HALF_LIFE if half_life is None else half_life
+        self._rate = math.log(2) / self.half_life
+        self._counts = {}  # symbol -> (count, as of)
+        self._lock = threading.Lock()
+    
+    def record(self, symbols: Iterable[str], now: float = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            for symbol in map(str.upper, symbols):
+                count, updated = self._counts.get(symbol, (0.0, now))
+                self._counts[symbol] = (count * math.exp(-self._rate * (now - updated)) + 1, now)
+    
+    def get(self, symbol: str, now: float = None) -> float:
+        now = time.time() if now is None else now
+        with self._lock:
+            count, updated = self._counts.get(symbol.upper(), (0.0, now))
+        return count * math.exp(-self._rate * (now - updated))
+    
+    def above(self, threshold: float, now: float = None) -> List[str]:
+        """Symbols whose demand is at least `threshold`, busiest first; forgets ones that faded out"""
+        now = time.time() if now is None else now
+        with self._lock:
+            demand = {symbol: count * math.exp(-self._rate * (now - updated))
+                      for symbol, (count, updated) in self._counts.items()}
+            for symbol, count in demand.items():
+                if count < 0.01:
+                    del self._counts[symbol]
+        return sorted((s for s, count in demand.items() if count >= threshold), key=demand.get, reverse=True)
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'symbols': len(self._counts), 'half_life': self.half_life}
+
+# Shared by every analyzer and the background refresher in the process
+symbol_demand = DemandTracker()
@@ -0,0 +1,210 @@
+import pandas as pd
+import yfinance as yf
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple, Union
+from config import Config
+import transport
+from models import ProviderError
+from history_store import BAR_COLUMNS, BarStore, bar_store, empty_bars, settled_until
+
+BarsResult = Union[pd.DataFrame, ProviderError]
+
+def normalize_bars(frame: pd.DataFrame, interval: str, start: int, end: int) -> pd.DataFrame:
+    """Provider bars as float OHLCV columns on a sorted UTC `timestamp` index, limited to [start, end)
+    
+    Daily bars are stamped at midnight UTC of their trading date, whatever
+    timezone the provider reports them in.
+    """
+    if frame is None or frame.empty:
+        return empty_bars()
+    frame = frame.rename(columns=str.lower).reindex(columns=list(BAR_COLUMNS)).astype(float)
+    index = pd.DatetimeIndex(frame.index)
+    if interval == '1d':
+        # The trading date in the provider's own timezone, stamped at midnight UTC
+        index = (index.tz_localize(None) if index.tz is not None else index).normalize().tz_localize('UTC')
+    else:
+        index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+    frame.index = index.astype('datetime64[ns, UTC]').rename('timestamp')
+    frame = frame.dropna(subset=['close'])
+    frame = frame[~frame.index.duplicated(keep='last')].sort_index()
+    return frame[(frame.index >= pd.Timestamp(start, unit='s', tz='UTC')) &
+                 (frame.index < pd.Timestamp(end, unit='s', tz='UTC'))]
+
+class HistoricalDataSource:
+    """Base class for OHLCV history sources"""
+    
+    name = 'Unknown'
+    
+    # Provider spelling of each supported bar interval
+    INTERVALS = {}
+    
+    def get_bars(self, symbol: str, interval: str, start: int, end: int) -> BarsResult:
+        """Bars for [start, end) in epoch seconds, normalized by normalize_bars()"""
+        raise NotImplementedError
+    
+    def supports(self, interval: str) -> bool:
+        return interval in self.INTERVALS
+    
+    def fill(self, symbol: str, interval: str, start: int, end: int,
+             store: BarStore = None) -> List[Union[Tuple[int, int], ProviderError]]:
+        """Fetch the parts of [start, end) missing from the store and save them
+        
+        Returns the ranges filled, or the error for each range that could not be.
+        Only settled bars count as covered, so the bar still in progress is
+        fetched again next time.
+        """
+        store = store or bar_store
+        if not self.supports(interval):
+            return [ProviderError(f'Interval {interval} not supported', self.name)]
+        results = []
+        with store.lock(symbol, interval):
+            for gap_start, gap_end in store.missing(symbol, interval, start, end):
+                bars = self.get_bars(symbol, interval, gap_start, gap_end)
+                if isinstance(bars, ProviderError):
+                    results.append(bars)
+                    continue
+                covered = (gap_start, min(gap_end, settled_until(interval)))
+                store.write(symbol, interval, bars, covered if covered[0] < covered[1] else None)
+                results.append((gap_start, gap_end))
+        return results
+
+class YahooFinanceHistorySource(HistoricalDataSource):
+    """Yahoo Finance bars via yfinance history"""
+    
+    name = 'Yahoo Finance'
+    
+    INTERVALS = {'1m': '1m', '5m': '5m', '15m': '15m', '30m': '30m', '60m': '60m', '1d': '1d'}
+    
+    def get_bars(self, symbol: str, interval: str, start: int, end: int) -> BarsResult:
+        try:
+            frame = yf.Ticker(symbol).history(
+                start=datetime.fromtimestamp(start, timezone.utc),
+                end=datetime.fromtimestamp(end, timezone.utc),
+                interval=self.INTERVALS[interval],
+                auto_adjust=False,
+                raise_errors=True
+            )
+            return normalize_bars(frame, interval, start, end)
+        except Exception as e:
+            return ProviderError(str(e), 'Yahoo Finance')
+
+class AlphaVantageHistorySource(HistoricalDataSource):
+    """Alpha Vantage TIME_SERIES_DAILY and TIME_SERIES_INTRADAY bars"""
+    
+    name = 'Alpha Vantage'
+    
+    INTERVALS = {'1m': '1min', '5m': '5min', '15m': '15min', '30m': '30min', '60m': '60min', '1d': 'daily'}
+    
+    # Compact responses cover about the last 100 bars; intraday responses
+    # without `month` cover about the last 30 days
+    COMPACT_DAYS = 100
+    RECENT_INTRADAY_DAYS = 30
+    
+    def __init__(self):
+        self.api_key = Config.ALPHA_VANTAGE_API_KEY
+        self.base_url = Config.ALPHA_VANTAGE_BASE_URL
+    
+    def get_bars(self, symbol: str, interval: str, start: int, end: int) -> BarsResult:
+        if not self.api_key:
+            return ProviderError('API key not configured', 'Alpha Vantage')
+        
+        try:
+            frames = []
+            for params in self._history_params(symbol, interval, start):
+                response = transport.get(self.base_url, params=params, rate_key=(self.api_key, self.base_url))
+                bars = self._parse_bars(response.json())
+                if isinstance(bars, ProviderError):
+                    return bars
+                frames.append(bars)
+            return normalize_bars(pd.concat(frames), interval, start, end)
+        except Exception as e:
+            return ProviderError(str(e), 'Alpha Vantage')
+    
+    def _history_params(self, symbol: str, interval: str, start: int) -> List[Dict]:
+        age_days = (datetime.now(timezone.utc).timestamp() - start) / 86400
+        if interval == '1d':
+            return [{
+                'function': 'TIME_SERIES_DAILY',
+                'symbol': symbol,
+                'outputsize': 'full' if age_days > self.COMPACT_DAYS else 'compact',
+                'apikey': self.api_key
+            }]
+        
+        params = {
+            'function': 'TIME_SERIES_INTRADAY',
+            'symbol': symbol,
+            'interval': self.INTERVALS[interval],
+            'outputsize': 'full',
+            'apikey': self.api_key
+        }
+        if age_days <= self.RECENT_INTRADAY_DAYS:
+            return [params]
+        # Older intraday history is served one calendar month per call
+        months = pd.period_range(pd.Timestamp(start, unit='s'), pd.Timestamp.now(), freq='M')
+        return [{**params, 'month': str(month)} for month in months]
+    
+    @staticmethod
+    def _parse_bars(data: Dict) -> BarsResult:
+        # Throttled requests come back as HTTP 200 with a Note/Information message
+        if 'Note' in data or 'Information' in data:
+            return ProviderError(data.get('Note') or data['Information'], 'Alpha Vantage')
+        if 'Error Message' in data:
+            return ProviderError(data['Error Message'], 'Alpha Vantage')
+        series_key = next((key for key in data if key.startswith('Time Series')), None)
+        if series_key is None:
+            return ProviderError('No data available', 'Alpha Vantage')
+        
+        frame = pd.DataFrame.from_dict(data[series_key], orient='index', dtype=float)
+        # '1. open' -> 'open'
+        frame.columns = [column.split('. ', 1)[-1] for column in frame.columns]
+        frame.index = pd.to_datetime(frame.index)
+        timezone_name = data.get('Meta Data', {}).get('6. Time Zone') or data.get('Meta Data', {}).get('5. Time Zone')
+        if timezone_name and series_key != 'Time Series (Daily)':
+            frame.index = frame.index.tz_localize(timezone_name)
+        return frame
+
+class FinnhubHistorySource(HistoricalDataSource):
+    """Finnhub stock candles"""
+    
+    name = 'Finnhub'
+    
+    INTERVALS = {'1m': '1', '5m': '5', '15m': '15', '30m': '30', '60m': '60', '1d': 'D'}
+    
+    def __init__(self):
+        self.api_key = Config.FINNHUB_API_KEY
+        self.base_url = Config.FINNHUB_BASE_URL
+    
+    def get_bars(self, symbol: str, interval: str, start: int, end: int) -> BarsResult:
+        if not self.api_key:
+            return ProviderError('API key not configured', 'Finnhub')
+        
+        try:
+            response = transport.get(
+                f'{self.base_url}/stock/candle',
+                params={
+                    'symbol': symbol,
+                    'resolution': self.INTERVALS[interval],
+                    'from': start,
+                    'to': end - 1,
+                    'token': self.api_key
+                },
+                rate_key=(self.api_key, self.base_url)
+            )
+            return self._parse_bars(response.json(), interval, start, end)
+        except Exception as e:
+            return ProviderError(str(e), 'Finnhub')
+    
+    @staticmethod
+    def _parse_bars(data: Dict, interval: str, start: int, end: int) -> BarsResult:
+        if 'error' in data:
+            return ProviderError(data['error'], 'Finnhub')
+        status = data.get('s')
+        if status == 'no_data':
+            return empty_bars()
+        if status != 'ok':
+            return ProviderError('No data available', 'Finnhub')
+        frame = pd.DataFrame(
+            {'open': data['o'], 'high': data['h'], 'low': data['l'], 'close': data['c'], 'volume': data['v']},
+            index=pd.to_datetime(data['t'], unit='s', utc=True)
+        )
+        return normalize_bars(frame, interval, start, end)
@@ -0,0 +1,216 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from config import Config
+
+# Bar intervals and their length in seconds
+INTERVALS = {'1s': 1, '1m': 60, '5m': 300, '15m': 900, '30m': 1800, '60m': 3600, '1d': 86400}
+
+BAR_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+SCHEMA = pa.schema(
+    [('timestamp', pa.timestamp('ns', tz='UTC'))] + [(column, pa.float64()) for column in BAR_COLUMNS]
+)
+
+def empty_bars() -> pd.DataFrame:
+    """A bar frame with no rows: UTC `timestamp` index and float OHLCV columns"""
+    return pd.DataFrame(
+        {column: np.empty(0) for column in BAR_COLUMNS},
+        index=pd.DatetimeIndex([], tz='UTC', name='timestamp')
+    )
+
+def bar_records(bars: pd.DataFrame) -> List[Dict]:
+    """Bars as JSON-ready dicts with an ISO 8601 `timestamp`, oldest first"""
+    records = bars.reset_index().to_dict('records')
+    for record in records:
+        record['timestamp'] = record['timestamp'].isoformat()
+    return records
+
+def interval_seconds(interval: str) -> int:
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown interval {interval!r}; expected one of {', '.join(INTERVALS)}")
+    return INTERVALS[interval]
+
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sorted, non-overlapping union of [start, end) ranges"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        elif start < end:
+            merged.append((start, end))
+    return merged
+
+class BarStore:
+    """Local columnar store of OHLCV bars, one Feather file per symbol and interval
+    
+    Files are uncompressed Arrow IPC (Feather v2), so reads memory-map the file
+    and hand pandas views onto it instead of copying. Each file also records, in
+    its schema metadata, the time ranges already fetched, including ranges that
+    had no bars (weekends, holidays), so callers ask providers only for what is
+    missing. Writes merge with the stored bars and replace the file atomically.
+    """
+    
+    def __init__(self, root: str = None):
+        self.root = root or Config.HISTORY_STORE_PATH
+        self._locks = {}  # (symbol, interval) -> RLock
+        self._locks_lock = threading.Lock()
+    
+    def path(self, symbol: str, interval: str) -> str:
+        interval_seconds(interval)
+        return os.path.join(self.root, interval, f'{symbol.upper()}.feather')
+    
+    def lock(self, symbol: str, interval: str) -> threading.RLock:
+        """Lock serializing read-modify-write cycles (such as gap fills) on one file"""
+        key = (symbol.upper(), interval)
+        with self._locks_lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.RLock()
+            return lock
+    
+    def _table(self, symbol: str, interval: str) -> Optional[pa.Table]:
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        return feather.read_table(path, memory_map=True)
+    
+    @staticmethod
+    def _coverage(table: Optional[pa.Table]) -> List[Tuple[int, int]]:
+        if table is None or not table.schema.metadata or b'coverage' not in table.schema.metadata:
+            return []
+        return [tuple(span) for span in json.loads(table.schema.metadata[b'coverage'])]
+    
+    def coverage(self, symbol: str, interval: str) -> List[Tuple[int, int]]:
+        """Fetched [start, end) ranges in epoch seconds, merged and sorted"""
+        return self._coverage(self._table(symbol, interval))
+    
+    def missing(self, symbol: str, interval: str, start: int, end: int) -> List[Tuple[int, int]]:
+        """The parts of [start, end) not fetched yet"""
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in self.coverage(symbol, interval):
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+    
+    def read(self, symbol: str, interval: str, start: int = None, end: int = None) -> pd.DataFrame:
+        """Stored bars in [start, end), as a frame backed by the memory-mapped file"""
+        table = self._table(symbol, interval)
+        if table is None or table.num_rows == 0:
+            return empty_bars()
+        
+        # Slice on the raw timestamps so only the requested rows are converted
+        timestamps = table.column('timestamp').combine_chunks().cast(pa.int64()).to_numpy()
+        first = 0 if start is None else int(np.searchsorted(timestamps, start * 1_000_000_000))
+        last = len(timestamps) if end is None else int(np.searchsorted(timestamps, end * 1_000_000_000))
+        frame = table.slice(first, last - first).to_pandas(split_blocks=True)
+        return frame.set_index('timestamp')
+    
+    def write(self, symbol: str, interval: str, bars: pd.DataFrame, covered: Tuple[int, int] = None):
+        """Merge bars into the store, newer values winning, and record `covered` as fetched"""
+        with self.lock(symbol, interval):
+            table = self._table(symbol, interval)
+            coverage = self._coverage(table)
+            if covered is not None:
+                coverage = merge_ranges(coverage + [covered])
+            
+            frames = [] if table is None else [table.to_pandas().set_index('timestamp')]
+            frames.append(bars.loc[:, list(BAR_COLUMNS)].astype(float))
+            merged = pd.concat(frames) if len(frames) > 1 else frames[0]
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            merged.index = merged.index.astype('datetime64[ns, UTC]').rename('timestamp')
+            self._save(symbol, interval, pa.Table.from_pandas(merged.reset_index(), schema=SCHEMA, preserve_index=False),
+                       coverage)
+    
+    def supplement(self, symbol: str, interval: str, bars: pd.DataFrame) -> int:
+        """Merge only bars the store has no data for: timestamps neither stored nor inside a fetched range
+        
+        For bars built outside the providers (such as from streamed trades), so
+        they fill gaps without overwriting fetched history. Returns bars added.
+        """
+        with self.lock(symbol, interval):
+            table = self._table(symbol, interval)
+            if table is None:
+                self.write(symbol, interval, bars)
+                return len(bars)
+            
+            timestamps = bars.index.astype('datetime64[ns, UTC]').asi8
+            seconds = timestamps // 1_000_000_000
+            covered = np.zeros(len(bars), dtype=bool)
+            coverage = self._coverage(table)
+            if coverage:
+                starts, ends = (np.array(column, dtype=np.int64) for column in zip(*coverage))
+                within = np.searchsorted(starts, seconds, side='right') - 1
+                covered = (within >= 0) & (seconds < ends[np.maximum(within, 0)])
+            stored = np.isin(timestamps, table.column('timestamp').combine_chunks().cast(pa.int64()).to_numpy())
+            new = bars[~covered & ~stored]
+            if len(new):
+                self.write(symbol, interval, new)
+            return len(new)
+    
+    def forget(self, symbol: str, interval: str, start: int, end: int):
+        """Mark [start, end) as not fetched, so the next fill fetches it again"""
+        with self.lock(symbol, interval):
+            table = self._table(symbol, interval)
+            if table is None:
+                return
+            coverage = []
+            for covered_start, covered_end in self._coverage(table):
+                if covered_start < start:
+                    coverage.append((covered_start, min(covered_end, start)))
+                if covered_end > end:
+                    coverage.append((max(covered_start, end), covered_end))
+            self._save(symbol, interval, table, coverage)
+    
+    def _save(self, symbol: str, interval: str, table: pa.Table, coverage: List[Tuple[int, int]]):
+        table = table.replace_schema_metadata({'coverage': json.dumps(coverage)})
+        path = self.path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        # Uncompressed and in one chunk, so readers can memory-map whole columns
+        feather.write_feather(table, temporary, compression='uncompressed', chunksize=max(table.num_rows, 1))
+        os.replace(temporary, path)
+    
+    def symbols(self, interval: str) -> List[str]:
+        directory = os.path.join(self.root, interval)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len('.feather')] for name in os.listdir(directory) if name.endswith('.feather'))
+    
+    def stats(self) -> Dict:
+        return {
+            'path': self.root,
+            'files': {interval: len(self.symbols(interval)) for interval in INTERVALS}
+        }
+
+def aligned_range(interval: str, start: int = None, end: int = None) -> Tuple[int, int]:
+    """[start, end) snapped to bar boundaries, defaulting to the configured lookback up to now"""
+    step = interval_seconds(interval)
+    now = int(time.time())
+    end = now if end is None else min(end, now)
+    if start is None:
+        days = Config.HISTORY_DAILY_LOOKBACK_DAYS if interval == '1d' else Config.HISTORY_INTRADAY_LOOKBACK_DAYS
+        start = end - int(days * 86400)
+    return start // step * step, -(-end // step) * step
+
+def settled_until(interval: str) -> int:
+    """Start of the bar in progress; bars before it will not change any more"""
+    step = interval_seconds(interval)
+    return int(time.time()) // step * step
+
+# Shared by every history source and analyzer in the process
+bar_store = BarStore()
@@ -0,0 +1,480 @@
+import math
+import threading
+from datetime import time as clock
+from typing import Dict, Iterable, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay, USMartinLutherKingJr,
+                                    USMemorialDay, USPresidentsDay, USThanksgivingDay, nearest_workday,
+                                    sunday_to_monday)
+from models import Quote
+
+INDICATORS = ('sma', 'ema', 'rsi', 'macd', 'macd_signal', 'macd_hist',
+              'bb_upper', 'bb_middle', 'bb_lower', 'atr', 'vwap')
+
+class IndicatorParams(NamedTuple):
+    sma_window: int = 20
+    ema_span: int = 20
+    rsi_period: int = 14
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal: int = 9
+    bollinger_window: int = 20
+    bollinger_k: float = 2.0
+    atr_period: int = 14
+    vwap_window: Optional[int] = 20  # None anchors VWAP to each UTC session instead
+
+FIELDS = ('high', 'low', 'close', 'volume')
+
+class BarPanel(NamedTuple):
+    """Bars of many symbols as right-aligned (time x symbols) arrays
+    
+    Each symbol keeps its own bar sequence; shorter histories are padded with
+    leading NaN, so row -1 holds every symbol's latest bar.
+    """
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    timestamps: np.ndarray  # epoch seconds, -1 in padding
+    lengths: np.ndarray     # real bars per symbol
+
+def bar_panel(bars: Dict[str, pd.DataFrame], length: int) -> BarPanel:
+    """Stack the last `length` bars of every symbol into a BarPanel"""
+    values = np.full((len(FIELDS), length, len(bars)), np.nan)
+    timestamps = np.full((length, len(bars)), -1, dtype=np.int64)
+    lengths = np.zeros(len(bars), dtype=np.int64)
+    for j, frame in enumerate(bars.values()):
+        n = min(len(frame), length)
+        if n:
+            # Column by column: a multi-column getitem costs far more than the copy
+            for i, field in enumerate(FIELDS):
+                values[i, -n:, j] = frame[field].to_numpy(dtype=float)[-n:]
+            timestamps[-n:, j] = frame.index.as_unit('s').asi8[-n:]
+        lengths[j] = n
+    return BarPanel(*values, timestamps, lengths)
+
+def ewm(values: np.ndarray, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """Exponential smoothing down the rows for all columns at once (pandas ewm with adjust=False)"""
+    out = np.empty_like(values)
+    state = np.full(values.shape[1:], np.nan)
+    for i, row in enumerate(values):
+        state = np.where(np.isnan(state), row, np.where(np.isnan(row), state, state + alpha * (row - state)))
+        out[i] = state
+    if min_periods > 1:
+        out[np.cumsum(~np.isnan(values), axis=0) < min_periods] = np.nan
+    return out
+
+def rolling_sum(values: np.ndarray, window: int, min_periods: int = None) -> np.ndarray:
+    """Sum over the last `window` rows for all columns at once, NaN counting as missing"""
+    valid = ~np.isnan(values)
+    totals = np.cumsum(np.where(valid, values, 0.0), axis=0)
+    counts = np.cumsum(valid, axis=0)
+    totals[window:] = totals[window:] - totals[:-window].copy()
+    counts[window:] = counts[window:] - counts[:-window].copy()
+    totals[counts < (window if min_periods is None else min_periods)] = np.nan
+    return totals
+
+def compute_panels(bars: BarPanel, params: IndicatorParams) -> Dict[str, np.ndarray]:
+    """Every indicator for every symbol over a BarPanel
+    
+    Keys starting with '_' are the running state behind the indicators, used
+    to seed IncrementalIndicators.
+    """
+    p = params
+    high, low, close = bars.high, bars.low, bars.close
+    out = {'sma': rolling_sum(close, p.sma_window) / p.sma_window,
+           'ema': ewm(close, 2 / (p.ema_span + 1))}
+    
+    # RSI with Wilder smoothing of gains and losses
+    change = np.diff(close, axis=0, prepend=np.nan)
+    out['_gain'] = ewm(np.maximum(change, 0), 1 / p.rsi_period)
+    out['_loss'] = ewm(np.maximum(-change, 0), 1 / p.rsi_period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + out['_gain'] / out['_loss'])
+    rsi[np.cumsum(~np.isnan(change), axis=0) < p.rsi_period] = np.nan
+    out['rsi'] = rsi
+    
+    out['_macd_fast'] = ewm(close, 2 / (p.macd_fast + 1))
+    out['_macd_slow'] = ewm(close, 2 / (p.macd_slow + 1))
+    out['macd'] = out['_macd_fast'] - out['_macd_slow']
+    out['macd_signal'] = ewm(out['macd'], 2 / (p.macd_signal + 1))
+    out['macd_hist'] = out['macd'] - out['macd_signal']
+    
+    middle = rolling_sum(close, p.bollinger_window) / p.bollinger_window
+    variance = rolling_sum(close * close, p.bollinger_window) / p.bollinger_window - middle * middle
+    spread = p.bollinger_k * np.sqrt(np.clip(variance, 0, None))
+    out['bb_upper'], out['bb_middle'], out['bb_lower'] = middle + spread, middle, middle - spread
+    
+    # True range; the first bar of each symbol has no previous close and uses high - low
+    previous = np.roll(close, 1, axis=0)
+    previous[0] = np.nan
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+    true_range[np.isnan(close)] = np.nan
+    out['_atr'] = ewm(true_range, 1 / p.atr_period)
+    out['atr'] = np.where(np.cumsum(~np.isnan(true_range), axis=0) < p.atr_period, np.nan, out['_atr'])
+    
+    # Cumulative sums restarted at each session: the running total minus the
+    # total as it stood when the bar's session began
+    weighted = np.nan_to_num((high + low + close) / 3 * bars.volume)
+    volume = np.nan_to_num(bars.volume)
+    sessions = np.where(bars.timestamps >= 0, bars.timestamps // 86400, -1)
+    starts = np.ones_like(sessions, dtype=bool)
+    starts[1:] = sessions[1:] != sessions[:-1]
+    total_weighted, total_volume = weighted.cumsum(axis=0), volume.cumsum(axis=0)
+    out['_weighted'] = weighted
+    out['_session_weighted'] = total_weighted - _carry_forward(np.where(starts, total_weighted - weighted, np.nan))
+    out['_session_volume'] = total_volume - _carry_forward(np.where(starts, total_volume - volume, np.nan))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if p.vwap_window is not None:
+            vwap = rolling_sum(weighted, p.vwap_window, 1) / rolling_sum(volume, p.vwap_window, 1)
+        else:
+            vwap = out['_session_weighted'] / out['_session_volume']
+    vwap[np.isnan(close)] = np.nan
+    out['vwap'] = vwap
+    return out
+
+def _carry_forward(values: np.ndarray) -> np.ndarray:
+    """Fill each NaN with the last non-NaN value above it in its column"""
+    rows = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    return np.take_along_axis(values, np.maximum.accumulate(rows, axis=0), axis=0)
+
+class _Window:
+    """Fixed-size ring of the last `size` values with running sums"""
+    
+    __slots__ = ('values', 'size', 'count', 'position', 'total', 'squares')
+    
+    def __init__(self, size: int):
+        self.values = np.zeros(size)
+        self.size = size
+        self.count = 0
+        self.position = 0
+        self.total = 0.0
+        self.squares = 0.0
+    
+    def outgoing(self) -> float:
+        """The value the next push evicts (0 while the window is filling)"""
+        return self.values[self.position] if self.count == self.size else 0.0
+    
+    def fill(self, values: np.ndarray):
+        """Reset to hold `values` (at most `size` of them), oldest first"""
+        values = values[-self.size:]
+        self.values[:len(values)] = values
+        self.count = len(values)
+        self.position = len(values) % self.size
+        self.total = float(values.sum())
+        self.squares = float((values * values).sum())
+    
+    def push(self, value: float):
+        old = self.outgoing()
+        self.total += value - old
+        self.squares += value * value - old * old
+        self.values[self.position] = value
+        self.position = (self.position + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+def _ema(previous: Optional[float], value: float, alpha: float) -> float:
+    return value if previous is None else previous + alpha * (value - previous)
+
+class IncrementalIndicators:
+    """Indicator state for one symbol, advanced in O(1) per bar or quote
+    
+    State covers the committed bars; the latest bar stays pending, so a quote
+    for the bar in progress revises it rather than adding a bar. A bar with a
+    new timestamp commits the pending one first. Values match compute_panels()
+    over the same bars.
+    """
+    
+    def __init__(self, params: IndicatorParams):
+        self.params = params
+        self.count = 0
+        self.sma = _Window(params.sma_window)
+        self.bollinger = _Window(params.bollinger_window)
+        self.ema = self.macd_fast = self.macd_slow = self.macd_signal = None
+        self.previous_close = None
+        self.gain = self.loss = None
+        self.changes = 0
+        self.atr = None
+        self.session = None
+        self.session_weighted = self.session_volume = 0.0
+        self.vwap_weighted = _Window(params.vwap_window or 1)
+        self.vwap_volume = _Window(params.vwap_window or 1)
+        self.pending = None  # (timestamp, high, low, close, volume)
+        self.values = dict.fromkeys(INDICATORS, math.nan)
+        self._next = None  # state after committing the pending bar
+    
+    def update(self, timestamp: int, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """Apply a bar (or a revision of the pending bar) and return the current indicator values
+        
+        Bars older than the pending one are ignored; committed state never rewinds.
+        """
+        if self.pending is not None and timestamp < self.pending[0]:
+            return self.values
+        if self.pending is not None and timestamp != self.pending[0]:
+            self._commit()
+        self.pending = (timestamp, high, low, close, volume)
+        self._evaluate()
+        return self.values
+    
+    def _commit(self):
+        _, _, _, close, volume = self.pending
+        state = self._next
+        self.sma.push(close)
+        self.bollinger.push(close)
+        self.vwap_weighted.push(state['weighted'])
+        self.vwap_volume.push(volume)
+        self.ema, self.macd_fast, self.macd_slow, self.macd_signal = (
+            state['ema'], state['macd_fast'], state['macd_slow'], state['macd_signal'])
+        self.gain, self.loss, self.changes, self.atr = state['gain'], state['loss'], state['changes'], state['atr']
+        self.session, self.session_weighted, self.session_volume = (
+            state['session'], state['session_weighted'], state['session_volume'])
+        self.previous_close = close
+        self.count += 1
+    
+    def _evaluate(self):
+        p = self.params
+        timestamp, high, low, close, volume = self.pending
+        values = {}
+        
+        n = p.sma_window
+        values['sma'] = (self.sma.total - self.sma.outgoing() + close) / n if self.sma.count + 1 >= n else math.nan
+        ema = _ema(self.ema, close, 2 / (p.ema_span + 1))
+        values['ema'] = ema
+        
+        gain, loss, changes = self.gain, self.loss, self.changes
+        if self.previous_close is not None:
+            change = close - self.previous_close
+            gain = _ema(gain, max(change, 0.0), 1 / p.rsi_period)
+            loss = _ema(loss, max(-change, 0.0), 1 / p.rsi_period)
+            changes += 1
+        if changes >= p.rsi_period:
+            values['rsi'] = 100 - 100 / (1 + gain / loss) if loss else (100.0 if gain else math.nan)
+        else:
+            values['rsi'] = math.nan
+        
+        macd_fast = _ema(self.macd_fast, close, 2 / (p.macd_fast + 1))
+        macd_slow = _ema(self.macd_slow, close, 2 / (p.macd_slow + 1))
+        macd = macd_fast - macd_slow
+        macd_signal = _ema(self.macd_signal, macd, 2 / (p.macd_signal + 1))
+        values['macd'], values['macd_signal'], values['macd_hist'] = macd, macd_signal, macd - macd_signal
+        
+        n = p.bollinger_window
+        if self.bollinger.count + 1 >= n:
+            old = self.bollinger.outgoing()
+            middle = (self.bollinger.total - old + close) / n
+            variance = max((self.bollinger.squares - old * old + close * close) / n - middle * middle, 0.0)
+            spread = p.bollinger_k * math.sqrt(variance)
+            values['bb_upper'], values['bb_middle'], values['bb_lower'] = middle + spread, middle, middle - spread
+        else:
+            values['bb_upper'] = values['bb_middle'] = values['bb_lower'] = math.nan
+        
+        true_range = high - low if self.previous_close is None else max(
+            high - low, abs(high - self.previous_close), abs(low - self.previous_close))
+        atr = _ema(self.atr, true_range, 1 / p.atr_period)
+        values['atr'] = atr if self.count + 1 >= p.atr_period else math.nan
+        
+        weighted = (high + low + close) / 3 * volume
+        session = timestamp // 86400
+        session_weighted, session_volume = weighted, volume
+        if p.vwap_window is not None:
+            total_weighted = self.vwap_weighted.total - self.vwap_weighted.outgoing() + weighted
+            total_volume = self.vwap_volume.total - self.vwap_volume.outgoing() + volume
+        else:
+            if session == self.session:
+                session_weighted += self.session_weighted
+                session_volume += self.session_volume
+            total_weighted, total_volume = session_weighted, session_volume
+        values['vwap'] = total_weighted / total_volume if total_volume else math.nan
+        
+        self.values = values
+        self._next = {
+            'ema': ema, 'macd_fast': macd_fast, 'macd_slow': macd_slow, 'macd_signal': macd_signal,
+            'gain': gain, 'loss': loss, 'changes': changes, 'atr': atr, 'weighted': weighted,
+            'session': session, 'session_weighted': session_weighted, 'session_volume': session_volume
+        }
+    
+    @classmethod
+    def from_panels(cls, bars: BarPanel, panels: Dict[str, np.ndarray], column: int,
+                    params: IndicatorParams) -> 'IncrementalIndicators':
+        """State for one BarPanel column: every bar but the last committed, the last one pending"""
+        state = cls(params)
+        n = int(bars.lengths[column])
+        if n == 0:
+            return state
+        if n > 1:
+            row = len(bars.close) - 2
+            committed = slice(len(bars.close) - n, row + 1)
+            closes = bars.close[committed, column]
+            state.count = n - 1
+            state.sma.fill(closes)
+            state.bollinger.fill(closes)
+            state.vwap_weighted.fill(panels['_weighted'][committed, column])
+            state.vwap_volume.fill(np.nan_to_num(bars.volume[committed, column]))
+            state.previous_close = float(closes[-1])
+            state.ema = float(panels['ema'][row, column])
+            state.macd_fast = float(panels['_macd_fast'][row, column])
+            state.macd_slow = float(panels['_macd_slow'][row, column])
+            state.macd_signal = float(panels['macd_signal'][row, column])
+            state.atr = float(panels['_atr'][row, column])
+            state.changes = n - 2
+            if state.changes:
+                state.gain = float(panels['_gain'][row, column])
+                state.loss = float(panels['_loss'][row, column])
+            state.session = int(bars.timestamps[row, column]) // 86400
+            state.session_weighted = float(panels['_session_weighted'][row, column])
+            state.session_volume = float(panels['_session_volume'][row, column])
+        
+        last = -1
+        state.update(int(bars.timestamps[last, column]), float(bars.high[last, column]), float(bars.low[last, column]),
+                     float(bars.close[last, column]), float(np.nan_to_num(bars.volume[last, column])))
+        return state
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Full-day NYSE closures (early closes still count as sessions)"""
+    rules = [
+        # A Saturday New Year's Day is not observed on the Friday before
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-06-19', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas Day', month=12, day=25, observance=nearest_workday)
+    ]
+
+EXCHANGE_TIMEZONE = 'America/New_York'
+SESSION_HOURS = (clock(9, 30), clock(16, 0))
+TRADING_DAY = pd.offsets.CustomBusinessDay(calendar=NYSEHolidayCalendar())
+
+def _exchange_time(now: pd.Timestamp = None) -> pd.Timestamp:
+    return pd.Timestamp.now(tz=EXCHANGE_TIMEZONE) if now is None else pd.Timestamp(now).tz_convert(EXCHANGE_TIMEZONE)
+
+def trading_session(now: pd.Timestamp = None) -> Optional[pd.Timestamp]:
+    """The (naive) date of the US regular session open at `now` (default now), or None outside one"""
+    now = _exchange_time(now)
+    day = now.normalize().tz_localize(None)
+    open_, close = SESSION_HOURS
+    if not TRADING_DAY.is_on_offset(day) or not open_ <= now.time() <= close:
+        return None
+    return day
+
+def last_close(now: pd.Timestamp = None) -> pd.Timestamp:
+    """When the latest US regular session to have ended by `now` (default now) closed, in exchange time"""
+    now = _exchange_time(now)
+    day = now.normalize().tz_localize(None)
+    if not TRADING_DAY.is_on_offset(day) or now.time() < SESSION_HOURS[1]:
+        day = TRADING_DAY.rollback(day - pd.Timedelta(days=1))
+    return pd.Timestamp.combine(day, SESSION_HOURS[1]).tz_localize(EXCHANGE_TIMEZONE)
+
+class IndicatorEngine:
+    """SMA, EMA, RSI, MACD, Bollinger bands, ATR and VWAP for many symbols at once
+    
+    compute() and latest() evaluate whole bar histories for every symbol in a
+    handful of column-wise NumPy passes. seed() then keeps per-symbol
+    IncrementalIndicators so each later bar or quote costs O(1) per symbol.
+    """
+    
+    def __init__(self, interval: str = '1d', params: IndicatorParams = None):
+        self.interval = interval
+        if params is None:
+            # Intraday VWAP restarts each session; daily VWAP uses a rolling window
+            params = IndicatorParams() if interval == '1d' else IndicatorParams(vwap_window=None)
+        self.params = params
+        self._states = {}  # symbol -> IncrementalIndicators
+        self._lock = threading.Lock()
+    
+    def lookback(self) -> int:
+        """Bars needed for the slowest indicator to settle"""
+        p = self.params
+        return 4 * max(p.sma_window, p.ema_span, p.rsi_period, p.macd_slow + p.macd_signal,
+                       p.bollinger_window, p.atr_period, p.vwap_window or 0)
+    
+    def _panels(self, bars: Dict[str, pd.DataFrame], length: int):
+        stacked = bar_panel(bars, length)
+        return stacked, compute_panels(stacked, self.params)
+    
+    def compute(self, bars: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """Indicator series for each symbol, indexed like its bars"""
+        bars = {symbol: frame for symbol, frame in bars.items() if len(frame)}
+        if not bars:
+            return {}
+        length = max(len(frame) for frame in bars.values())
+        _, panels = self._panels(bars, length)
+        return {
+            symbol: pd.DataFrame({name: panels[name][length - len(frame):, j] for name in INDICATORS},
+                                 index=frame.index)
+            for j, (symbol, frame) in enumerate(bars.items())
+        }
+    
+    def latest(self, bars: Dict[str, pd.DataFrame], seed: bool = False) -> pd.DataFrame:
+        """Latest indicator values, one row per symbol, from the last `lookback()` bars
+        
+        With `seed`, the incremental state of each symbol is rebuilt from the
+        same pass, so later update() calls carry on from these values.
+        """
+        bars = {symbol: frame for symbol, frame in bars.items() if len(frame)}
+        if not bars:
+            return pd.DataFrame(columns=['close', *INDICATORS])
+        stacked, panels = self._panels(bars, min(self.lookback(), max(len(frame) for frame in bars.values())))
+        if seed:
+            states = {symbol: IncrementalIndicators.from_panels(stacked, panels, j, self.params)
+                      for j, symbol in enumerate(bars)}
+            with self._lock:
+                self._states.update(states)
+        latest = pd.DataFrame({name: panels[name][-1] for name in INDICATORS},
+                              index=pd.Index(list(bars), name='symbol'))
+        latest.insert(0, 'close', stacked.close[-1])
+        return latest
+    
+    def seed(self, bars: Dict[str, pd.DataFrame]):
+        """(Re)build incremental state for each symbol from its recent bars"""
+        self.latest(bars, seed=True)
+    
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._states
+    
+    def timestamp(self, symbol: str) -> Optional[int]:
+        """Start of the symbol's latest bar in epoch seconds, or None if it is not seeded"""
+        with self._lock:
+            state = self._states.get(symbol)
+            return None if state is None else state.pending[0]
+    
+    def update(self, symbol: str, timestamp: int, high: float, low: float, close: float,
+               volume: float = 0.0) -> Optional[Dict[str, float]]:
+        """Feed one bar, or a revision of the bar in progress; None if the symbol is not seeded"""
+        with self._lock:
+            state = self._states.get(symbol)
+            if state is None:
+                return None
+            return dict(state.update(timestamp, high, low, close, volume))
+    
+    def update_quote(self, quote: Quote, now: pd.Timestamp = None) -> Optional[Dict[str, float]]:
+        """Fold a daily quote taken at `now` (default now) into the bar of the session in progress
+        
+        Quotes taken outside regular NYSE hours (weekends, exchange holidays,
+        before the open, after the close) are skipped and return None: they
+        repeat a session whose bar came from history, and would otherwise open
+        a bar for a day without trading.
+        """
+        if quote.price is None:
+            return None
+        session = trading_session(now)
+        if session is None:
+            return None
+        return self.update(
+            quote.symbol, int(session.timestamp()),
+            quote.high if quote.high is not None else quote.price,
+            quote.low if quote.low is not None else quote.price,
+            quote.price, float(quote.volume or 0)
+        )
+    
+    def snapshot(self, symbols: Iterable[str] = None) -> pd.DataFrame:
+        """Current incremental indicator values, one row per seeded symbol"""
+        with self._lock:
+            symbols = list(self._states) if symbols is None else [s for s in symbols if s in self._states]
+            rows = [{'close': self._states[s].pending[3], **self._states[s].values} for s in symbols]
+        return pd.DataFrame(rows, index=pd.Index(symbols, name='symbol'), columns=['close', *INDICATORS])
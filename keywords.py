@@ -0,0 +1,129 @@
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Iterable, List, NamedTuple
+
+PRICE_KEYWORDS = [
+    'stock', 'price', 'share', 'trading', 'market', 'gain', 'loss',
+    'up', 'down', 'rise', 'fall', 'surge', 'drop', 'rally', 'decline',
+    'jump', 'plunge', 'soar', 'tumble', 'climb', 'sink', 'percent', '%',
+    'earnings', 'revenue', 'profit', 'sales', 'guidance', 'forecast',
+    'upgrade', 'downgrade', 'target', 'analyst', 'rating'
+]
+
+POSITIVE_WORDS = ['surge', 'gain', 'profit', 'growth', 'up', 'rise', 'bullish',
+                  'beat', 'strong', 'success', 'positive', 'boost', 'rally', 'soar',
+                  'jump', 'climb', 'upgrade', 'outperform', 'buy']
+
+NEGATIVE_WORDS = ['fall', 'drop', 'loss', 'decline', 'down', 'bearish',
+                  'miss', 'weak', 'negative', 'crash', 'plunge', 'concern',
+                  'tumble', 'sink', 'downgrade', 'sell', 'underperform']
+
+# Past forms that no suffix rule produces
+IRREGULAR_FORMS = {
+    'beat': ['beaten'],
+    'buy': ['bought'],
+    'fall': ['fell', 'fallen'],
+    'rise': ['rose', 'risen'],
+    'sell': ['sold'],
+    'sink': ['sank', 'sunk']
+}
+
+def inflections(word: str) -> List[str]:
+    """The word plus its inflections, so 'surge' also matches 'surges'/'surged'/'surging'
+    
+    Covers regular suffixes, doubled final consonants ('drop' -> 'dropped',
+    'dropping') and the irregular forms in IRREGULAR_FORMS ('fall' -> 'fell').
+    """
+    forms = [word, word + 's', word + 'es', word + 'ed', word + 'ing']
+    if word.endswith('e'):
+        forms += [word + 'd', word[:-1] + 'ing']
+    elif word.endswith('y'):
+        forms += [word[:-1] + 'ies', word[:-1] + 'ied']
+    elif re.search(r'(?:^|[^aeiou])[aeiou][^aeiouwxy]$', word):
+        # One vowel before a final consonant doubles it: drop -> dropped
+        forms += [word + word[-1] + 'ed', word + word[-1] + 'ing']
+    return forms + IRREGULAR_FORMS.get(word, [])
+
+PRICE, POSITIVE, NEGATIVE = 1, 2, 4
+
+class KeywordCounts(NamedTuple):
+    price: int
+    positive: int
+    negative: int
+    
+    @property
+    def price_related(self) -> bool:
+        return self.price > 0
+    
+    @property
+    def sentiment(self) -> str:
+        if self.positive > self.negative:
+            return 'positive'
+        if self.negative > self.positive:
+            return 'negative'
+        return 'neutral'
+
+class KeywordMatcher:
+    """Price-relevance and polarity keyword matching in one compiled regex pass
+    
+    Keywords match whole words (plus regular inflections), so 'up' no longer
+    matches 'supply' and 'buy' no longer matches 'buyback'. Each distinct
+    keyword found counts once towards every category it belongs to.
+    """
+    
+    def __init__(self, price_keywords: Iterable[str] = PRICE_KEYWORDS,
+                 positive_words: Iterable[str] = POSITIVE_WORDS,
+                 negative_words: Iterable[str] = NEGATIVE_WORDS):
+        self._flags = {}
+        for words, flag in ((price_keywords, PRICE), (positive_words, POSITIVE), (negative_words, NEGATIVE)):
+            for word in words:
+                word = word.lower()
+                self._flags[word] = self._flags.get(word, 0) | flag
+        
+        # Every surface form maps back to its keyword; '%' and similar symbols
+        # cannot carry word boundaries and are matched as-is
+        self._forms = {keyword: keyword for keyword in self._flags}
+        for keyword in self._flags:
+            for form in (inflections(keyword) if re.fullmatch(r'\w+', keyword) else [keyword]):
+                self._forms.setdefault(form, keyword)
+        
+        # Longest first so that e.g. 'upgrade' is preferred over 'up'
+        forms = sorted(self._forms, key=len, reverse=True)
+        words = '|'.join(re.escape(f) for f in forms if re.fullmatch(r'\w+', f))
+        symbols = '|'.join(re.escape(f) for f in forms if not re.fullmatch(r'\w+', f))
+        self._pattern = re.compile(rf'\b(?:{words})\b' + (f'|{symbols}' if symbols else ''))
+    
+    def _count(self, keywords: Iterable[str]) -> KeywordCounts:
+        price = positive = negative = 0
+        for keyword in keywords:
+            flags = self._flags[keyword]
+            price += flags & PRICE and 1
+            positive += flags & POSITIVE and 1
+            negative += flags & NEGATIVE and 1
+        return KeywordCounts(price, positive, negative)
+    
+    def classify(self, text: str) -> KeywordCounts:
+        """Count the distinct price, positive and negative keywords in `text`"""
+        return self._count({self._forms[m.group()] for m in self._pattern.finditer(text.lower())})
+    
+    def classify_many(self, texts: List[str]) -> List[KeywordCounts]:
+        """Classify many texts with a single scan over their concatenation"""
+        # Lowercase before measuring, since lower() can change a string's length
+        texts = [text.lower() for text in texts]
+        # Newline separators keep matches (and word boundaries) inside one text
+        joined = '\n'.join(texts)
+        ends = list(accumulate(len(text) + 1 for text in texts))
+        found = [set() for _ in texts]
+        for m in self._pattern.finditer(joined):
+            found[bisect_right(ends, m.start())].add(self._forms[m.group()])
+        return [self._count(keywords) for keywords in found]
+    
+    def is_price_related(self, text: str) -> bool:
+        return self.classify(text).price_related
+    
+    def sentiment(self, text: str) -> str:
+        return self.classify(text).sentiment
+
+# Shared by every news source in the process
+news_matcher = KeywordMatcher()
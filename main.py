@@ -18,12 +18,15 @@ def main():
     print("Stock Market Real-Time Data Analyzer")
     print("=" * 50)
     
+    # Fetch every symbol from every source in bulk up front
+    all_quotes = analyzer.get_quotes(symbols)
+    
     for symbol in symbols:
         print(f"\n{symbol}:")
         print("-" * 50)
         
         # Get best available quote
-        quote = analyzer.get_best_quote(symbol)
+        quote = analyzer.pick_best(all_quotes[symbol])
         
         if 'error' in quote:
             print(f"Error: {quote['error']}")
@@ -37,7 +40,7 @@ def main():
         
         # Compare all sources
         print("\nComparison across sources:")
-        df = analyzer.compare_sources(symbol)
+        df = analyzer.compare_sources(symbol, results=all_quotes[symbol])
         if not df.empty:
             print(df.to_string(index=False))
         else:
@@ -11,12 +11,24 @@ from mcp.server.models import InitializationOptions
 import mcp.types as types
 from mcp.server import NotificationOptions, Server
 import mcp.server.stdio
-from analyzer import StockAnalyzer
-from news_analyzer import NewsAnalyzer
+from analyzer import AsyncStockAnalyzer
+from news_analyzer import AsyncNewsAnalyzer
+from models import to_json
+from streaming import configured_stream
+from bar_aggregator import bar_aggregator
+from history_store import bar_records
+from refresher import WatchlistRefresher
+from config import Config
 
-# Initialize the analyzers
-stock_analyzer = StockAnalyzer()
-news_analyzer = NewsAnalyzer()
+# Initialize the analyzers (async, so lookups never block the event loop)
+stock_analyzer = AsyncStockAnalyzer()
+news_analyzer = AsyncNewsAnalyzer()
+
+# Real-time trade feed into the shared tick buffers, when STREAMING is enabled
+stream = configured_stream()
+
+# Background polling that keeps the shared quote cache warm, when REFRESHER is enabled
+refresher = WatchlistRefresher() if Config.REFRESHER else None
 
 # Create MCP server instance
 server = Server("stock-market-analyzer")
@@ -173,6 +185,139 @@ async def handle_list_tools() -> list[types.Tool]:
                 },
                 "required": ["symbol"]
             }
+        ),
+        types.Tool(
+            name="get_sentiment_trend",
+            description="Get time-decayed news sentiment for a stock over several half-lives (1 hour, 1 day, 1 week), with label counts and Alpha Vantage relevance-weighted scores, from ingested articles without calling any provider",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "symbol": {
+                        "type": "string",
+                        "description": "Stock symbol (e.g., AAPL, GOOGL, MSFT)"
+                    }
+                },
+                "required": ["symbol"]
+            }
+        ),
+        types.Tool(
+            name="search_news",
+            description="Full-text search of the local news archive (headlines and summaries) with symbol, source, sentiment and date filters; answers from stored articles without calling any provider",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Words that must all appear in the headline or summary (e.g., 'guidance raise'); append * for prefix matches"
+                    },
+                    "symbol": {
+                        "type": "string",
+                        "description": "Only articles about this stock symbol (e.g., NVDA)"
+                    },
+                    "source": {
+                        "type": "string",
+                        "enum": ["finnhub", "alphavantage", "yahoo"],
+                        "description": "Only articles from this news source"
+                    },
+                    "sentiment": {
+                        "type": "string",
+                        "enum": ["positive", "neutral", "negative"],
+                        "description": "Only articles with this sentiment"
+                    },
+                    "since": {
+                        "type": "string",
+                        "description": "Earliest publish date, ISO format (e.g., 2024-05-01)"
+                    },
+                    "until": {
+                        "type": "string",
+                        "description": "Publish date to stop before, ISO format (e.g., 2024-06-01)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of articles (default: 20)",
+                        "default": 20
+                    },
+                    "order": {
+                        "type": "string",
+                        "enum": ["recent", "relevance"],
+                        "description": "Newest first or best match first (default: recent)",
+                        "default": "recent"
+                    }
+                }
+            }
+        ),
+        types.Tool(
+            name="get_technical_indicators",
+            description="Get the latest SMA, EMA, RSI, MACD, Bollinger bands, ATR and VWAP for one or many stock symbols, computed from stored price history and updated with live quotes",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "symbols": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "List of stock symbols (e.g., ['AAPL', 'GOOGL', 'MSFT'])"
+                    },
+                    "interval": {
+                        "type": "string",
+                        "enum": ["1m", "5m", "15m", "30m", "60m", "1d"],
+                        "description": "Bar interval the indicators are computed on (default: 1d)",
+                        "default": "1d"
+                    },
+                    "sources": {
+                        "type": "array",
+                        "items": {
+                            "type": "string",
+                            "enum": ["yahoo", "alphavantage", "finnhub"]
+                        },
+                        "description": "History sources to fill missing bars from (default: all sources)"
+                    }
+                },
+                "required": ["symbols"]
+            }
+        ),
+        types.Tool(
+            name="get_live_trades",
+            description="Get the latest price and recent trades for a stock from the real-time trade stream, read from memory without calling any provider (requires STREAMING=true)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "symbol": {
+                        "type": "string",
+                        "description": "Stock symbol (e.g., AAPL, GOOGL, MSFT)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of recent trades (default: 100)",
+                        "default": 100
+                    }
+                },
+                "required": ["symbol"]
+            }
+        ),
+        types.Tool(
+            name="get_live_bars",
+            description="Get recent OHLCV bars built from the real-time trade stream, including the bar in progress, read from memory without calling any provider (requires STREAMING=true)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "symbol": {
+                        "type": "string",
+                        "description": "Stock symbol (e.g., AAPL, GOOGL, MSFT)"
+                    },
+                    "interval": {
+                        "type": "string",
+                        "enum": ["1s", "1m", "5m"],
+                        "description": "Bar interval (default: 1m)",
+                        "default": "1m"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of recent bars (default: 100)",
+                        "default": 100
+                    }
+                },
+                "required": ["symbol"]
+            }
         )
     ]
 
@@ -193,12 +338,12 @@ async def handle_call_tool(
             if not symbol:
                 raise ValueError("Symbol is required")
             
-            result = stock_analyzer.get_quote(symbol, sources=sources)
+            result = await stock_analyzer.get_quote(symbol, sources=sources)
             
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(result, indent=2)
+                    text=json.dumps(result, indent=2, default=to_json)
                 )
             ]
         
@@ -208,7 +353,7 @@ async def handle_call_tool(
             if not symbol:
                 raise ValueError("Symbol is required")
             
-            df = stock_analyzer.compare_sources(symbol)
+            df = await stock_analyzer.compare_sources(symbol)
             
             if df.empty:
                 result = {"error": "No data available from any source", "symbol": symbol}
@@ -221,7 +366,7 @@ async def handle_call_tool(
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(result, indent=2)
+                    text=json.dumps(result, indent=2, default=to_json)
                 )
             ]
         
@@ -231,12 +376,12 @@ async def handle_call_tool(
             if not symbol:
                 raise ValueError("Symbol is required")
             
-            result = stock_analyzer.get_best_quote(symbol)
+            result = await stock_analyzer.get_best_quote(symbol)
             
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(result, indent=2)
+                    text=json.dumps(result, indent=2, default=to_json)
                 )
             ]
         
@@ -247,15 +392,12 @@ async def handle_call_tool(
             if not symbols:
                 raise ValueError("Symbols list is required")
             
-            results = {}
-            for symbol in symbols:
-                symbol = symbol.upper()
-                results[symbol] = stock_analyzer.get_quote(symbol, sources=sources)
+            results = await stock_analyzer.get_quotes([symbol.upper() for symbol in symbols], sources=sources)
             
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(results, indent=2)
+                    text=json.dumps(results, indent=2, default=to_json)
                 )
             ]
         
@@ -267,12 +409,12 @@ async def handle_call_tool(
             if not symbol:
                 raise ValueError("Symbol is required")
             
-            result = news_analyzer.get_news(symbol, sources=sources, limit=limit)
+            result = await news_analyzer.get_news(symbol, sources=sources, limit=limit)
             
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(result, indent=2)
+                    text=json.dumps(result, indent=2, default=to_json)
                 )
             ]
         
@@ -282,12 +424,12 @@ async def handle_call_tool(
             if not symbol:
                 raise ValueError("Symbol is required")
             
-            result = news_analyzer.analyze_sentiment(symbol)
+            result = await news_analyzer.analyze_sentiment(symbol)
             
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(result, indent=2)
+                    text=json.dumps(result, indent=2, default=to_json)
                 )
             ]
         
@@ -300,12 +442,12 @@ async def handle_call_tool(
             if price_change is None:
                 raise ValueError("Price change is required")
             
-            result = news_analyzer.correlate_with_price(symbol, float(price_change))
+            result = await news_analyzer.correlate_with_price(symbol, float(price_change))
             
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(result, indent=2)
+                    text=json.dumps(result, indent=2, default=to_json)
                 )
             ]
         
@@ -315,7 +457,7 @@ async def handle_call_tool(
             if not symbol:
                 raise ValueError("Symbol is required")
             
-            result = news_analyzer.get_news_summary(symbol)
+            result = await news_analyzer.get_news_summary(symbol)
             
             return [
                 types.TextContent(
@@ -324,6 +466,98 @@ async def handle_call_tool(
                 )
             ]
         
+        elif name == "get_sentiment_trend":
+            symbol = arguments.get("symbol", "").upper()
+            
+            if not symbol:
+                raise ValueError("Symbol is required")
+            
+            result = await news_analyzer.get_sentiment_trend(symbol)
+            
+            return [
+                types.TextContent(
+                    type="text",
+                    text=json.dumps(result, indent=2, default=to_json)
+                )
+            ]
+        
+        elif name == "search_news":
+            symbol = arguments.get("symbol", "").upper()
+            
+            result = await news_analyzer.search_news(
+                arguments.get("query"),
+                symbol=symbol or None,
+                source=arguments.get("source"),
+                sentiment=arguments.get("sentiment"),
+                since=arguments.get("since"),
+                until=arguments.get("until"),
+                limit=arguments.get("limit", 20),
+                order=arguments.get("order", "recent")
+            )
+            
+            return [
+                types.TextContent(
+                    type="text",
+                    text=json.dumps(result, indent=2, default=to_json)
+                )
+            ]
+        
+        elif name == "get_technical_indicators":
+            symbols = arguments.get("symbols", [])
+            
+            if not symbols:
+                raise ValueError("Symbols list is required")
+            
+            results = await stock_analyzer.get_indicators(
+                symbols,
+                interval=arguments.get("interval", "1d"),
+                sources=arguments.get("sources")
+            )
+            
+            return [
+                types.TextContent(
+                    type="text",
+                    text=json.dumps(results, indent=2, default=to_json)
+                )
+            ]
+        
+        elif name == "get_live_trades":
+            symbol = arguments.get("symbol", "").upper()
+            
+            if not symbol:
+                raise ValueError("Symbol is required")
+            
+            # Symbols are streamed from their first request on
+            if stream is not None:
+                stream.subscribe([symbol])
+            result = await stock_analyzer.get_live_trades(symbol, limit=arguments.get("limit", 100))
+            
+            return [
+                types.TextContent(
+                    type="text",
+                    text=json.dumps(result, indent=2, default=to_json)
+                )
+            ]
+        
+        elif name == "get_live_bars":
+            symbol = arguments.get("symbol", "").upper()
+            
+            if not symbol:
+                raise ValueError("Symbol is required")
+            
+            if stream is not None:
+                stream.subscribe([symbol])
+            bars = await stock_analyzer.get_live_bars(
+                symbol, interval=arguments.get("interval", "1m"), limit=arguments.get("limit", 100)
+            )
+            
+            return [
+                types.TextContent(
+                    type="text",
+                    text=json.dumps(bar_records(bars), indent=2, default=to_json)
+                )
+            ]
+        
         else:
             raise ValueError(f"Unknown tool: {name}")
     
@@ -331,12 +565,30 @@ async def handle_call_tool(
         return [
             types.TextContent(
                 type="text",
-                text=json.dumps({"error": str(e)}, indent=2)
+                text=json.dumps({"error": str(e)}, indent=2, default=to_json)
             )
         ]
 
 async def main():
     """Run the MCP server"""
+    streaming = None
+    if stream is not None:
+        bar_aggregator.attach(stream.store)
+        bar_aggregator.start()
+        streaming = asyncio.create_task(stream.run())
+    if refresher is not None:
+        refresher.start()
+    try:
+        await serve()
+    finally:
+        if refresher is not None:
+            await asyncio.to_thread(refresher.stop)
+        if streaming is not None:
+            stream.stop()
+            await streaming
+            bar_aggregator.stop()
+
+async def serve():
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
         await server.run(
             read_stream,
@@ -0,0 +1,174 @@
+import sys
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Union
+import numpy as np
+import pandas as pd
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Record(Mapping):
+    """Slotted record that reads like the dicts it replaced
+    
+    Item access, `in`, `.get()` and iteration see only the fields that are
+    set (not None), so existing `'error' in result` and `quote.get('price')`
+    call sites keep working.
+    """
+    
+    __slots__ = ()
+    _fields = frozenset()
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self._fields:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+    
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields and getattr(self, key) is not None
+    
+    def __iter__(self):
+        return (field for field in self.__slots__ if getattr(self, field) is not None)
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{field}={getattr(self, field)!r}' for field in self)
+        return f'{type(self).__name__}({fields})'
+    
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in self}
+
+class Quote(Record):
+    """Point-in-time quote for one symbol from one provider"""
+    
+    __slots__ = ('symbol', 'price', 'change', 'change_percent', 'volume', 'market_cap',
+                 'high', 'low', 'open', 'previous_close', 'source')
+    _fields = frozenset(__slots__)
+    
+    def __init__(self, symbol: str, price: float = None, change: float = None, change_percent: float = None,
+                 volume: int = None, market_cap: int = None, high: float = None, low: float = None,
+                 open: float = None, previous_close: float = None, source: str = None):
+        self.symbol = _intern(symbol)
+        self.price = price
+        self.change = change
+        self.change_percent = change_percent
+        self.volume = volume
+        self.market_cap = market_cap
+        self.high = high
+        self.low = low
+        self.open = open
+        self.previous_close = previous_close
+        self.source = _intern(source)
+
+class NewsItem(Record):
+    """News article about a symbol from one provider"""
+    
+    __slots__ = ('headline', 'summary', 'source', 'url', 'datetime', 'published', 'sentiment', 'sentiment_score',
+                 'relevance_score', 'provider', 'data_source')
+    _fields = frozenset(__slots__)
+    
+    def __init__(self, headline: str, summary: str = None, source: str = None, url: str = None,
+                 datetime: str = None, sentiment: str = None, sentiment_score: float = None,
+                 relevance_score: float = None, provider: str = None, data_source: str = None,
+                 published: int = None):
+        self.headline = headline
+        self.summary = summary
+        self.source = _intern(source)
+        self.url = url
+        self.datetime = datetime
+        self.published = published  # epoch seconds; `datetime` is its display form
+        self.sentiment = _intern(sentiment)
+        self.sentiment_score = sentiment_score
+        self.relevance_score = relevance_score
+        self.provider = _intern(provider)
+        self.data_source = _intern(data_source)
+
+class ProviderError(Record):
+    """Failed lookup, returned in place of a Quote or NewsItem"""
+    
+    __slots__ = ('error', 'source')
+    _fields = frozenset(__slots__)
+    
+    def __init__(self, error: str, source: str = None):
+        self.error = error
+        self.source = _intern(source)
+
+QuoteResult = Union[Quote, ProviderError]
+NewsResult = Union[NewsItem, ProviderError]
+
+class QuoteBatch:
+    """Columnar quotes for many symbols
+    
+    Numeric fields live in growable NumPy arrays (NaN for missing values), so
+    to_frame() hands pandas array views instead of copying row by row.
+    """
+    
+    NUMERIC_FIELDS = ('price', 'change', 'change_percent', 'volume', 'market_cap',
+                      'high', 'low', 'open', 'previous_close')
+    
+    def __init__(self, capacity: int = 64):
+        self._size = 0
+        self.symbols = []
+        self.sources = []
+        self._columns = {field: np.full(capacity, np.nan) for field in self.NUMERIC_FIELDS}
+    
+    @classmethod
+    def from_quotes(cls, quotes: Iterable[Quote]) -> 'QuoteBatch':
+        quotes = [quote for quote in quotes if isinstance(quote, Quote)]
+        batch = cls(capacity=max(len(quotes), 1))
+        for quote in quotes:
+            batch.append(quote)
+        return batch
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def append(self, quote: Quote):
+        if self._size == len(self._columns['price']):
+            # Grow into new arrays so frames built earlier keep their own views
+            for field, column in self._columns.items():
+                grown = np.full(max(2 * len(column), 1), np.nan)
+                grown[:self._size] = column[:self._size]
+                self._columns[field] = grown
+        
+        for field, column in self._columns.items():
+            value = getattr(quote, field)
+            if value is not None:
+                column[self._size] = value
+        self.symbols.append(quote.symbol)
+        self.sources.append(quote.source)
+        self._size += 1
+    
+    def column(self, field: str) -> np.ndarray:
+        """View of one numeric column"""
+        return self._columns[field][:self._size]
+    
+    def to_frame(self) -> pd.DataFrame:
+        data = {
+            'symbol': pd.Categorical(self.symbols),
+            'source': pd.Categorical(self.sources)
+        }
+        data.update((field, self.column(field)) for field in self.NUMERIC_FIELDS)
+        return pd.DataFrame(data, copy=False)
+
+def to_json(value: Any) -> Any:
+    """json.dumps `default` hook for records"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def to_epoch(value: Union[int, float, str, datetime, None]) -> Optional[int]:
+    """Epoch seconds from epoch seconds, a datetime or an ISO date/time string (UTC unless it says otherwise)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
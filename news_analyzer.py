@@ -1,50 +1,104 @@
+import asyncio
+import contextvars
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
 from typing import List, Dict
-from news_sources import FinnhubNewsSource, AlphaVantageNewsSource, YahooFinanceNewsSource
+from news_sources import (FinnhubNewsSource, AlphaVantageNewsSource, YahooFinanceNewsSource,
+                          AsyncFinnhubNewsSource, AsyncAlphaVantageNewsSource, AsyncYahooFinanceNewsSource)
+import numpy as np
 import pandas as pd
-from collections import Counter
+from models import NewsItem, ProviderError
+from news_store import ArticleStore, article_store
+from dedup import NearDuplicateIndex
+from sentiment import label_codes
+from config import Config
 
-class NewsAnalyzer:
-    """Analyzer for stock-related news from multiple sources"""
+class NewsSnapshot:
+    """News for one symbol fetched once, shared by every view derived from it
     
-    def __init__(self):
-        self.sources = {
-            'finnhub': FinnhubNewsSource(),
-            'alphavantage': AlphaVantageNewsSource(),
-            'yahoo': YahooFinanceNewsSource()
-        }
+    `news` holds up to `limit` aggregated articles, most recent first, and
+    `sentiment` is computed from them when the snapshot is built.
+    """
     
-    def get_news(self, symbol: str, sources: List[str] = None, limit: int = 10) -> Dict:
-        """Get news from specified sources or all sources"""
-        if sources is None:
-            sources = list(self.sources.keys())
-        
-        results = {}
-        for source_name in sources:
-            if source_name in self.sources:
-                results[source_name] = self.sources[source_name].get_news(symbol, limit)
-        
-        return results
+    def __init__(self, symbol: str, results: Dict, news: List[NewsItem], sentiment: Dict, limit: int):
+        self.symbol = symbol
+        self.results = results
+        self.news = news
+        self.sentiment = sentiment
+        self.limit = limit
+        self.fetched_at = datetime.now()
     
-    def get_aggregated_news(self, symbol: str, limit: int = 20) -> List[Dict]:
-        """Get news from all sources and aggregate them"""
-        all_news = []
-        results = self.get_news(symbol, limit=limit)
-        
-        for source, news_list in results.items():
-            if isinstance(news_list, list):
-                for news_item in news_list:
-                    if 'error' not in news_item:
-                        all_news.append(news_item)
+    def top(self, limit: int) -> List[NewsItem]:
+        return self.news[:limit]
+
+class BaseNewsAnalyzer:
+    """News aggregation and scoring shared by the sync and async analyzers"""
+    
+    def _aggregate(self, results: Dict, limit: int) -> List[NewsItem]:
+        # Sources return their articles newest first, so a k-way merge yields
+        # the overall newest articles without sorting everything
+        news_lists = [
+            (news_item for news_item in news_list if 'error' not in news_item)
+            for news_list in results.values() if isinstance(news_list, list)
+        ]
+        merged = heapq.merge(*news_lists, key=lambda news_item: news_item.published or 0, reverse=True)
         
-        # Sort by datetime (most recent first)
-        all_news.sort(key=lambda x: x.get('datetime', ''), reverse=True)
+        # The same wire story often arrives from several providers; keep its newest copy
+        index = NearDuplicateIndex()
+        unique_news = []
+        for news_item in merged:
+            if not index.seen(news_item):
+                unique_news.append(news_item)
+                if len(unique_news) >= limit:
+                    break
         
-        return all_news[:limit]
+        return unique_news
     
-    def analyze_sentiment(self, symbol: str) -> Dict:
-        """Analyze overall sentiment from news"""
-        news = self.get_aggregated_news(symbol, limit=50)
-        
+    def _snapshot(self, symbol: str, results: Dict, limit: int) -> NewsSnapshot:
+        news = self._aggregate(results, limit)
+        return NewsSnapshot(symbol, results, news, self._sentiment_from_news(news), limit)
+    
+    def _snapshot_limit(self, limit: int = None) -> int:
+        return max(limit or 0, Config.NEWS_SNAPSHOT_LIMIT)
+    
+    def _article_count(self, results: Dict) -> int:
+        return sum(
+            1 for news_list in results.values() if isinstance(news_list, list)
+            for news_item in news_list if 'error' not in news_item
+        )
+    
+    def _archive(self, symbol: str, results: Dict):
+        """Keep fetched articles in the article store so later searches find them"""
+        if Config.ARCHIVE_FETCHED_NEWS:
+            for news_list in results.values():
+                if isinstance(news_list, list):
+                    self.store.add(symbol, news_list)
+    
+    def _search(self, query: str = None, symbol: str = None, source: str = None, sentiment: str = None,
+                since=None, until=None, limit: int = 20, order: str = 'recent') -> Dict:
+        provider = self.sources[source].name if source in self.sources else source
+        started = time.perf_counter()
+        hits = self.store.search(query, symbol=symbol, provider=provider, sentiment=sentiment,
+                                 since=since, until=until, limit=limit, order=order)
+        return {
+            'query': query,
+            'count': len(hits),
+            'results': [{'symbol': hit_symbol, **news_item.to_dict()} for hit_symbol, news_item in hits],
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+    
+    def _sentiment_trend(self, symbol: str) -> Dict:
+        trend = self.store.aggregates.get(symbol)
+        if trend is None:
+            return {'symbol': symbol, 'error': 'No articles ingested for this symbol yet'}
+        return trend
+    
+    def _timeout_error(self, source_name: str, timeout: float) -> List[ProviderError]:
+        return [ProviderError(f'Timed out after {timeout}s', self.sources[source_name].name)]
+    
+    def _sentiment_from_news(self, news: List[Dict]) -> Dict:
         if not news:
             return {
                 'overall_sentiment': 'neutral',
@@ -55,13 +109,10 @@ class NewsAnalyzer:
                 'total_articles': 0
             }
         
-        sentiments = [item.get('sentiment', 'neutral') for item in news if 'error' not in item]
-        sentiment_counts = Counter(sentiments)
-        
-        # Calculate weighted sentiment score
-        sentiment_weights = {'positive': 1, 'neutral': 0, 'negative': -1}
-        total_score = sum(sentiment_weights.get(s, 0) for s in sentiments)
-        avg_score = total_score / len(sentiments) if sentiments else 0
+        # Provider labels (including Alpha Vantage's somewhat-bullish etc.) as -1/0/1 codes
+        codes = label_codes(item.get('sentiment', 'neutral') for item in news if 'error' not in item)
+        negative_count, neutral_count, positive_count = np.bincount(codes + 1, minlength=3).tolist()
+        avg_score = float(codes.mean()) if codes.size else 0
         
         # Determine overall sentiment
         if avg_score > 0.2:
@@ -74,17 +125,14 @@ class NewsAnalyzer:
         return {
             'overall_sentiment': overall,
             'sentiment_score': round(avg_score, 2),
-            'positive_count': sentiment_counts.get('positive', 0),
-            'negative_count': sentiment_counts.get('negative', 0),
-            'neutral_count': sentiment_counts.get('neutral', 0),
-            'total_articles': len(sentiments),
+            'positive_count': positive_count,
+            'negative_count': negative_count,
+            'neutral_count': neutral_count,
+            'total_articles': int(codes.size),
             'recent_headlines': [item.get('headline', '') for item in news[:5]]
         }
     
-    def correlate_with_price(self, symbol: str, price_change: float) -> Dict:
-        """Correlate news sentiment with price movement"""
-        sentiment_analysis = self.analyze_sentiment(symbol)
-        
+    def _correlation(self, symbol: str, price_change: float, sentiment_analysis: Dict) -> Dict:
         # Determine if sentiment matches price movement
         sentiment = sentiment_analysis['overall_sentiment']
         correlation = 'unknown'
@@ -121,11 +169,7 @@ class NewsAnalyzer:
             }
         }
     
-    def get_news_summary(self, symbol: str) -> str:
-        """Get a text summary of recent news"""
-        news = self.get_aggregated_news(symbol, limit=5)
-        sentiment = self.analyze_sentiment(symbol)
-        
+    def _format_summary(self, symbol: str, news: List[Dict], sentiment: Dict) -> str:
         if not news:
             return f"No recent news found for {symbol}"
         
@@ -147,3 +191,295 @@ class NewsAnalyzer:
                 summary += f"   Source: {item.get('source', 'Unknown')} | {item.get('datetime', 'Unknown date')}\n"
         
         return summary
+
+class NewsAnalyzer(BaseNewsAnalyzer):
+    """Analyzer for stock-related news from multiple sources"""
+    
+    def __init__(self, store: ArticleStore = None):
+        self.sources = {
+            'finnhub': FinnhubNewsSource(),
+            'alphavantage': AlphaVantageNewsSource(),
+            'yahoo': YahooFinanceNewsSource()
+        }
+        self.store = store or article_store
+        self.executor = ThreadPoolExecutor(max_workers=Config.MAX_WORKERS, thread_name_prefix='news')
+    
+    def _submit(self, fn, *args, **kwargs):
+        """Submit to the pool in a copy of the caller's context so its rate-limit priority applies"""
+        return self.executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+    
+    def get_news(self, symbol: str, sources: List[str] = None, limit: int = 10,
+                 use_cache: bool = True, refresh: bool = False, enough: int = None) -> Dict:
+        """Get news from specified sources or all sources, fetched in parallel
+        
+        Sources still running after Config.NEWS_TIMEOUT are reported as a
+        timeout error. With `enough`, once that many articles have arrived the
+        remaining sources get only Config.NEWS_GRACE_PERIOD more seconds and
+        are then left out; they keep running in the background and fill the
+        cache for the next call.
+        """
+        if sources is None:
+            sources = list(self.sources.keys())
+        
+        futures = {}
+        for source_name in sources:
+            if source_name in self.sources:
+                future = self._submit(
+                    self.sources[source_name].get_news, symbol, limit, use_cache=use_cache, refresh=refresh
+                )
+                futures[future] = source_name
+        
+        results = {}
+        deadline = time.monotonic() + Config.NEWS_TIMEOUT
+        stopping_early = False
+        pending = set(futures)
+        while pending:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[futures[future]] = future.result()
+            if not stopping_early and enough is not None and self._article_count(results) >= enough:
+                stopping_early = True
+                deadline = min(deadline, time.monotonic() + Config.NEWS_GRACE_PERIOD)
+        
+        for future in pending:
+            future.cancel()
+            if not stopping_early:
+                results[futures[future]] = self._timeout_error(futures[future], Config.NEWS_TIMEOUT)
+        
+        # Keep the caller's source order
+        results = {source_name: results[source_name] for source_name in futures.values() if source_name in results}
+        # Archived in the background so disk writes never delay the answer
+        self._submit(self._archive, symbol, results)
+        return results
+    
+    def ingest(self, symbol: str, sources: List[str] = None) -> Dict:
+        """Append each source's articles published since its last ingest to the store
+        
+        Returns the number of new articles (or an error) per source.
+        """
+        if sources is None:
+            sources = list(self.sources.keys())
+        
+        futures = {
+            source_name: self._submit(self.sources[source_name].ingest, symbol, self.store)
+            for source_name in sources if source_name in self.sources
+        }
+        return {source_name: future.result() for source_name, future in futures.items()}
+    
+    def ingest_watchlist(self, symbols: List[str], topics: List[str] = None) -> Dict:
+        """Ingest news for many symbols, sharing upstream calls where the provider allows
+        
+        Alpha Vantage covers the whole watchlist with one batched call; the
+        other sources are ingested per symbol. Returns results keyed by source
+        and then by symbol.
+        """
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        batch = self._submit(self.sources['alphavantage'].ingest_batch, symbols, topics, self.store)
+        per_symbol = {
+            source_name: {symbol: self._submit(source.ingest, symbol, self.store) for symbol in symbols}
+            for source_name, source in self.sources.items() if source_name != 'alphavantage'
+        }
+        
+        results = {
+            source_name: {symbol: future.result() for symbol, future in futures.items()}
+            for source_name, futures in per_symbol.items()
+        }
+        results['alphavantage'] = batch.result()
+        return results
+    
+    def get_snapshot(self, symbol: str, limit: int = None, refresh: bool = False,
+                     stored: bool = False) -> NewsSnapshot:
+        """Fetch news for a symbol once, for the methods below to share via `snapshot=`
+        
+        `limit` raises how many articles the snapshot keeps. Every provider is
+        waited for (up to Config.NEWS_TIMEOUT), because sentiment and
+        correlation read from the snapshot and would otherwise see only the
+        fastest source; for headlines alone, get_aggregated_news() without a
+        snapshot returns early. With `stored` the snapshot is read from the
+        article store instead.
+        """
+        fetch_limit = self._snapshot_limit(limit)
+        if stored:
+            return self._snapshot(symbol, {'store': self.store.get(symbol, fetch_limit)}, fetch_limit)
+        results = self.get_news(symbol, limit=fetch_limit, refresh=refresh)
+        return self._snapshot(symbol, results, fetch_limit)
+    
+    def get_aggregated_news(self, symbol: str, limit: int = 20, refresh: bool = False,
+                            snapshot: NewsSnapshot = None) -> List[Dict]:
+        """Get news from all sources and aggregate them, returning once `limit` articles are in"""
+        if snapshot is not None:
+            return snapshot.top(limit)
+        return self._aggregate(self.get_news(symbol, limit=limit, refresh=refresh, enough=limit), limit)
+    
+    def analyze_sentiment(self, symbol: str, snapshot: NewsSnapshot = None) -> Dict:
+        """Analyze overall sentiment from news"""
+        return (snapshot or self.get_snapshot(symbol)).sentiment
+    
+    def correlate_with_price(self, symbol: str, price_change: float, snapshot: NewsSnapshot = None) -> Dict:
+        """Correlate news sentiment with price movement"""
+        return self._correlation(symbol, price_change, self.analyze_sentiment(symbol, snapshot))
+    
+    def get_news_summary(self, symbol: str, snapshot: NewsSnapshot = None) -> str:
+        """Get a text summary of recent news"""
+        snapshot = snapshot or self.get_snapshot(symbol)
+        return self._format_summary(symbol, snapshot.top(5), snapshot.sentiment)
+    
+    def get_sentiment_trend(self, symbol: str) -> Dict:
+        """Time-decayed sentiment per half-life from the articles ingested for the symbol
+        
+        Read in constant time from the article store's running aggregates;
+        no provider is called. After a restart the aggregates, label counts
+        included, are rebuilt only from stored articles published within
+        Config.SENTIMENT_REPLAY_HALF_LIVES of the longest half-life.
+        """
+        return self._sentiment_trend(symbol)
+    
+    def search_news(self, query: str = None, symbol: str = None, source: str = None, sentiment: str = None,
+                    since=None, until=None, limit: int = 20, order: str = 'recent') -> Dict:
+        """Full-text search of the local article archive, without calling any provider
+        
+        Filters are as in ArticleStore.search; `source` is a source key
+        ('finnhub', 'alphavantage', 'yahoo') or provider name.
+        """
+        return self._search(query, symbol, source, sentiment, since, until, limit, order)
+
+class AsyncNewsAnalyzer(BaseNewsAnalyzer):
+    """Asyncio analyzer for stock-related news from multiple sources"""
+    
+    def __init__(self, store: ArticleStore = None):
+        self.sources = {
+            'finnhub': AsyncFinnhubNewsSource(),
+            'alphavantage': AsyncAlphaVantageNewsSource(),
+            'yahoo': AsyncYahooFinanceNewsSource()
+        }
+        self.store = store or article_store
+    
+    async def get_news(self, symbol: str, sources: List[str] = None, limit: int = 10,
+                       use_cache: bool = True, refresh: bool = False, enough: int = None) -> Dict:
+        """Get news from specified sources or all sources, fetched concurrently
+        
+        Timeouts and `enough` work as in NewsAnalyzer.get_news; sources left
+        out early keep fetching in the background and fill the cache.
+        """
+        if sources is None:
+            sources = list(self.sources.keys())
+        
+        tasks = {}
+        for source_name in sources:
+            if source_name in self.sources:
+                task = asyncio.ensure_future(
+                    self.sources[source_name].get_news(symbol, limit, use_cache=use_cache, refresh=refresh)
+                )
+                tasks[task] = source_name
+        
+        loop = asyncio.get_running_loop()
+        results = {}
+        deadline = loop.time() + Config.NEWS_TIMEOUT
+        stopping_early = False
+        pending = set(tasks)
+        while pending:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                results[tasks[task]] = task.result()
+            if not stopping_early and enough is not None and self._article_count(results) >= enough:
+                stopping_early = True
+                deadline = min(deadline, loop.time() + Config.NEWS_GRACE_PERIOD)
+        
+        # Cancelling only stops waiting; the shared single-flight fetch underneath carries on
+        for task in pending:
+            task.cancel()
+            if not stopping_early:
+                results[tasks[task]] = self._timeout_error(tasks[task], Config.NEWS_TIMEOUT)
+        
+        # Keep the caller's source order
+        results = {source_name: results[source_name] for source_name in tasks.values() if source_name in results}
+        # Archived in the background so disk writes never delay the answer
+        loop.run_in_executor(None, self._archive, symbol, results)
+        return results
+    
+    async def get_news_for_symbols(self, symbols: List[str], sources: List[str] = None,
+                                   limit: int = 10) -> Dict[str, Dict]:
+        """Get news for many symbols concurrently, keyed by symbol and then by source"""
+        results = await asyncio.gather(*(self.get_news(symbol, sources, limit) for symbol in symbols))
+        return dict(zip(symbols, results))
+    
+    async def ingest(self, symbol: str, sources: List[str] = None) -> Dict:
+        """Append each source's articles published since its last ingest to the store"""
+        if sources is None:
+            sources = list(self.sources.keys())
+        
+        source_names = [source_name for source_name in sources if source_name in self.sources]
+        added = await asyncio.gather(*(
+            self.sources[source_name].ingest(symbol, self.store) for source_name in source_names
+        ))
+        return dict(zip(source_names, added))
+    
+    async def ingest_watchlist(self, symbols: List[str], topics: List[str] = None) -> Dict:
+        """Ingest news for many symbols, sharing upstream calls where the provider allows"""
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        source_names = [source_name for source_name in self.sources if source_name != 'alphavantage']
+        batch, *per_source = await asyncio.gather(
+            self.sources['alphavantage'].ingest_batch(symbols, topics, self.store),
+            *(
+                asyncio.gather(*(self.sources[source_name].ingest(symbol, self.store) for symbol in symbols))
+                for source_name in source_names
+            )
+        )
+        
+        results = {
+            source_name: dict(zip(symbols, added)) for source_name, added in zip(source_names, per_source)
+        }
+        results['alphavantage'] = batch
+        return results
+    
+    async def get_snapshot(self, symbol: str, limit: int = None, refresh: bool = False,
+                           stored: bool = False) -> NewsSnapshot:
+        """Fetch news for a symbol once, for the methods below to share via `snapshot=`
+        
+        `limit` raises how many articles the snapshot keeps. Every provider is
+        waited for (up to Config.NEWS_TIMEOUT), because sentiment and
+        correlation read from the snapshot and would otherwise see only the
+        fastest source; for headlines alone, get_aggregated_news() without a
+        snapshot returns early. With `stored` the snapshot is read from the
+        article store instead.
+        """
+        fetch_limit = self._snapshot_limit(limit)
+        if stored:
+            return self._snapshot(symbol, {'store': self.store.get(symbol, fetch_limit)}, fetch_limit)
+        results = await self.get_news(symbol, limit=fetch_limit, refresh=refresh)
+        return self._snapshot(symbol, results, fetch_limit)
+    
+    async def get_aggregated_news(self, symbol: str, limit: int = 20, refresh: bool = False,
+                                  snapshot: NewsSnapshot = None) -> List[Dict]:
+        """Get news from all sources and aggregate them, returning once `limit` articles are in"""
+        if snapshot is not None:
+            return snapshot.top(limit)
+        return self._aggregate(await self.get_news(symbol, limit=limit, refresh=refresh, enough=limit), limit)
+    
+    async def analyze_sentiment(self, symbol: str, snapshot: NewsSnapshot = None) -> Dict:
+        """Analyze overall sentiment from news"""
+        return (snapshot or await self.get_snapshot(symbol)).sentiment
+    
+    async def correlate_with_price(self, symbol: str, price_change: float, snapshot: NewsSnapshot = None) -> Dict:
+        """Correlate news sentiment with price movement"""
+        return self._correlation(symbol, price_change, await self.analyze_sentiment(symbol, snapshot))
+    
+    async def get_news_summary(self, symbol: str, snapshot: NewsSnapshot = None) -> str:
+        """Get a text summary of recent news"""
+        snapshot = snapshot or await self.get_snapshot(symbol)
+        return self._format_summary(symbol, snapshot.top(5), snapshot.sentiment)
+    
+    async def get_sentiment_trend(self, symbol: str) -> Dict:
+        """Time-decayed sentiment per half-life from the articles ingested for the symbol, as NewsAnalyzer's"""
+        return self._sentiment_trend(symbol)
+    
+    async def search_news(self, query: str = None, symbol: str = None, source: str = None, sentiment: str = None,
+                          since=None, until=None, limit: int = 20, order: str = 'recent') -> Dict:
+        """Full-text search of the local article archive, without calling any provider"""
+        return await asyncio.to_thread(self._search, query, symbol, source, sentiment, since, until, limit, order)
@@ -1,249 +1,551 @@
-import requests
+import asyncio
 from config import Config
-from typing import Dict, List
-from datetime import datetime, timedelta
+import transport
+from cache import default_cache, cached
+from models import NewsItem, ProviderError, NewsResult
+from keywords import news_matcher
+from sentiment import sentiment_scorer, LABELS
+from news_store import ArticleStore, article_store
+from typing import Dict, List, Optional, Tuple, Union
+from datetime import datetime, timedelta, timezone
+
+def format_timestamp(published: int) -> str:
+    """Display form of an epoch timestamp in UTC, shared by every provider's articles"""
+    return datetime.fromtimestamp(published, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def newest_first(news_items: List[NewsItem]) -> List[NewsItem]:
+    """Sources return articles newest first so the aggregator can merge them"""
+    news_items.sort(key=lambda item: item.published or 0, reverse=True)
+    return news_items
 
 class NewsSource:
     """Base class for news sources"""
     
-    def get_news(self, symbol: str, limit: int = 10) -> List[Dict]:
+    name = 'Unknown'
+    cache = default_cache
+    
+    matcher = news_matcher
+    scorer = sentiment_scorer
+    
+    def get_news(self, symbol: str, limit: int = 10) -> List[NewsResult]:
         raise NotImplementedError
+    
+    def ingest(self, symbol: str, store: ArticleStore = None) -> Union[int, ProviderError]:
+        """Append articles newer than the store's high-water mark to the store; returns how many were added"""
+        raise NotImplementedError
+    
+    def _store_new(self, symbol: str, raw_items: List[Dict], store: ArticleStore) -> int:
+        """Parse the raw items past the high-water mark, store them and advance the mark
+        
+        The mark moves past every new raw item, including ones that are not
+        price-related, so they are not downloaded and parsed again.
+        """
+        mark = store.high_water_mark(self.name, symbol)
+        fresh = [item for item in raw_items if mark is None or self._mark(item) > mark]
+        if not fresh:
+            return 0
+        
+        added = store.add(symbol, self._parse_fresh(symbol, fresh))
+        store.set_high_water_mark(self.name, symbol, max(self._mark(item) for item in fresh))
+        return added
+    
+    def _parse_fresh(self, symbol: str, raw_items: List[Dict]) -> List[NewsResult]:
+        return self._parse_news(raw_items, len(raw_items))
+    
+    def _classify(self, headlines: List[str], summaries: List[str]) -> List[Tuple[bool, str, float]]:
+        """(price related, sentiment label, sentiment score) per article, scored as one batch"""
+        counts = self.matcher.classify_many(headlines + summaries)
+        sentiment = self.scorer.score(headlines, summaries)
+        return [
+            (headline.price_related or summary.price_related, str(LABELS[code + 1]), round(float(score), 4))
+            for headline, summary, code, score in zip(
+                counts[:len(headlines)], counts[len(headlines):], sentiment.codes, sentiment.scores)
+        ]
 
 class FinnhubNewsSource(NewsSource):
     """Finnhub company news source"""
     
+    name = 'Finnhub'
+    
     def __init__(self):
         self.api_key = Config.FINNHUB_API_KEY
         self.base_url = Config.FINNHUB_BASE_URL
     
-    def get_news(self, symbol: str, limit: int = 10) -> List[Dict]:
+    @cached('news', Config.NEWS_CACHE_TTL)
+    def get_news(self, symbol: str, limit: int = 10) -> List[NewsResult]:
         if not self.api_key:
-            return [{'error': 'API key not configured', 'source': 'Finnhub'}]
+            return [ProviderError('API key not configured', 'Finnhub')]
         
-        # Get news from last 7 days
-        to_date = datetime.now()
-        from_date = to_date - timedelta(days=7)
+        try:
+            response = transport.get(
+                f'{self.base_url}/company-news',
+                params=self._news_params(symbol),
+                rate_key=(self.api_key, self.base_url)
+            )
+            return self._parse_news(response.json(), limit)
+        except Exception as e:
+            return [ProviderError(str(e), 'Finnhub')]
+    
+    def ingest(self, symbol: str, store: ArticleStore = None) -> Union[int, ProviderError]:
+        """Ingest company news published since the last ingest (the last 7 days on the first run)"""
+        store = store or article_store
+        if not self.api_key:
+            return ProviderError('API key not configured', 'Finnhub')
         
         try:
-            response = requests.get(
+            response = transport.get(
                 f'{self.base_url}/company-news',
-                params={
-                    'symbol': symbol,
-                    'from': from_date.strftime('%Y-%m-%d'),
-                    'to': to_date.strftime('%Y-%m-%d'),
-                    'token': self.api_key
-                },
-                timeout=10
+                params=self._news_params(symbol, store.high_water_mark(self.name, symbol)),
+                rate_key=(self.api_key, self.base_url)
             )
             data = response.json()
+            if not isinstance(data, list):
+                return ProviderError('No news available', 'Finnhub')
+            return self._store_new(symbol, data, store)
+        except Exception as e:
+            return ProviderError(str(e), 'Finnhub')
+    
+    @staticmethod
+    def _mark(item: Dict) -> Tuple[int, int]:
+        return (item.get('datetime', 0), item.get('id', 0))
+    
+    def _news_params(self, symbol: str, since: Tuple[int, int] = None) -> Dict:
+        # Get news from last 7 days, or from the day of the newest article already ingested;
+        # the API filters by date only, so items up to `since` are dropped after download
+        to_date = datetime.now()
+        from_date = datetime.fromtimestamp(since[0]) if since else to_date - timedelta(days=7)
+        return {
+            'symbol': symbol,
+            'from': from_date.strftime('%Y-%m-%d'),
+            'to': to_date.strftime('%Y-%m-%d'),
+            'token': self.api_key
+        }
+    
+    def _parse_news(self, data, limit: int) -> List[NewsResult]:
+        if isinstance(data, list):
+            items = data[:limit * 2]  # Get more to filter
+            headlines = [item.get('headline', 'No headline') for item in items]
+            summaries = [item.get('summary', 'No summary') for item in items]
             
-            if isinstance(data, list):
-                news_items = []
-                for item in data[:limit * 2]:  # Get more to filter
-                    headline = item.get('headline', 'No headline')
-                    summary = item.get('summary', 'No summary')
+            news_items = []
+            for item, headline, summary, (price_related, sentiment, sentiment_score) in zip(
+                    items, headlines, summaries, self._classify(headlines, summaries)):
+                # Check if news is price-related
+                if price_related:
+                    news_items.append(NewsItem(
+                        headline=headline,
+                        summary=summary,
+                        source=item.get('source', 'Unknown'),
+                        url=item.get('url', ''),
+                        datetime=format_timestamp(item.get('datetime', 0)),
+                        published=int(item.get('datetime', 0)),
+                        sentiment=sentiment,
+                        sentiment_score=sentiment_score,
+                        provider='Finnhub',
+                        data_source='Finnhub API'
+                    ))
                     
-                    # Check if news is price-related
-                    if self._is_price_related(headline + ' ' + summary):
-                        news_items.append({
-                            'headline': headline,
-                            'summary': summary,
-                            'source': item.get('source', 'Unknown'),
-                            'url': item.get('url', ''),
-                            'datetime': datetime.fromtimestamp(item.get('datetime', 0)).strftime('%Y-%m-%d %H:%M:%S'),
-                            'sentiment': self._analyze_sentiment(headline),
-                            'provider': 'Finnhub',
-                            'data_source': 'Finnhub API'
-                        })
-                        
-                        if len(news_items) >= limit:
-                            break
-                
-                return news_items if news_items else [{'error': 'No price-related news found', 'source': 'Finnhub'}]
-            return [{'error': 'No news available', 'source': 'Finnhub'}]
-        except Exception as e:
-            return [{'error': str(e), 'source': 'Finnhub'}]
-    
-    def _analyze_sentiment(self, text: str) -> str:
-        """Simple sentiment analysis based on keywords"""
-        text_lower = text.lower()
-        
-        positive_words = ['surge', 'gain', 'profit', 'growth', 'up', 'rise', 'bullish', 
-                         'beat', 'strong', 'success', 'positive', 'boost', 'rally', 'soar',
-                         'jump', 'climb', 'upgrade', 'outperform', 'buy']
-        negative_words = ['fall', 'drop', 'loss', 'decline', 'down', 'bearish', 
-                         'miss', 'weak', 'negative', 'crash', 'plunge', 'concern',
-                         'tumble', 'sink', 'downgrade', 'sell', 'underperform']
-        
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-        
-        if positive_count > negative_count:
-            return 'positive'
-        elif negative_count > positive_count:
-            return 'negative'
-        else:
-            return 'neutral'
-    
-    def _is_price_related(self, text: str) -> bool:
-        """Check if news is related to price movement"""
-        text_lower = text.lower()
-        
-        price_keywords = [
-            'stock', 'price', 'share', 'trading', 'market', 'gain', 'loss',
-            'up', 'down', 'rise', 'fall', 'surge', 'drop', 'rally', 'decline',
-            'jump', 'plunge', 'soar', 'tumble', 'climb', 'sink', 'percent', '%',
-            'earnings', 'revenue', 'profit', 'sales', 'guidance', 'forecast',
-            'upgrade', 'downgrade', 'target', 'analyst', 'rating'
-        ]
-        
-        return any(keyword in text_lower for keyword in price_keywords)
+                    if len(news_items) >= limit:
+                        break
+            
+            return newest_first(news_items) if news_items else [ProviderError('No price-related news found', 'Finnhub')]
+        return [ProviderError('No news available', 'Finnhub')]
 
 class AlphaVantageNewsSource(NewsSource):
     """Alpha Vantage news sentiment source"""
     
+    name = 'Alpha Vantage'
+    
     def __init__(self):
         self.api_key = Config.ALPHA_VANTAGE_API_KEY
         self.base_url = Config.ALPHA_VANTAGE_BASE_URL
     
-    def get_news(self, symbol: str, limit: int = 10) -> List[Dict]:
+    @cached('news', Config.NEWS_CACHE_TTL)
+    def get_news(self, symbol: str, limit: int = 10) -> List[NewsResult]:
         if not self.api_key:
-            return [{'error': 'API key not configured', 'source': 'Alpha Vantage'}]
+            return [ProviderError('API key not configured', 'Alpha Vantage')]
         
         try:
-            response = requests.get(
+            response = transport.get(
                 self.base_url,
-                params={
-                    'function': 'NEWS_SENTIMENT',
-                    'tickers': symbol,
-                    'apikey': self.api_key,
-                    'limit': limit * 2  # Get more to filter
-                },
-                timeout=10
+                params=self._news_params(symbol, limit),
+                rate_key=(self.api_key, self.base_url)
+            )
+            return self._parse_news(symbol, response.json(), limit)
+        except Exception as e:
+            return [ProviderError(str(e), 'Alpha Vantage')]
+    
+    def ingest(self, symbol: str, store: ArticleStore = None) -> Union[int, ProviderError]:
+        """Ingest news sentiment items published since the last ingest"""
+        store = store or article_store
+        if not self.api_key:
+            return ProviderError('API key not configured', 'Alpha Vantage')
+        
+        try:
+            response = transport.get(
+                self.base_url,
+                params=self._ingest_params(symbol, store.high_water_mark(self.name, symbol)),
+                rate_key=(self.api_key, self.base_url)
             )
             data = response.json()
+            if 'Note' in data or 'Information' in data:
+                return ProviderError(data.get('Note') or data['Information'], 'Alpha Vantage')
+            return self._store_new(symbol, data.get('feed', []), store)
+        except Exception as e:
+            return ProviderError(str(e), 'Alpha Vantage')
+    
+    @staticmethod
+    def _mark(item: Dict) -> str:
+        # time_published is YYYYMMDDTHHMMSS, so string order is time order
+        return item.get('time_published', '')
+    
+    @staticmethod
+    def _published(item: Dict) -> int:
+        """time_published (YYYYMMDDTHHMMSS, UTC) as epoch seconds"""
+        try:
+            published = datetime.strptime(item.get('time_published', ''), '%Y%m%dT%H%M%S')
+        except ValueError:
+            return 0
+        return int(published.replace(tzinfo=timezone.utc).timestamp())
+    
+    def _news_params(self, symbol: str, limit: int) -> Dict:
+        return {
+            'function': 'NEWS_SENTIMENT',
+            'tickers': symbol,
+            'apikey': self.api_key,
+            'limit': limit * 2  # Get more to filter
+        }
+    
+    def _ingest_params(self, symbol: str = None, since: str = None) -> Dict:
+        params = {
+            'function': 'NEWS_SENTIMENT',
+            'apikey': self.api_key,
+            'sort': 'LATEST',
+            'limit': Config.ALPHA_VANTAGE_NEWS_MAX
+        }
+        if symbol:
+            params['tickers'] = symbol
+        if since:
+            params['time_from'] = since[:13]  # YYYYMMDDTHHMM
+        return params
+    
+    def _parse_fresh(self, symbol: str, raw_items: List[Dict]) -> List[NewsResult]:
+        return self._parse_news(symbol, {'feed': raw_items}, len(raw_items))
+    
+    def ingest_batch(self, symbols: List[str], topics: List[str] = None,
+                     store: ArticleStore = None) -> Union[Dict[str, int], ProviderError]:
+        """Ingest news for a whole watchlist with one NEWS_SENTIMENT call
+        
+        `tickers` with several symbols only matches articles mentioning all of
+        them, so the call asks for the latest market-wide (or `topics`) feed and
+        fans each article out to every watched ticker in its ticker_sentiment,
+        with that ticker's own sentiment and relevance. Each symbol keeps its own
+        high-water mark, and the feed is asked to reach back to the oldest of
+        them. Returns the number of new articles per symbol.
+        """
+        store = store or article_store
+        if not self.api_key:
+            return ProviderError('API key not configured', 'Alpha Vantage')
+        
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        marks = self._batch_marks(symbols, topics, store)
+        try:
+            response = transport.get(
+                self.base_url,
+                params=self._batch_params(symbols, topics, self._since(marks)),
+                rate_key=(self.api_key, self.base_url)
+            )
+            return self._store_batch(symbols, topics, marks, response.json(), store)
+        except Exception as e:
+            return ProviderError(str(e), 'Alpha Vantage')
+    
+    @staticmethod
+    def _mark_keys(symbols: List[str], topics: List[str] = None) -> Dict[str, str]:
+        """High-water mark key per symbol, scoped to the feed the batch reads"""
+        # A single symbol reads its own feed, so it shares the per-symbol mark of ingest()
+        if len(symbols) == 1 and not topics:
+            return {symbols[0]: symbols[0]}
+        feed = 'topics:' + ','.join(sorted(topics)) if topics else 'market'
+        return {symbol: f'{feed}:{symbol}' for symbol in symbols}
+    
+    def _batch_marks(self, symbols: List[str], topics: List[str], store: ArticleStore) -> Dict[str, Optional[str]]:
+        return {
+            symbol: store.high_water_mark(self.name, key) for symbol, key in self._mark_keys(symbols, topics).items()
+        }
+    
+    @staticmethod
+    def _since(marks: Dict[str, Optional[str]]) -> Optional[str]:
+        # The feed has to reach back to the symbol ingested least recently
+        if not marks or None in marks.values():
+            return None
+        return min(marks.values())
+    
+    def _batch_params(self, symbols: List[str], topics: List[str] = None, since: str = None) -> Dict:
+        if len(symbols) == 1 and not topics:
+            return self._ingest_params(symbols[0], since)
+        
+        params = self._ingest_params(since=since)
+        if topics:
+            params['topics'] = ','.join(topics)
+        return params
+    
+    def _store_batch(self, symbols: List[str], topics: List[str], marks: Dict[str, Optional[str]], data: Dict,
+                     store: ArticleStore) -> Union[Dict[str, int], ProviderError]:
+        if 'Note' in data or 'Information' in data:
+            return ProviderError(data.get('Note') or data['Information'], 'Alpha Vantage')
+        
+        by_symbol = {symbol: [] for symbol in symbols}
+        for item in data.get('feed', []):
+            for ticker_sentiment in item.get('ticker_sentiment', []):
+                ticker = (ticker_sentiment.get('ticker') or '').upper()
+                if ticker in by_symbol and (marks[ticker] is None or self._mark(item) > marks[ticker]):
+                    by_symbol[ticker].append(item)
+        
+        added = {
+            symbol: store.add(symbol, self._parse_fresh(symbol, items)) if items else 0
+            for symbol, items in by_symbol.items()
+        }
+        keys = self._mark_keys(symbols, topics)
+        for symbol, items in by_symbol.items():
+            if items:
+                store.set_high_water_mark(self.name, keys[symbol], max(self._mark(item) for item in items))
+        return added
+    
+    def _parse_news(self, symbol: str, data: Dict, limit: int) -> List[NewsResult]:
+        # Throttled requests come back as HTTP 200 with a Note/Information message
+        if 'Note' in data or 'Information' in data:
+            return [ProviderError(data.get('Note') or data['Information'], 'Alpha Vantage')]
+        if 'feed' in data:
+            items = data['feed']
+            headlines = [item.get('title', 'No headline') for item in items]
+            summaries = [item.get('summary', 'No summary')[:200] + '...' for item in items]
             
-            if 'feed' in data:
-                news_items = []
-                for item in data['feed']:
-                    # Get ticker-specific sentiment
-                    ticker_sentiment = None
-                    if 'ticker_sentiment' in item:
-                        for ts in item['ticker_sentiment']:
-                            if ts.get('ticker') == symbol:
-                                ticker_sentiment = ts
-                                break
-                    
-                    headline = item.get('title', 'No headline')
-                    summary = item.get('summary', 'No summary')[:200] + '...'
-                    
-                    # Check if news is price-related
-                    if self._is_price_related(headline + ' ' + summary):
-                        sentiment_score = float(ticker_sentiment.get('ticker_sentiment_score', 0)) if ticker_sentiment else 0
-                        sentiment_label = ticker_sentiment.get('ticker_sentiment_label', 'Neutral') if ticker_sentiment else 'Neutral'
-                        
-                        news_items.append({
-                            'headline': headline,
-                            'summary': summary,
-                            'source': item.get('source', 'Unknown'),
-                            'url': item.get('url', ''),
-                            'datetime': item.get('time_published', ''),
-                            'sentiment': sentiment_label.lower(),
-                            'sentiment_score': sentiment_score,
-                            'relevance_score': float(ticker_sentiment.get('relevance_score', 0)) if ticker_sentiment else 0,
-                            'provider': 'Alpha Vantage',
-                            'data_source': 'Alpha Vantage News Sentiment API'
-                        })
-                        
-                        if len(news_items) >= limit:
+            news_items = []
+            for item, headline, summary, (price_related, *_) in zip(
+                    items, headlines, summaries, self._classify(headlines, summaries)):
+                # Get ticker-specific sentiment
+                ticker_sentiment = None
+                if 'ticker_sentiment' in item:
+                    for ts in item['ticker_sentiment']:
+                        if (ts.get('ticker') or '').upper() == symbol.upper():
+                            ticker_sentiment = ts
                             break
                 
-                return news_items if news_items else [{'error': 'No price-related news found', 'source': 'Alpha Vantage'}]
-            return [{'error': 'No news available', 'source': 'Alpha Vantage'}]
-        except Exception as e:
-            return [{'error': str(e), 'source': 'Alpha Vantage'}]
-    
-    def _is_price_related(self, text: str) -> bool:
-        """Check if news is related to price movement"""
-        text_lower = text.lower()
-        
-        price_keywords = [
-            'stock', 'price', 'share', 'trading', 'market', 'gain', 'loss',
-            'up', 'down', 'rise', 'fall', 'surge', 'drop', 'rally', 'decline',
-            'jump', 'plunge', 'soar', 'tumble', 'climb', 'sink', 'percent', '%',
-            'earnings', 'revenue', 'profit', 'sales', 'guidance', 'forecast',
-            'upgrade', 'downgrade', 'target', 'analyst', 'rating'
-        ]
-        
-        return any(keyword in text_lower for keyword in price_keywords)
+                # Check if news is price-related
+                if price_related:
+                    sentiment_score = float(ticker_sentiment.get('ticker_sentiment_score', 0)) if ticker_sentiment else 0
+                    sentiment_label = ticker_sentiment.get('ticker_sentiment_label', 'Neutral') if ticker_sentiment else 'Neutral'
+                    
+                    published = self._published(item)
+                    news_items.append(NewsItem(
+                        headline=headline,
+                        summary=summary,
+                        source=item.get('source', 'Unknown'),
+                        url=item.get('url', ''),
+                        datetime=format_timestamp(published),
+                        published=published,
+                        sentiment=sentiment_label.lower(),
+                        sentiment_score=sentiment_score,
+                        relevance_score=float(ticker_sentiment.get('relevance_score', 0)) if ticker_sentiment else 0,
+                        provider='Alpha Vantage',
+                        data_source='Alpha Vantage News Sentiment API'
+                    ))
+                    
+                    if len(news_items) >= limit:
+                        break
+            
+            return newest_first(news_items) if news_items else [ProviderError('No price-related news found', 'Alpha Vantage')]
+        return [ProviderError('No news available', 'Alpha Vantage')]
 
 class YahooFinanceNewsSource(NewsSource):
     """Yahoo Finance news (via yfinance)"""
     
-    def get_news(self, symbol: str, limit: int = 10) -> List[Dict]:
+    name = 'Yahoo Finance'
+    
+    @cached('news', Config.NEWS_CACHE_TTL)
+    def get_news(self, symbol: str, limit: int = 10) -> List[NewsResult]:
         try:
             import yfinance as yf
             ticker = yf.Ticker(symbol)
-            news = ticker.news
+            return self._parse_news(ticker.news, limit)
+        except Exception as e:
+            return [ProviderError(str(e), 'Yahoo Finance')]
+    
+    def ingest(self, symbol: str, store: ArticleStore = None) -> Union[int, ProviderError]:
+        """Ingest the articles in Yahoo's current news list published since the last ingest"""
+        store = store or article_store
+        try:
+            import yfinance as yf
+            return self._store_new(symbol, yf.Ticker(symbol).news or [], store)
+        except Exception as e:
+            return ProviderError(str(e), 'Yahoo Finance')
+    
+    @staticmethod
+    def _mark(item: Dict) -> int:
+        return item.get('providerPublishTime', 0)
+    
+    def _parse_news(self, news: List[Dict], limit: int) -> List[NewsResult]:
+        if news:
+            items = news[:limit * 2]  # Get more to filter
+            headlines = [item.get('title', 'No headline') for item in items]
+            summaries = [item.get('summary', 'No summary') for item in items]
             
-            if news:
-                news_items = []
-                for item in news[:limit * 2]:  # Get more to filter
-                    headline = item.get('title', 'No headline')
-                    summary = item.get('summary', 'No summary')
+            news_items = []
+            for item, headline, summary, (price_related, sentiment, sentiment_score) in zip(
+                    items, headlines, summaries, self._classify(headlines, summaries)):
+                # Check if news is price-related
+                if price_related:
+                    news_items.append(NewsItem(
+                        headline=headline,
+                        summary=summary,
+                        source=item.get('publisher', 'Yahoo Finance'),
+                        url=item.get('link', ''),
+                        datetime=format_timestamp(item.get('providerPublishTime', 0)),
+                        published=int(item.get('providerPublishTime', 0)),
+                        sentiment=sentiment,
+                        sentiment_score=sentiment_score,
+                        provider='Yahoo Finance',
+                        data_source='Yahoo Finance News API'
+                    ))
                     
-                    # Check if news is price-related
-                    if self._is_price_related(headline + ' ' + summary):
-                        news_items.append({
-                            'headline': headline,
-                            'summary': summary,
-                            'source': item.get('publisher', 'Yahoo Finance'),
-                            'url': item.get('link', ''),
-                            'datetime': datetime.fromtimestamp(item.get('providerPublishTime', 0)).strftime('%Y-%m-%d %H:%M:%S'),
-                            'sentiment': self._analyze_sentiment(headline),
-                            'provider': 'Yahoo Finance',
-                            'data_source': 'Yahoo Finance News API'
-                        })
-                        
-                        if len(news_items) >= limit:
-                            break
-                
-                return news_items if news_items else [{'error': 'No price-related news found', 'source': 'Yahoo Finance'}]
-            return [{'error': 'No news available', 'source': 'Yahoo Finance'}]
+                    if len(news_items) >= limit:
+                        break
+            
+            return newest_first(news_items) if news_items else [ProviderError('No price-related news found', 'Yahoo Finance')]
+        return [ProviderError('No news available', 'Yahoo Finance')]
+
+class AsyncNewsSource:
+    """Base class for asyncio news sources"""
+    
+    name = 'Unknown'
+    cache = default_cache
+    
+    async def get_news(self, symbol: str, limit: int = 10) -> List[NewsResult]:
+        raise NotImplementedError
+    
+    async def ingest(self, symbol: str, store: ArticleStore = None) -> Union[int, ProviderError]:
+        raise NotImplementedError
+
+class AsyncFinnhubNewsSource(AsyncNewsSource):
+    """Finnhub company news async source"""
+    
+    name = 'Finnhub'
+    
+    def __init__(self):
+        self.sync_source = FinnhubNewsSource()
+    
+    @cached('news', Config.NEWS_CACHE_TTL)
+    async def get_news(self, symbol: str, limit: int = 10) -> List[NewsResult]:
+        if not self.sync_source.api_key:
+            return [ProviderError('API key not configured', 'Finnhub')]
+        
+        try:
+            response = await transport.async_get(
+                f'{self.sync_source.base_url}/company-news',
+                params=self.sync_source._news_params(symbol),
+                rate_key=(self.sync_source.api_key, self.sync_source.base_url)
+            )
+            return self.sync_source._parse_news(response.json(), limit)
         except Exception as e:
-            return [{'error': str(e), 'source': 'Yahoo Finance'}]
-    
-    def _is_price_related(self, text: str) -> bool:
-        """Check if news is related to price movement"""
-        text_lower = text.lower()
-        
-        price_keywords = [
-            'stock', 'price', 'share', 'trading', 'market', 'gain', 'loss',
-            'up', 'down', 'rise', 'fall', 'surge', 'drop', 'rally', 'decline',
-            'jump', 'plunge', 'soar', 'tumble', 'climb', 'sink', 'percent', '%',
-            'earnings', 'revenue', 'profit', 'sales', 'guidance', 'forecast',
-            'upgrade', 'downgrade', 'target', 'analyst', 'rating'
-        ]
+            return [ProviderError(str(e), 'Finnhub')]
+    
+    async def ingest(self, symbol: str, store: ArticleStore = None) -> Union[int, ProviderError]:
+        store = store or article_store
+        if not self.sync_source.api_key:
+            return ProviderError('API key not configured', 'Finnhub')
         
-        return any(keyword in text_lower for keyword in price_keywords)
+        try:
+            # The store is SQLite and parsing scores sentiment, so both run off the event loop
+            since = await asyncio.to_thread(store.high_water_mark, self.name, symbol)
+            response = await transport.async_get(
+                f'{self.sync_source.base_url}/company-news',
+                params=self.sync_source._news_params(symbol, since),
+                rate_key=(self.sync_source.api_key, self.sync_source.base_url)
+            )
+            data = response.json()
+            if not isinstance(data, list):
+                return ProviderError('No news available', 'Finnhub')
+            return await asyncio.to_thread(self.sync_source._store_new, symbol, data, store)
+        except Exception as e:
+            return ProviderError(str(e), 'Finnhub')
+
+class AsyncAlphaVantageNewsSource(AsyncNewsSource):
+    """Alpha Vantage news sentiment async source"""
     
-    def _analyze_sentiment(self, text: str) -> str:
-        """Simple sentiment analysis based on keywords"""
-        text_lower = text.lower()
+    name = 'Alpha Vantage'
+    
+    def __init__(self):
+        self.sync_source = AlphaVantageNewsSource()
+    
+    @cached('news', Config.NEWS_CACHE_TTL)
+    async def get_news(self, symbol: str, limit: int = 10) -> List[NewsResult]:
+        if not self.sync_source.api_key:
+            return [ProviderError('API key not configured', 'Alpha Vantage')]
         
-        positive_words = ['surge', 'gain', 'profit', 'growth', 'up', 'rise', 'bullish', 
-                         'beat', 'strong', 'success', 'positive', 'boost', 'rally', 'soar',
-                         'jump', 'climb', 'upgrade', 'outperform', 'buy']
-        negative_words = ['fall', 'drop', 'loss', 'decline', 'down', 'bearish', 
-                         'miss', 'weak', 'negative', 'crash', 'plunge', 'concern',
-                         'tumble', 'sink', 'downgrade', 'sell', 'underperform']
+        try:
+            response = await transport.async_get(
+                self.sync_source.base_url,
+                params=self.sync_source._news_params(symbol, limit),
+                rate_key=(self.sync_source.api_key, self.sync_source.base_url)
+            )
+            return self.sync_source._parse_news(symbol, response.json(), limit)
+        except Exception as e:
+            return [ProviderError(str(e), 'Alpha Vantage')]
+    
+    async def ingest(self, symbol: str, store: ArticleStore = None) -> Union[int, ProviderError]:
+        store = store or article_store
+        if not self.sync_source.api_key:
+            return ProviderError('API key not configured', 'Alpha Vantage')
         
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
+        try:
+            since = await asyncio.to_thread(store.high_water_mark, self.name, symbol)
+            response = await transport.async_get(
+                self.sync_source.base_url,
+                params=self.sync_source._ingest_params(symbol, since),
+                rate_key=(self.sync_source.api_key, self.sync_source.base_url)
+            )
+            data = response.json()
+            if 'Note' in data or 'Information' in data:
+                return ProviderError(data.get('Note') or data['Information'], 'Alpha Vantage')
+            return await asyncio.to_thread(self.sync_source._store_new, symbol, data.get('feed', []), store)
+        except Exception as e:
+            return ProviderError(str(e), 'Alpha Vantage')
+    
+    async def ingest_batch(self, symbols: List[str], topics: List[str] = None,
+                           store: ArticleStore = None) -> Union[Dict[str, int], ProviderError]:
+        """Ingest news for a whole watchlist with one NEWS_SENTIMENT call, as AlphaVantageNewsSource.ingest_batch"""
+        store = store or article_store
+        if not self.sync_source.api_key:
+            return ProviderError('API key not configured', 'Alpha Vantage')
         
-        if positive_count > negative_count:
-            return 'positive'
-        elif negative_count > positive_count:
-            return 'negative'
-        else:
-            return 'neutral'
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        try:
+            marks = await asyncio.to_thread(self.sync_source._batch_marks, symbols, topics, store)
+            response = await transport.async_get(
+                self.sync_source.base_url,
+                params=self.sync_source._batch_params(symbols, topics, self.sync_source._since(marks)),
+                rate_key=(self.sync_source.api_key, self.sync_source.base_url)
+            )
+            return await asyncio.to_thread(
+                self.sync_source._store_batch, symbols, topics, marks, response.json(), store
+            )
+        except Exception as e:
+            return ProviderError(str(e), 'Alpha Vantage')
+
+class AsyncYahooFinanceNewsSource(AsyncNewsSource):
+    """Yahoo Finance async news source
+    
+    yfinance has no async API, so calls run in worker threads.
+    """
+    
+    name = 'Yahoo Finance'
+    
+    def __init__(self):
+        self.sync_source = YahooFinanceNewsSource()
+    
+    @cached('news', Config.NEWS_CACHE_TTL)
+    async def get_news(self, symbol: str, limit: int = 10) -> List[NewsResult]:
+        return await asyncio.to_thread(self.sync_source.get_news, symbol, limit, use_cache=False)
+    
+    async def ingest(self, symbol: str, store: ArticleStore = None) -> Union[int, ProviderError]:
+        return await asyncio.to_thread(self.sync_source.ingest, symbol, store)
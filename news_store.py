@@ -0,0 +1,274 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config import Config
+from models import NewsItem, to_epoch
+from dedup import NearDuplicateIndex, canonical_url
+from sentiment import LABEL_CODES, NEUTRAL
+from sentiment_aggregates import SentimentAggregates
+
+ITEM_COLUMNS = ('headline', 'summary', 'source', 'url', 'datetime', 'published', 'sentiment',
+                'sentiment_score', 'relevance_score', 'provider', 'data_source')
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    dedup_key TEXT NOT NULL,
+    sentiment_code INTEGER NOT NULL DEFAULT {NEUTRAL},
+    {', '.join(ITEM_COLUMNS)},
+    UNIQUE (symbol, dedup_key)
+);
+CREATE INDEX IF NOT EXISTS articles_symbol_published ON articles (symbol, published);
+CREATE INDEX IF NOT EXISTS articles_provider_published ON articles (provider, published);
+CREATE INDEX IF NOT EXISTS articles_published ON articles (published);
+
+-- Inverted index over headlines and summaries, kept in step with `articles` by the triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    headline, summary, content='articles', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, headline, summary) VALUES (new.id, new.headline, new.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, headline, summary)
+    VALUES ('delete', old.id, old.headline, old.summary);
+END;
+
+CREATE TABLE IF NOT EXISTS high_water_marks (
+    provider TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    mark TEXT NOT NULL,
+    PRIMARY KEY (provider, symbol)
+);
+"""
+
+INSERT_ARTICLE = (
+    f"INSERT OR IGNORE INTO articles (symbol, dedup_key, sentiment_code, {', '.join(ITEM_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * (3 + len(ITEM_COLUMNS)))})"
+)
+
+def match_expression(query: str) -> Optional[str]:
+    """FTS5 query matching every word of `query`; a trailing '*' keeps prefix matching
+    
+    Words are quoted, so punctuation in user input never reaches the FTS5
+    query parser.
+    """
+    terms = [f'"{word}"' + ('*' if star else '') for word, star in re.findall(r'(\w+)(\*?)', query or '')]
+    return ' '.join(terms) or None
+
+class ArticleStore:
+    """Thread-safe SQLite archive of ingested articles per symbol
+    
+    Articles persist across restarts in Config.ARTICLE_STORE_PATH (use
+    ':memory:' for a throwaway store), opened on first use rather than on
+    import. Exact repeats (same canonical URL, or headline when
+    there is no URL) are rejected by a unique key, and near-duplicate copies of
+    a story from another provider are not stored again. Headlines and summaries
+    are indexed with FTS5, so search() answers full-text queries with symbol,
+    provider, sentiment and time filters from the local index alone. Every new
+    article also updates the per-symbol decayed sentiment in `aggregates`. The store also records each
+    (provider, symbol) high-water mark so ingestion only has to ask providers for newer articles.
+    Symbols are uppercased on the way in and out, whatever case the caller uses.
+    """
+    
+    def __init__(self, path: str = None, retention_days: float = None, aggregates: SentimentAggregates = None):
+        self.path = path or Config.ARTICLE_STORE_PATH
+        self.retention_days = Config.ARTICLE_STORE_RETENTION_DAYS if retention_days is None else retention_days
+        self._aggregates = aggregates or SentimentAggregates()
+        self._connection = None
+        self._near = {}  # symbol -> NearDuplicateIndex
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+    
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """The database, opened, pruned and replayed into the aggregates on first use"""
+        if self._connection is None:
+            with self._open_lock:
+                if self._connection is None:
+                    self._open()
+        return self._connection
+    
+    @property
+    def aggregates(self) -> SentimentAggregates:
+        self._conn  # opening replays stored articles into them
+        return self._aggregates
+    
+    def _open(self):
+        # Runs under callers holding self._lock, so it must not take it
+        if self.path != ':memory:' and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(SCHEMA)
+        with conn:
+            self._prune(conn, self.retention_days)
+        self._replay(conn)
+        self._connection = conn
+    
+    @staticmethod
+    def _dedup_key(item: NewsItem) -> str:
+        return canonical_url(item.get('url')) or item.headline
+    
+    @staticmethod
+    def _item(row: sqlite3.Row) -> NewsItem:
+        return NewsItem(**{column: row[column] for column in ITEM_COLUMNS})
+    
+    def _replay(self, conn: sqlite3.Connection):
+        """Rebuild the sentiment aggregates from recently published stored articles"""
+        window = max(self._aggregates.half_lives) * Config.SENTIMENT_REPLAY_HALF_LIVES
+        rows = conn.execute(
+            'SELECT * FROM articles WHERE published >= ? ORDER BY published, id', (int(time.time() - window),)
+        )
+        for row in rows:
+            self._aggregates.update(row['symbol'], self._item(row), row['sentiment_code'])
+    
+    def add(self, symbol: str, items: Iterable[NewsItem]) -> int:
+        """Add articles for a symbol, skipping ones already stored; returns how many were new"""
+        symbol = symbol.upper()
+        with self._lock:
+            near = self._near.get(symbol)
+            if near is None:
+                near = self._near[symbol] = NearDuplicateIndex()
+            rows = [
+                (item, (symbol, self._dedup_key(item), LABEL_CODES.get((item.sentiment or '').lower(), NEUTRAL),
+                        *(getattr(item, column) for column in ITEM_COLUMNS)))
+                for item in items if isinstance(item, NewsItem) and not near.seen(item)
+            ]
+            added = 0
+            with self._conn:
+                for item, row in rows:
+                    if self._conn.execute(INSERT_ARTICLE, row).rowcount:
+                        # Only articles new to the archive move the sentiment aggregates
+                        self.aggregates.update(symbol, item, row[2])
+                        added += 1
+            return added
+    
+    def get(self, symbol: str, limit: int = None) -> List[NewsItem]:
+        """Stored articles for a symbol, most recent first"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT * FROM articles WHERE symbol = ? ORDER BY published DESC, id DESC LIMIT ?',
+                (symbol.upper(), -1 if limit is None else limit)
+            ).fetchall()
+        return [self._item(row) for row in rows]
+    
+    def search(self, query: str = None, symbol: str = None, provider: str = None, sentiment: str = None,
+               since=None, until=None, limit: int = 20, order: str = 'recent') -> List[Tuple[str, NewsItem]]:
+        """Full-text search of the archive; returns (symbol, article) pairs
+        
+        Every word of `query` must appear in the headline or summary (stemmed,
+        so 'raises' finds 'raised'). `sentiment` accepts any provider label and
+        matches its normalized polarity. `since`/`until` take epoch seconds,
+        datetimes or ISO dates. Results are newest first, or best match first
+        with order='relevance'.
+        """
+        if order not in ('recent', 'relevance'):
+            raise ValueError(f"order must be 'recent' or 'relevance', not {order!r}")
+        
+        clauses, params = [], []
+        expression = match_expression(query)
+        ranked = order == 'relevance' and expression is not None
+        if expression is not None:
+            clauses.append('articles_fts MATCH ?' if ranked else
+                           'articles.id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)')
+            params.append(expression)
+        if symbol:
+            clauses.append('symbol = ?')
+            params.append(symbol.upper())
+        if provider:
+            clauses.append('provider = ?')
+            params.append(provider)
+        if sentiment:
+            code = LABEL_CODES.get(sentiment.lower())
+            if code is None:
+                raise ValueError(f'Unknown sentiment: {sentiment}')
+            clauses.append('sentiment_code = ?')
+            params.append(code)
+        for bound, operator in ((to_epoch(since), '>='), (to_epoch(until), '<')):
+            if bound is not None:
+                clauses.append(f'published {operator} ?')
+                params.append(bound)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        
+        if ranked:
+            # bm25 ranks headline hits above summary hits
+            sql = (f'SELECT articles.* FROM articles_fts JOIN articles ON articles.id = articles_fts.rowid '
+                   f'{where} ORDER BY bm25(articles_fts, 2.0, 1.0) LIMIT ?')
+        else:
+            sql = f'SELECT * FROM articles {where} ORDER BY published DESC, id DESC LIMIT ?'
+        params.append(limit)
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [(row['symbol'], self._item(row)) for row in rows]
+    
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT DISTINCT symbol FROM articles')]
+    
+    def high_water_mark(self, provider: str, symbol: str) -> Optional[Any]:
+        """Newest article marker ingested from `provider` for `symbol`, or None before the first ingest"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT mark FROM high_water_marks WHERE provider = ? AND symbol = ?', (provider, symbol.upper())
+            ).fetchone()
+        if row is None:
+            return None
+        # Composite marks come back from JSON as lists; sources compare them as tuples
+        mark = json.loads(row[0])
+        return tuple(mark) if isinstance(mark, list) else mark
+    
+    def set_high_water_mark(self, provider: str, symbol: str, mark: Any):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO high_water_marks (provider, symbol, mark) VALUES (?, ?, ?)',
+                (provider, symbol.upper(), json.dumps(mark))
+            )
+    
+    def prune(self, retention_days: float = None) -> int:
+        """Delete articles published more than `retention_days` ago; returns how many went"""
+        retention_days = self.retention_days if retention_days is None else retention_days
+        with self._lock, self._conn:
+            return self._prune(self._conn, retention_days)
+    
+    @staticmethod
+    def _prune(conn: sqlite3.Connection, retention_days: float) -> int:
+        if not retention_days:
+            return 0
+        cutoff = int(time.time() - retention_days * 86400)
+        return conn.execute('DELETE FROM articles WHERE published > 0 AND published < ?', (cutoff,)).rowcount
+    
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM articles')
+            self._conn.execute('DELETE FROM high_water_marks')
+            self._near.clear()
+            self.aggregates.clear()
+    
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            symbols, articles = self._conn.execute('SELECT COUNT(DISTINCT symbol), COUNT(*) FROM articles').fetchone()
+            marks = self._conn.execute('SELECT COUNT(*) FROM high_water_marks').fetchone()[0]
+        return {
+            'path': self.path,
+            'symbols': symbols,
+            'articles': articles,
+            'high_water_marks': marks
+        }
+
+# Shared by every news source and analyzer in the process
+article_store = ArticleStore()
@@ -0,0 +1,161 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from config import Config
+
+# Request priorities: lower values are served first
+INTERACTIVE = 0
+BACKGROUND = 10
+
+_priority = contextvars.ContextVar('request_priority', default=INTERACTIVE)
+
+@contextlib.contextmanager
+def priority(level: int):
+    """Run the enclosed provider requests at the given priority"""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> int:
+    return _priority.get()
+
+class RateLimitExceeded(Exception):
+    """Raised instead of queueing when the estimated wait exceeds the caller's budget"""
+    
+    def __init__(self, retry_after: float):
+        super().__init__(f'Rate limit exceeded, retry in {retry_after:.1f}s')
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Token bucket that hands tokens to queued requests in priority order"""
+    
+    def __init__(self, requests: int, period: float):
+        self.rate = requests / period
+        self.capacity = requests
+        self._tokens = float(requests)
+        self._updated = time.monotonic()
+        self._waiters = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def _estimate_wait(self, priority: int) -> float:
+        ahead = sum(1 for waiter_priority, _ in self._waiters if waiter_priority <= priority)
+        return max(0.0, (ahead + 1 - self._tokens) / self.rate)
+    
+    def estimate_wait(self, priority: int = None) -> float:
+        """Seconds a new request at `priority` would wait for a token"""
+        with self._cond:
+            self._refill()
+            return self._estimate_wait(current_priority() if priority is None else priority)
+    
+    def remaining(self) -> float:
+        """Tokens currently available"""
+        with self._cond:
+            self._refill()
+            return self._tokens
+    
+    def acquire(self, priority: int = None, max_wait: float = None):
+        """Block until a token is granted, or raise RateLimitExceeded if that would take over `max_wait` seconds"""
+        if priority is None:
+            priority = current_priority()
+        if max_wait is None:
+            max_wait = Config.RATE_LIMIT_MAX_WAIT
+        
+        with self._cond:
+            self._refill()
+            wait = self._estimate_wait(priority)
+            if wait > max_wait:
+                raise RateLimitExceeded(wait)
+            
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] == entry:
+                        if self._tokens >= 1:
+                            self._tokens -= 1
+                            return
+                        self._cond.wait((1 - self._tokens) / self.rate)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._leave(entry)
+    
+    async def acquire_async(self, priority: int = None, max_wait: float = None):
+        """Like acquire(), but waits by sleeping on the event loop instead of blocking a thread"""
+        if priority is None:
+            priority = current_priority()
+        if max_wait is None:
+            max_wait = Config.RATE_LIMIT_MAX_WAIT
+        
+        with self._cond:
+            self._refill()
+            wait = self._estimate_wait(priority)
+            if wait > max_wait:
+                raise RateLimitExceeded(wait)
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+        try:
+            while True:
+                with self._cond:
+                    self._refill()
+                    # A token may be taken out of turn only if enough remain for every waiter ahead
+                    ahead = sum(1 for waiter in self._waiters if waiter < entry)
+                    if self._tokens >= ahead + 1:
+                        self._tokens -= 1
+                        return
+                    wait = (ahead + 1 - self._tokens) / self.rate
+                await asyncio.sleep(wait)
+        finally:
+            with self._cond:
+                self._leave(entry)
+    
+    def _leave(self, entry: Tuple[int, int]):
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+        self._cond.notify_all()
+
+class RateLimiter:
+    """Token buckets keyed per (API key, endpoint), sized from Config.RATE_LIMITS"""
+    
+    def __init__(self, limits: Dict[str, Tuple[int, float]] = None):
+        self.limits = Config.RATE_LIMITS if limits is None else limits
+        self._buckets = {}
+        self._lock = threading.Lock()
+    
+    def bucket(self, api_key: str, endpoint: str) -> Optional[TokenBucket]:
+        """Get the bucket for an API key and endpoint, or None if the endpoint is unlimited"""
+        if endpoint not in self.limits:
+            return None
+        with self._lock:
+            bucket = self._buckets.get((api_key, endpoint))
+            if bucket is None:
+                bucket = TokenBucket(*self.limits[endpoint])
+                self._buckets[(api_key, endpoint)] = bucket
+            return bucket
+    
+    def acquire(self, api_key: str, endpoint: str, priority: int = None, max_wait: float = None):
+        bucket = self.bucket(api_key, endpoint)
+        if bucket is not None:
+            bucket.acquire(priority, max_wait)
+    
+    async def acquire_async(self, api_key: str, endpoint: str, priority: int = None, max_wait: float = None):
+        bucket = self.bucket(api_key, endpoint)
+        if bucket is not None:
+            await bucket.acquire_async(priority, max_wait)
+
+# Shared by every provider request in the process
+rate_limiter = RateLimiter()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Background watchlist refresher
+Keeps quotes for watched and frequently requested symbols warm in the shared cache
+"""
+
+import argparse
+import heapq
+import itertools
+import math
+import os
+import signal
+import threading
+import time
+from typing import Dict, List, Optional
+from analyzer import StockAnalyzer
+from cache import SharedCache, cache_key, default_cache
+from config import Config
+from demand import symbol_demand
+from models import Quote
+from rate_limit import BACKGROUND, priority, rate_limiter
+import transport
+
+def read_watchlist(path: str) -> List[str]:
+    """Symbols in a watchlist file: one or more per line (comma or space separated), '#' starts a comment"""
+    if not os.path.exists(path):
+        return []
+    symbols = []
+    with open(path) as f:
+        for line in f:
+            symbols += line.split('#', 1)[0].replace(',', ' ').upper().split()
+    return list(dict.fromkeys(symbols))
+
+class SymbolSchedule:
+    """Polling state for one symbol"""
+    
+    __slots__ = ('price', 'observed', 'volatility', 'interval', 'due', 'failures')
+    
+    def __init__(self):
+        self.price = None
+        self.observed = None
+        self.volatility = None  # decayed mean |log return| per sqrt(second)
+        self.interval = Config.REFRESH_BASE_INTERVAL
+        self.due = 0.0
+        self.failures = 0
+    
+    def observe(self, quote: Quote, now: float):
+        if self.price and quote.price and self.observed is not None and now > self.observed:
+            move = abs(math.log(quote.price / self.price)) / math.sqrt(now - self.observed)
+            self.volatility = move if self.volatility is None else self.volatility + 0.3 * (move - self.volatility)
+        elif self.volatility is None and quote.change_percent is not None:
+            # Until two polls are seen, spread the day's move over a 6.5 hour session
+            self.volatility = abs(quote.change_percent) / 100 / math.sqrt(6.5 * 3600)
+        self.price = quote.price
+        self.observed = now
+        self.failures = 0
+    
+    def expected_move(self, seconds: float) -> float:
+        """Typical absolute move in percent over `seconds`"""
+        return 0.0 if self.volatility is None else 100 * self.volatility * math.sqrt(seconds)
+
+class WatchlistRefresher:
+    """Polls watched symbols in the background so user-facing quote lookups hit a warm cache
+    
+    Symbols come from the watchlist file (re-read when it changes) plus any
+    symbol users request often enough (see DemandTracker). A heap orders
+    symbols by their next due time; each poll sets the next one from how much
+    the price tends to move, how much the symbol is requested and how much of
+    the providers' rate budget is left, between REFRESH_MIN_INTERVAL and
+    REFRESH_MAX_INTERVAL. Polls run at BACKGROUND priority, so interactive
+    requests are served first by the rate limiter, and results are kept in
+    the cache until the next poll is due.
+    
+    Embed it with start()/stop() to warm the process's own cache, or run it
+    as a process with `python refresher.py`, which warms the SQLite cache at
+    SHARED_CACHE_PATH for front ends configured with the same file and stops
+    cleanly on SIGINT or SIGTERM.
+    """
+    
+    def __init__(self, analyzer: StockAnalyzer = None, watchlist: str = None, sources: List[str] = None,
+                 demand=None):
+        self.analyzer = analyzer or StockAnalyzer()
+        self.watchlist = watchlist or Config.WATCHLIST_PATH
+        self.sources = list(Config.REFRESH_SOURCES if sources is None else sources)
+        self.demand = demand or symbol_demand
+        self._schedules = {}  # symbol -> SymbolSchedule
+        self._queue = []  # heap of (due, sequence, symbol); stale entries are skipped
+        self._sequence = itertools.count()
+        self._watched = []
+        self._watchlist_mtime = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self.polls = 0
+        self.failures = 0
+    
+    def budget(self) -> float:
+        """Share of the refresh sources' rate-limit tokens still available (1.0 when unlimited)"""
+        shares = []
+        for name in self.sources:
+            source = self.analyzer.sources.get(name)
+            endpoint = getattr(source, 'base_url', None)
+            bucket = rate_limiter.bucket(getattr(source, 'api_key', ''), endpoint) if endpoint else None
+            if bucket is not None:
+                shares.append(bucket.remaining() / bucket.capacity)
+        return min(shares, default=1.0)
+    
+    def next_interval(self, symbol: str, schedule: SymbolSchedule) -> float:
+        """Seconds until the symbol's next poll
+        
+        The base interval shrinks with urgency: 1, plus the expected move per
+        base interval in units of REFRESH_VOLATILITY_SCALE percent, plus the
+        symbol's recent requests per demand half-life. It grows as the rate
+        budget runs down, and doubles with each consecutive failure.
+        """
+        base = Config.REFRESH_BASE_INTERVAL
+        urgency = 1 + schedule.expected_move(base) / Config.REFRESH_VOLATILITY_SCALE + self.demand.get(symbol)
+        interval = base / urgency / max(self.budget(), Config.REFRESH_MIN_BUDGET)
+        interval *= 2 ** min(schedule.failures, 5)
+        return min(max(interval, Config.REFRESH_MIN_INTERVAL), Config.REFRESH_MAX_INTERVAL)
+    
+    def _schedule(self, symbol: str, due: float):
+        schedule = self._schedules[symbol]
+        schedule.due = due
+        heapq.heappush(self._queue, (due, next(self._sequence), symbol))
+    
+    def _sync_symbols(self, now: float):
+        """Track the watchlist file and demand: new symbols are due now, dropped ones are forgotten"""
+        try:
+            mtime = os.path.getmtime(self.watchlist)
+        except OSError:
+            mtime = None
+        if mtime != self._watchlist_mtime:
+            self._watchlist_mtime = mtime
+            self._watched = read_watchlist(self.watchlist)
+        
+        symbols = dict.fromkeys(self._watched)
+        symbols.update(dict.fromkeys(self.demand.above(Config.REFRESH_DEMAND_THRESHOLD, now)))
+        with self._lock:
+            for symbol in list(self._schedules):
+                if symbol not in symbols:
+                    del self._schedules[symbol]
+            for symbol in symbols:
+                if symbol not in self._schedules:
+                    self._schedules[symbol] = SymbolSchedule()
+                    self._schedule(symbol, now)
+    
+    def _pop_due(self, now: float) -> List[str]:
+        due = []
+        with self._lock:
+            while self._queue and self._queue[0][0] <= now and len(due) < Config.REFRESH_BATCH_SIZE:
+                when, _, symbol = heapq.heappop(self._queue)
+                schedule = self._schedules.get(symbol)
+                # Skip entries for dropped symbols or superseded by a reschedule
+                if schedule is not None and schedule.due == when:
+                    due.append(symbol)
+        return due
+    
+    def _next_due(self) -> Optional[float]:
+        with self._lock:
+            return self._queue[0][0] if self._queue else None
+    
+    def refresh(self, symbols: List[str]) -> Dict[str, float]:
+        """Poll symbols now, warm the cache and reschedule them; returns each symbol's next interval"""
+        with priority(BACKGROUND):
+            results = self.analyzer.get_quotes(symbols, sources=self.sources, refresh=True)
+        now = time.time()
+        intervals = {}
+        with self._lock:
+            for symbol in symbols:
+                schedule = self._schedules.get(symbol)
+                if schedule is None:
+                    continue
+                by_source = results.get(symbol, {})
+                best = self.analyzer.pick_best(by_source)
+                self.polls += 1
+                if 'error' in best:
+                    schedule.failures += 1
+                    self.failures += 1
+                else:
+                    schedule.observe(best, now)
+                schedule.interval = intervals[symbol] = self.next_interval(symbol, schedule)
+                self._warm(symbol, by_source, schedule.interval)
+                self._schedule(symbol, now + schedule.interval)
+        return intervals
+    
+    def _warm(self, symbol: str, by_source: Dict, interval: float):
+        """Keep fresh quotes cached until the symbol's next poll, however short the provider TTL"""
+        for name, quote in by_source.items():
+            source = self.analyzer.sources[name]
+            if 'error' not in quote and source.cache is not None:
+                ttl = Config.QUOTE_CACHE_TTL.get(source.name, Config.DEFAULT_CACHE_TTL)
+                source.cache.set(cache_key(source.name, symbol, 'quote'), quote,
+                                 max(ttl, interval + Config.REFRESH_MIN_INTERVAL))
+    
+    def run(self):
+        """Refresh until stop() is called; an in-flight batch is finished first"""
+        while not self._stopping.is_set():
+            now = time.time()
+            self._sync_symbols(now)
+            due = self._pop_due(now)
+            if due:
+                self.refresh(due)
+                continue
+            next_due = self._next_due()
+            # Wake at least once a second to notice watchlist and demand changes
+            self._stopping.wait(1.0 if next_due is None else min(max(next_due - now, 0.0), 1.0))
+    
+    def start(self) -> threading.Thread:
+        """Run in a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self.run, name='watchlist-refresher', daemon=True)
+            self._thread.start()
+        return self._thread
+    
+    def stop(self, timeout: float = None):
+        self._stopping.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            upcoming = sorted(self._schedules.items(), key=lambda item: item[1].due)[:10]
+            return {
+                'watchlist': self.watchlist,
+                'symbols': len(self._schedules),
+                'polls': self.polls,
+                'failures': self.failures,
+                'next': [
+                    {'symbol': symbol, 'due_in': round(schedule.due - time.time(), 1),
+                     'interval': round(schedule.interval, 1)}
+                    for symbol, schedule in upcoming
+                ]
+            }
+
+def main():
+    parser = argparse.ArgumentParser(description='Keep quotes for a watchlist warm in the background')
+    parser.add_argument('--watchlist', default=Config.WATCHLIST_PATH, help='Watchlist file, one symbol per line')
+    parser.add_argument('--sources', default=','.join(Config.REFRESH_SOURCES),
+                        help='Comma-separated quote sources to poll')
+    parser.add_argument('--cache', default=Config.SHARED_CACHE_PATH,
+                        help='Shared cache file the front ends read (default SHARED_CACHE_PATH)')
+    args = parser.parse_args()
+    
+    # Another process only sees what this one polls through the shared cache
+    if not args.cache:
+        parser.error('a standalone refresher needs a shared cache: set SHARED_CACHE_PATH (or pass --cache) '
+                     'to the file the dashboards and MCP server use')
+    if default_cache.shared is None or default_cache.shared.path != args.cache:
+        default_cache.shared = SharedCache(args.cache)
+    refresher = WatchlistRefresher(watchlist=args.watchlist, sources=args.sources.split(','))
+    
+    def shutdown(signum, frame):
+        print(f"\nReceived {signal.Signals(signum).name}, finishing the current batch...")
+        refresher.stop()
+    
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    
+    print(f"Refreshing symbols from {args.watchlist} into {args.cache} (Ctrl+C to stop)")
+    try:
+        refresher.run()
+    finally:
+        refresher.analyzer.executor.shutdown(wait=False, cancel_futures=True)
+        transport.close_sessions()
+        print(f"Stopped after {refresher.polls} polls")
+
+if __name__ == '__main__':
+    main()
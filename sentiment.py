@@ -0,0 +1,117 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+from config import Config
+from keywords import inflections
+
+# Polarity weight per keyword; strong moves and explicit ratings outweigh
+# generic direction words like 'up' and 'down'
+LEXICON = {
+    'surge': 2.0, 'soar': 2.0, 'rally': 1.5, 'jump': 1.5, 'climb': 1.0, 'rise': 1.0, 'gain': 1.0,
+    'up': 0.5, 'growth': 1.0, 'profit': 1.0, 'beat': 1.5, 'strong': 1.0, 'success': 1.0,
+    'positive': 1.0, 'boost': 1.0, 'bullish': 2.0, 'upgrade': 1.5, 'outperform': 1.5, 'buy': 1.0,
+    'record': 0.5, 'tops': 1.0,
+    'crash': -2.0, 'plunge': -2.0, 'tumble': -1.5, 'sink': -1.5, 'drop': -1.0, 'fall': -1.0,
+    'decline': -1.0, 'down': -0.5, 'loss': -1.0, 'miss': -1.5, 'weak': -1.0, 'negative': -1.0,
+    'concern': -1.0, 'bearish': -2.0, 'downgrade': -1.5, 'underperform': -1.5, 'sell': -1.0,
+    'lawsuit': -1.0, 'probe': -1.0, 'cut': -0.5
+}
+
+# Label codes; LABELS[code + 1] is the label name
+NEGATIVE, NEUTRAL, POSITIVE = -1, 0, 1
+LABELS = np.array(['negative', 'neutral', 'positive'])
+
+# Provider labels mapped onto the three codes; Alpha Vantage reports
+# Bearish / Somewhat-Bearish / Neutral / Somewhat_Bullish / Bullish
+LABEL_CODES = {
+    'positive': POSITIVE, 'bullish': POSITIVE, 'somewhat-bullish': POSITIVE, 'somewhat_bullish': POSITIVE,
+    'negative': NEGATIVE, 'bearish': NEGATIVE, 'somewhat-bearish': NEGATIVE, 'somewhat_bearish': NEGATIVE,
+    'neutral': NEUTRAL
+}
+
+TOKEN_PATTERN = r"[a-z]+"
+
+def label_codes(labels: Iterable[Optional[str]]) -> np.ndarray:
+    """Normalize sentiment labels from any provider to an int8 array of label codes"""
+    return np.fromiter(
+        (LABEL_CODES.get(label.lower(), NEUTRAL) if label else NEUTRAL for label in labels),
+        dtype=np.int8
+    )
+
+class SentimentScores(NamedTuple):
+    scores: np.ndarray  # polarity in [-1, 1]
+    codes: np.ndarray   # NEGATIVE / NEUTRAL / POSITIVE
+    
+    @property
+    def labels(self) -> np.ndarray:
+        return LABELS[self.codes + 1]
+
+class SentimentScorer:
+    """Vectorized lexicon sentiment scoring for batches of headlines
+    
+    Texts are tokenized and looked up in the weighted lexicon column-wise with
+    pandas, then reduced per article with NumPy, so there is no Python loop
+    per article. Very large corpora can be split across worker processes.
+    """
+    
+    def __init__(self, lexicon: Dict[str, float] = None, summary_weight: float = 0.5):
+        self.summary_weight = summary_weight
+        self.lexicon = {}
+        for word, weight in (LEXICON if lexicon is None else lexicon).items():
+            for form in inflections(word):
+                self.lexicon.setdefault(form, weight)
+            self.lexicon[word] = weight
+    
+    def _weights(self, texts: pd.Series) -> tuple:
+        """Summed positive and negative lexicon weight per text"""
+        tokens = texts.fillna('').astype(str).str.lower().str.findall(TOKEN_PATTERN).explode()
+        weights = tokens.map(self.lexicon).to_numpy(dtype=float, na_value=np.nan)
+        rows = tokens.index.to_numpy(dtype=np.intp)
+        found = ~np.isnan(weights)
+        rows, weights = rows[found], weights[found]
+        # bincount yields ints when nothing matched; scoring adds floats in place
+        positive = np.bincount(rows, weights=np.clip(weights, 0, None), minlength=len(texts)).astype(float)
+        negative = np.bincount(rows, weights=np.clip(-weights, 0, None), minlength=len(texts)).astype(float)
+        return positive, negative
+    
+    def _score(self, headlines: np.ndarray, summaries: Optional[np.ndarray]) -> SentimentScores:
+        positive, negative = self._weights(pd.Series(headlines, dtype=object))
+        if summaries is not None:
+            summary_positive, summary_negative = self._weights(pd.Series(summaries, dtype=object))
+            positive += self.summary_weight * summary_positive
+            negative += self.summary_weight * summary_negative
+        
+        total = positive + negative
+        scores = np.divide(positive - negative, total, out=np.zeros_like(total), where=total > 0)
+        return SentimentScores(scores, np.sign(scores).astype(np.int8))
+    
+    def score(self, headlines, summaries=None, processes: int = None) -> SentimentScores:
+        """Score a Series or array of headlines, with optional matching summaries
+        
+        Summaries count `summary_weight` times as much as headlines. With
+        `processes` (default Config.SENTIMENT_PROCESSES) above 1, batches larger
+        than Config.SENTIMENT_CHUNK_SIZE are scored in a process pool.
+        """
+        headlines = np.asarray(headlines, dtype=object)
+        summaries = None if summaries is None else np.asarray(summaries, dtype=object)
+        if processes is None:
+            processes = Config.SENTIMENT_PROCESSES
+        
+        chunk_size = Config.SENTIMENT_CHUNK_SIZE
+        if processes <= 1 or len(headlines) <= chunk_size:
+            return self._score(headlines, summaries)
+        
+        bounds = range(0, len(headlines), chunk_size)
+        headline_chunks = [headlines[i:i + chunk_size] for i in bounds]
+        summary_chunks = [None if summaries is None else summaries[i:i + chunk_size] for i in bounds]
+        with ProcessPoolExecutor(max_workers=min(processes, os.cpu_count() or 1)) as pool:
+            parts = list(pool.map(self._score, headline_chunks, summary_chunks))
+        return SentimentScores(
+            np.concatenate([part.scores for part in parts]),
+            np.concatenate([part.codes for part in parts])
+        )
+
+# Shared by every news source in the process
+sentiment_scorer = SentimentScorer()
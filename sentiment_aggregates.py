@@ -0,0 +1,159 @@
+import math
+import threading
+import time
+from typing import Dict, Iterable, Optional
+import numpy as np
+from config import Config
+from models import NewsItem
+from sentiment import LABEL_CODES, LABELS, NEUTRAL
+
+def duration_label(seconds: float) -> str:
+    """Compact label for a duration, e.g. 3600 -> '1h', 604800 -> '7d'"""
+    for unit, size in (('d', 86400), ('h', 3600), ('m', 60)):
+        if seconds >= size and seconds % size == 0:
+            return f'{int(seconds // size)}{unit}'
+    return f'{seconds:g}s'
+
+def alpha_vantage_scale(score: float) -> float:
+    """Map an Alpha Vantage ticker_sentiment_score onto the lexicon's [-1, 1] scale
+    
+    Alpha Vantage labels |score| < 0.15 neutral and |score| >= 0.35 fully
+    bullish or bearish; those bands map onto the lexicon's neutral band
+    (below overall_label's 0.2 threshold) and its saturated ends.
+    """
+    return float(np.sign(score) * np.interp(abs(score), (0.0, 0.15, 0.35), (0.0, 0.2, 1.0)))
+
+def overall_label(score: float) -> str:
+    if score > 0.2:
+        return 'positive'
+    if score < -0.2:
+        return 'negative'
+    return 'neutral'
+
+class DecayedSentiment:
+    """Exponentially decayed sentiment sums for one symbol, one slot per half-life
+    
+    All sums are kept relative to `reference`, the newest publish time seen,
+    so an update costs one decay of each sum (when time moves forward) plus an
+    addition; articles arriving out of order are simply added with a smaller
+    weight. `score` is on the lexicon's [-1, 1] scale; Alpha Vantage items
+    also feed relevance-weighted sums of their raw provider score. Label
+    counts cover only the articles folded in since the aggregate was built.
+    """
+    
+    __slots__ = ('rates', 'reference', 'weight', 'score', 'labels', 'relevance', 'relevance_score',
+                 'counts', 'last_published')
+    
+    def __init__(self, rates: np.ndarray):
+        self.rates = rates  # decay rate per second for each half-life
+        self.reference = None
+        self.weight = np.zeros(len(rates))
+        self.score = np.zeros(len(rates))
+        self.labels = np.zeros((len(rates), len(LABELS)))
+        self.relevance = np.zeros(len(rates))
+        self.relevance_score = np.zeros(len(rates))
+        self.counts = np.zeros(len(LABELS), dtype=np.int64)
+        self.last_published = None
+    
+    def update(self, published: float, code: int, score: Optional[float], relevance: Optional[float] = None,
+               provider_score: Optional[float] = None):
+        if self.reference is None:
+            self.reference = published
+        if published > self.reference:
+            decay = np.exp(-self.rates * (published - self.reference))
+            self.weight *= decay
+            self.score *= decay
+            self.labels *= decay[:, None]
+            self.relevance *= decay
+            self.relevance_score *= decay
+            self.reference = published
+            factor = 1.0
+        else:
+            factor = np.exp(-self.rates * (self.reference - published))
+        
+        score = code if score is None else score
+        self.weight += factor
+        self.score += factor * score
+        self.labels[:, code + 1] += factor
+        if relevance is not None:
+            self.relevance += factor * relevance
+            self.relevance_score += factor * relevance * (score if provider_score is None else provider_score)
+        self.counts[code + 1] += 1
+        self.last_published = published if self.last_published is None else max(self.last_published, published)
+    
+    def read(self, now: float) -> Dict:
+        # Ratios are unaffected by decaying to `now`; only the effective weight is
+        decay = np.exp(-self.rates * max(now - self.reference, 0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(self.weight > 0, self.score / self.weight, 0.0)
+            shares = np.where(self.weight[:, None] > 0, self.labels / self.weight[:, None], 0.0)
+            provider_mean = np.where(self.relevance > 0, self.relevance_score / self.relevance, np.nan)
+        
+        windows = {}
+        for i, rate in enumerate(self.rates):
+            windows[duration_label(math.log(2) / rate)] = {
+                'overall_sentiment': overall_label(mean[i]),
+                'sentiment_score': round(float(mean[i]), 3),
+                'weight': round(float(self.weight[i] * decay[i]), 3),
+                'negative_share': round(float(shares[i, 0]), 3),
+                'neutral_share': round(float(shares[i, 1]), 3),
+                'positive_share': round(float(shares[i, 2]), 3),
+                'alpha_vantage_score': None if np.isnan(provider_mean[i]) else round(float(provider_mean[i]), 3)
+            }
+        negative_count, neutral_count, positive_count = self.counts.tolist()
+        return {
+            'total_articles': negative_count + neutral_count + positive_count,
+            'positive_count': positive_count,
+            'negative_count': negative_count,
+            'neutral_count': neutral_count,
+            'last_published': self.last_published,
+            'half_lives': windows
+        }
+
+class SentimentAggregates:
+    """Thread-safe per-symbol decayed sentiment, updated in O(1) per ingested article
+    
+    Each symbol keeps a DecayedSentiment over Config.SENTIMENT_HALF_LIVES, so
+    a read costs the same however many articles have been seen.
+    """
+    
+    def __init__(self, half_lives: Iterable[float] = None):
+        self.half_lives = tuple(Config.SENTIMENT_HALF_LIVES if half_lives is None else half_lives)
+        self._rates = math.log(2) / np.asarray(self.half_lives, dtype=float)
+        self._symbols = {}  # symbol -> DecayedSentiment
+        self._lock = threading.Lock()
+    
+    def update(self, symbol: str, item: NewsItem, code: int = None):
+        """Fold one newly stored article into the symbol's aggregate"""
+        if code is None:
+            code = LABEL_CODES.get((item.sentiment or '').lower(), NEUTRAL)
+        now = time.time()
+        # Clamp clock-skewed future timestamps so they cannot inflate weights
+        published = min(item.published or now, now)
+        score, provider_score = item.sentiment_score, None
+        # Only Alpha Vantage reports a per-ticker relevance score, and its scores run on a narrower scale
+        if item.relevance_score is not None and score is not None:
+            score, provider_score = alpha_vantage_scale(score), score
+        symbol = symbol.upper()
+        with self._lock:
+            aggregate = self._symbols.get(symbol)
+            if aggregate is None:
+                aggregate = self._symbols[symbol] = DecayedSentiment(self._rates)
+            aggregate.update(published, code, score, item.relevance_score, provider_score)
+    
+    def get(self, symbol: str, now: float = None) -> Optional[Dict]:
+        """Decayed sentiment for a symbol as of `now`, or None if no article has been seen"""
+        symbol = symbol.upper()
+        with self._lock:
+            aggregate = self._symbols.get(symbol)
+            if aggregate is None:
+                return None
+            return {'symbol': symbol, **aggregate.read(time.time() if now is None else now)}
+    
+    def symbols(self):
+        with self._lock:
+            return list(self._symbols)
+    
+    def clear(self):
+        with self._lock:
+            self._symbols.clear()
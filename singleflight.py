@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one in-flight execution
+    
+    Callers that arrive while a call for their key is running wait for it and
+    share its result (or exception) instead of starting their own.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future
+        self._tasks = {}  # (event loop, key) -> asyncio.Task
+        self.executed = 0
+        self.shared = 0
+    
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.executed += 1
+            else:
+                self.shared += 1
+        
+        if not leader:
+            return future.result()
+        
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+    
+    async def do_async(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Like `do`, for coroutine functions; calls are coalesced per event loop"""
+        task_key = (asyncio.get_running_loop(), key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._tasks[task_key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(task_key, None))
+            self.executed += 1
+        else:
+            self.shared += 1
+        
+        # Shield so one caller being cancelled does not cancel the shared call
+        return await asyncio.shield(task)
+    
+    def stats(self):
+        return {'executed': self.executed, 'shared': self.shared}
+
+# Shared by every data and news source in the process
+single_flight = SingleFlight()
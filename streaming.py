@@ -0,0 +1,302 @@
+import asyncio
+import json
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import websockets
+from config import Config
+from transport import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Callback for every batch of ticks stored: (symbol, timestamps, prices, volumes)
+TickListener = Callable[[str, np.ndarray, np.ndarray, np.ndarray], None]
+
+class TickBuffer:
+    """Fixed-size ring of the most recent trades for one symbol
+    
+    Timestamps (epoch seconds), prices and volumes live in preallocated NumPy
+    arrays, so memory per symbol is fixed at `size` ticks however fast trades
+    arrive; the oldest ticks are overwritten first.
+    """
+    
+    __slots__ = ('timestamps', 'prices', 'volumes', 'size', 'count', 'position', 'total')
+    
+    def __init__(self, size: int):
+        self.timestamps = np.zeros(size)
+        self.prices = np.zeros(size)
+        self.volumes = np.zeros(size)
+        self.size = size
+        self.count = 0
+        self.position = 0  # where the next tick goes
+        self.total = 0     # ticks ever appended
+    
+    def extend(self, timestamps: np.ndarray, prices: np.ndarray, volumes: np.ndarray):
+        n = len(timestamps)
+        if n == 0:
+            return
+        if n > self.size:
+            timestamps, prices, volumes = timestamps[-self.size:], prices[-self.size:], volumes[-self.size:]
+        
+        # At most two slice copies: up to the end of the ring, then from its start
+        start = (self.position + max(n - self.size, 0)) % self.size
+        first = min(len(timestamps), self.size - start)
+        for array, values in ((self.timestamps, timestamps), (self.prices, prices), (self.volumes, volumes)):
+            array[start:start + first] = values[:first]
+            array[:len(values) - first] = values[first:]
+        self.position = (self.position + n) % self.size
+        self.count = min(self.count + n, self.size)
+        self.total += n
+    
+    def latest(self) -> Optional[Tuple[float, float, float]]:
+        """(timestamp, price, volume) of the newest tick, or None before the first"""
+        if self.count == 0:
+            return None
+        i = self.position - 1
+        return float(self.timestamps[i]), float(self.prices[i]), float(self.volumes[i])
+    
+    def recent(self, limit: int = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Copies of the last `limit` ticks (default all held), oldest first"""
+        n = self.count if limit is None else min(limit, self.count)
+        order = np.arange(self.position - n, self.position) % self.size
+        return self.timestamps[order], self.prices[order], self.volumes[order]
+
+class TickStore:
+    """Thread-safe per-symbol tick buffers fed by streams and read without any network call
+    
+    Listeners registered with add_listener() see every batch as it is stored,
+    so downstream consumers can follow the feed without polling.
+    """
+    
+    def __init__(self, size: int = None):
+        self.size = size or Config.TICK_BUFFER_SIZE
+        self._buffers = {}  # symbol -> TickBuffer
+        self._listeners = []
+        self._lock = threading.Lock()
+    
+    def add_listener(self, listener: TickListener):
+        with self._lock:
+            self._listeners.append(listener)
+    
+    def remove_listener(self, listener: TickListener):
+        with self._lock:
+            self._listeners.remove(listener)
+    
+    def extend(self, symbol: str, timestamps: Iterable[float], prices: Iterable[float], volumes: Iterable[float]):
+        """Store a batch of trades for one symbol, oldest first"""
+        timestamps = np.asarray(timestamps, dtype=float)
+        prices = np.asarray(prices, dtype=float)
+        volumes = np.asarray(volumes, dtype=float)
+        with self._lock:
+            buffer = self._buffers.get(symbol)
+            if buffer is None:
+                buffer = self._buffers[symbol] = TickBuffer(self.size)
+            buffer.extend(timestamps, prices, volumes)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(symbol, timestamps, prices, volumes)
+    
+    def add(self, symbol: str, timestamp: float, price: float, volume: float = 0.0):
+        self.extend(symbol, [timestamp], [price], [volume])
+    
+    def latest(self, symbol: str) -> Optional[Tuple[float, float, float]]:
+        """(timestamp, price, volume) of the symbol's newest trade, or None if none was seen"""
+        with self._lock:
+            buffer = self._buffers.get(symbol)
+            return None if buffer is None else buffer.latest()
+    
+    def ticks(self, symbol: str, limit: int = None, since: float = None) -> pd.DataFrame:
+        """Recent trades for a symbol, oldest first, on a UTC `timestamp` index"""
+        with self._lock:
+            buffer = self._buffers.get(symbol)
+            timestamps, prices, volumes = (np.empty(0),) * 3 if buffer is None else buffer.recent(limit)
+        if since is not None:
+            keep = timestamps >= since
+            timestamps, prices, volumes = timestamps[keep], prices[keep], volumes[keep]
+        return pd.DataFrame(
+            {'price': prices, 'volume': volumes},
+            index=pd.DatetimeIndex(pd.to_datetime(timestamps, unit='s', utc=True), name='timestamp')
+        )
+    
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return list(self._buffers)
+    
+    def clear(self):
+        with self._lock:
+            self._buffers.clear()
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'symbols': len(self._buffers),
+                'buffer_size': self.size,
+                'ticks_held': sum(buffer.count for buffer in self._buffers.values()),
+                'ticks_received': sum(buffer.total for buffer in self._buffers.values())
+            }
+
+class FinnhubStream:
+    """Finnhub real-time trade feed written into a TickStore
+    
+    Runs on an event loop, either awaited with run() or in its own daemon
+    thread with start(). Dropped connections are retried with backoff and the
+    current subscriptions are sent again. `connect` is the websocket transport:
+    any callable taking a URL and returning an async context manager whose
+    connection supports send() and async iteration over text messages, so a
+    local stand-in server (via `url`) or a fake transport can drive it.
+    """
+    
+    name = 'Finnhub'
+    
+    def __init__(self, symbols: Iterable[str] = (), store: TickStore = None, url: str = None,
+                 api_key: str = None, connect=None):
+        self.store = store or tick_store
+        self.url = url or Config.FINNHUB_STREAM_URL
+        self.api_key = Config.FINNHUB_API_KEY if api_key is None else api_key
+        self.connect = connect or websockets.connect
+        self._symbols = set(symbol.upper() for symbol in symbols)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._connection = None
+        self._stopping = None  # asyncio.Event on the stream's loop
+        self._thread = None
+        self.connected = False
+        self.messages = 0
+        self.trades = 0
+        self.reconnects = 0
+        self.message_errors = 0
+        self.last_error = None
+    
+    def subscribe(self, symbols: Iterable[str]):
+        """Add symbols to the feed; safe to call from any thread, before or after start"""
+        self._change('subscribe', symbols)
+    
+    def unsubscribe(self, symbols: Iterable[str]):
+        self._change('unsubscribe', symbols)
+    
+    def _change(self, action: str, symbols: Iterable[str]):
+        symbols = [symbol.upper() for symbol in symbols]
+        with self._lock:
+            if action == 'subscribe':
+                symbols = [symbol for symbol in symbols if symbol not in self._symbols]
+                self._symbols.update(symbols)
+            else:
+                symbols = [symbol for symbol in symbols if symbol in self._symbols]
+                self._symbols.difference_update(symbols)
+            loop, connection = self._loop, self._connection
+        if symbols and loop is not None and connection is not None:
+            asyncio.run_coroutine_threadsafe(self._send(connection, action, symbols), loop)
+    
+    @property
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return sorted(self._symbols)
+    
+    @staticmethod
+    async def _send(connection, action: str, symbols: Iterable[str]):
+        for symbol in symbols:
+            await connection.send(json.dumps({'type': action, 'symbol': symbol}))
+    
+    async def run(self):
+        """Stream until stop() is called, reconnecting after failures"""
+        if not self.api_key:
+            raise ValueError('Finnhub API key not configured')
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        attempt = 0
+        while not self._stopping.is_set():
+            try:
+                async with self.connect(f'{self.url}?token={self.api_key}') as connection:
+                    with self._lock:
+                        self._connection = connection
+                        symbols = sorted(self._symbols)
+                    self.connected = True
+                    await self._send(connection, 'subscribe', symbols)
+                    async for message in connection:
+                        try:
+                            self.handle_message(message)
+                        except Exception as e:
+                            # A malformed message or failing listener costs that
+                            # message only, not the connection
+                            self.message_errors += 1
+                            self.last_error = f'Message handling failed: {e}'
+                            logger.exception('Failed to handle a %s stream message', self.name)
+                        attempt = 0
+            except Exception as e:
+                self.last_error = str(e)
+            finally:
+                with self._lock:
+                    self._connection = None
+                self.connected = False
+            
+            if self._stopping.is_set():
+                break
+            self.reconnects += 1
+            try:
+                await asyncio.wait_for(self._stopping.wait(), backoff_delay(attempt))
+            except asyncio.TimeoutError:
+                pass
+            attempt += 1
+        self._loop = None
+    
+    def handle_message(self, message: str):
+        """Store the trades in one feed message, grouped into a batch per symbol"""
+        self.messages += 1
+        data = json.loads(message)
+        kind = data.get('type')
+        if kind == 'error':
+            self.last_error = data.get('msg')
+            return
+        if kind != 'trade':
+            return  # pings
+        
+        batches = {}
+        for trade in data.get('data') or []:
+            # Finnhub trade times are epoch milliseconds
+            batches.setdefault(trade['s'], []).append((trade['t'] / 1000, trade['p'], trade.get('v') or 0.0))
+        for symbol, trades in batches.items():
+            timestamps, prices, volumes = zip(*trades)
+            self.store.extend(symbol, timestamps, prices, volumes)
+            self.trades += len(trades)
+    
+    def start(self) -> threading.Thread:
+        """Run the stream in a daemon thread with its own event loop"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), name='finnhub-stream',
+                                            daemon=True)
+            self._thread.start()
+        return self._thread
+    
+    def stop(self, timeout: float = 5.0):
+        """Close the connection and end run(); waits for the thread when started with start()"""
+        loop, stopping = self._loop, self._stopping
+        if loop is not None and stopping is not None:
+            loop.call_soon_threadsafe(stopping.set)
+            with self._lock:
+                connection = self._connection
+            if connection is not None:
+                asyncio.run_coroutine_threadsafe(connection.close(), loop)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+    
+    def stats(self) -> Dict:
+        return {
+            'connected': self.connected,
+            'symbols': self.symbols,
+            'messages': self.messages,
+            'trades': self.trades,
+            'reconnects': self.reconnects,
+            'message_errors': self.message_errors,
+            'last_error': self.last_error
+        }
+
+def configured_stream(store: TickStore = None) -> Optional[FinnhubStream]:
+    """A FinnhubStream over Config.STREAM_SYMBOLS if streaming is enabled and keyed, else None"""
+    if not Config.STREAMING or not Config.FINNHUB_API_KEY:
+        return None
+    return FinnhubStream(Config.STREAM_SYMBOLS, store=store)
+
+# Shared by every stream, analyzer and dashboard in the process
+tick_store = TickStore()
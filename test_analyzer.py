@@ -0,0 +1,98 @@
+"""Tests for the quote analyzer's parallel fan-out and hedged lookups, against fake sources"""
+
+import asyncio
+import time
+from analyzer import AsyncStockAnalyzer, StockAnalyzer
+from demand import DemandTracker
+from models import ProviderError, Quote
+
+class FakeSource:
+    """Answers after `delay` seconds with a quote, or with an error if `fail`"""
+
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    def _answer(self, symbol: str):
+        if self.fail:
+            return ProviderError('Upstream error', self.name)
+        return Quote(symbol, price=100.0, source=self.name)
+
+    def get_quote(self, symbol: str, use_cache: bool = True, refresh: bool = False):
+        self.calls.append(time.monotonic())
+        time.sleep(self.delay)
+        return self._answer(symbol)
+
+class AsyncFakeSource(FakeSource):
+    async def get_quote(self, symbol: str, use_cache: bool = True, refresh: bool = False):
+        self.calls.append(time.monotonic())
+        await asyncio.sleep(self.delay)
+        return self._answer(symbol)
+
+def analyzer(source=FakeSource, **delays) -> StockAnalyzer:
+    stock_analyzer = (AsyncStockAnalyzer if source is AsyncFakeSource else StockAnalyzer)(demand=DemandTracker())
+    stock_analyzer.sources = {name: source(name, **options) for name, options in delays.items()}
+    return stock_analyzer
+
+def test_sources_are_queried_in_parallel():
+    stock_analyzer = analyzer(yahoo={'delay': 0.2}, finnhub={'delay': 0.2}, alphavantage={'delay': 0.2})
+    started = time.monotonic()
+    results = stock_analyzer.get_quote('AAPL', timeout=2)
+    assert time.monotonic() - started < 0.35
+    assert {name: quote.source for name, quote in results.items()} == \
+        {'yahoo': 'yahoo', 'finnhub': 'finnhub', 'alphavantage': 'alphavantage'}
+
+def test_deadline_returns_partial_results():
+    stock_analyzer = analyzer(yahoo={'delay': 0.0}, finnhub={'delay': 1.0}, alphavantage={'fail': True})
+    started = time.monotonic()
+    results = stock_analyzer.get_quote('AAPL', timeout=0.2)
+    assert time.monotonic() - started < 0.5
+    assert results['yahoo'].price == 100.0
+    assert results['finnhub'].error == 'Timed out after 0.2s'
+    assert results['alphavantage'].error == 'Upstream error'
+
+def test_async_deadline_returns_partial_results():
+    stock_analyzer = analyzer(AsyncFakeSource, yahoo={'delay': 0.0}, finnhub={'delay': 1.0})
+    started = time.monotonic()
+    results = asyncio.run(stock_analyzer.get_quote('AAPL', timeout=0.2))
+    assert time.monotonic() - started < 0.5
+    assert results['yahoo'].price == 100.0
+    assert results['finnhub'].error == 'Timed out after 0.2s'
+
+def test_hedged_quote_first_success_wins():
+    stock_analyzer = analyzer(yahoo={'delay': 0.0}, finnhub={}, alphavantage={})
+    quote = stock_analyzer.get_best_quote('AAPL', hedge_delay=0.5)
+    assert quote.source == 'yahoo'
+    assert [len(source.calls) for source in stock_analyzer.sources.values()] == [1, 0, 0]
+
+def test_hedged_quote_falls_back_after_the_hedge_delay():
+    stock_analyzer = analyzer(yahoo={'delay': 1.0}, finnhub={'delay': 0.05}, alphavantage={'delay': 1.0})
+    started = time.monotonic()
+    quote = stock_analyzer.get_best_quote('AAPL', hedge_delay=0.1)
+    elapsed = time.monotonic() - started
+    assert quote.source == 'finnhub'
+    assert 0.15 <= elapsed < 0.5
+    assert stock_analyzer.sources['finnhub'].calls[0] - stock_analyzer.sources['yahoo'].calls[0] >= 0.09
+    # Answered before the next hedge was due
+    assert stock_analyzer.sources['alphavantage'].calls == []
+
+def test_hedged_quote_falls_back_at_once_on_failure():
+    stock_analyzer = analyzer(yahoo={'fail': True}, finnhub={'fail': True}, alphavantage={'delay': 0.0})
+    started = time.monotonic()
+    quote = stock_analyzer.get_best_quote('AAPL', hedge_delay=1.0)
+    assert quote.source == 'alphavantage'
+    assert time.monotonic() - started < 0.5
+
+def test_hedged_quote_reports_when_every_source_fails():
+    stock_analyzer = analyzer(yahoo={'fail': True}, finnhub={'fail': True}, alphavantage={'fail': True})
+    assert stock_analyzer.get_best_quote('AAPL', hedge_delay=1.0).error == 'No data available from any source'
+
+def test_async_hedged_quote_falls_back_after_the_hedge_delay():
+    stock_analyzer = analyzer(AsyncFakeSource, yahoo={'delay': 1.0}, finnhub={'delay': 0.05},
+                              alphavantage={'fail': True})
+    started = time.monotonic()
+    quote = asyncio.run(stock_analyzer.get_best_quote('AAPL', hedge_delay=0.1))
+    assert quote.source == 'finnhub'
+    assert 0.15 <= time.monotonic() - started < 0.5
@@ -0,0 +1,109 @@
+"""Tests for streamed bar aggregation and how it is flushed to the history store"""
+
+import numpy as np
+import pandas as pd
+from bar_aggregator import BarAggregator
+from history_store import BarStore
+from models import Quote
+
+START = 1_700_000_040  # a minute boundary
+
+def provider_bars(starts, high=15.0, low=5.0, volume=1e5):
+    return pd.DataFrame(
+        {'open': 10.0, 'high': high, 'low': low, 'close': 11.0, 'volume': volume},
+        index=pd.DatetimeIndex(pd.to_datetime(starts, unit='s', utc=True), name='timestamp')
+    )
+
+def test_flush_keeps_provider_bars(tmp_path):
+    store = BarStore(str(tmp_path))
+    fetched = [START + 60 * i for i in range(5)]
+    store.write('AAPL', '1m', provider_bars(fetched), covered=(START, START + 300))
+
+    aggregator = BarAggregator(intervals=['1m'], store=store, lateness=0)
+    for i, minute in enumerate(fetched):
+        aggregator.add_quote(Quote(symbol='AAPL', price=12.5, volume=1000 + 100 * i), minute + 30)
+    aggregator.add_quote(Quote(symbol='AAPL', price=12.5, volume=2000), START + 330)  # past the fetched range
+    aggregator.add_quote(Quote(symbol='AAPL', price=13.0, volume=2100), START + 390)  # still in progress
+    aggregator.stop()
+
+    bars = store.read('AAPL', '1m')
+    fetched_bars = bars.iloc[:5]
+    assert (fetched_bars['high'] == 15.0).all()
+    assert (fetched_bars['low'] == 5.0).all()
+    assert (fetched_bars['volume'] == 1e5).all()
+    assert bars.index[-1] == pd.Timestamp(START + 300, unit='s', tz='UTC')
+    assert bars['close'].iloc[-1] == 12.5
+    assert len(bars) == 6
+    assert store.missing('AAPL', '1m', START, START + 300) == []
+    assert store.missing('AAPL', '1m', START, START + 360) == [(START + 300, START + 360)]
+
+def test_flush_keeps_provider_bars_outside_coverage(tmp_path):
+    store = BarStore(str(tmp_path))
+    # A provider's bar still in progress is stored but not covered
+    store.write('AAPL', '1m', provider_bars([START]))
+    aggregator = BarAggregator(intervals=['1m'], store=store, lateness=0)
+    aggregator.add_ticks('AAPL', [START + 1.0, START + 2.0, START + 61.0], [20.0, 21.0, 22.0], [1.0, 1.0, 1.0])
+    assert aggregator.flush() == 0
+    assert store.read('AAPL', '1m')['high'].tolist() == [15.0]
+
+def test_bars_in_progress_are_flushed_only_when_final(tmp_path):
+    store = BarStore(str(tmp_path))
+    aggregator = BarAggregator(intervals=['1m'], store=store, lateness=2)
+    aggregator.add_ticks('AAPL', [START + 1.0, START + 30.0], [10.0, 11.0], [5.0, 5.0])
+    assert aggregator.flush() == 0
+    aggregator.add_ticks('AAPL', [START + 62.0], [12.0], [1.0])
+    assert aggregator.flush() == 1
+    assert store.read('AAPL', '1m')[['open', 'high', 'low', 'close', 'volume']].values.tolist() == \
+        [[10.0, 11.0, 10.0, 11.0, 10.0]]
+    # Shutting down does not store the bar in progress truncated
+    aggregator.stop()
+    assert len(store.read('AAPL', '1m')) == 1
+
+def test_late_ticks_amend_bars_until_final_then_are_dropped(tmp_path):
+    aggregator = BarAggregator(intervals=['1m'], store=BarStore(str(tmp_path)), lateness=5)
+    touched = []
+    aggregator.add_listener(lambda *bar: touched.append(bar))
+    aggregator.add_ticks('AAPL', [START + 10.0, START + 50.0, START + 61.0], [10.0, 12.0, 13.0], [1.0, 1.0, 1.0])
+    # Within the lateness window: an earlier tick becomes the open
+    aggregator.add_ticks('AAPL', [START + 5.0], [9.0], [2.0])
+    assert touched[-1] == ('AAPL', '1m', START, 9.0, 12.0, 9.0, 12.0, 4.0)
+
+    aggregator.add_ticks('AAPL', [START + 66.0], [14.0], [1.0])
+    aggregator.add_ticks('AAPL', [START + 20.0], [30.0], [1.0])
+    bars = aggregator.bars('AAPL', '1m')
+    assert bars[['open', 'high', 'low', 'close', 'volume']].values.tolist() == \
+        [[9.0, 12.0, 9.0, 12.0, 4.0], [13.0, 14.0, 13.0, 14.0, 2.0]]
+    assert aggregator.stats()['late_ticks_dropped'] == 1
+
+def test_bars_match_resampled_ticks_at_every_resolution(tmp_path):
+    rng = np.random.default_rng(0)
+    times = START + np.sort(rng.uniform(0, 900, 500))
+    prices = 100 + np.cumsum(rng.normal(0, 0.1, 500))
+    volumes = rng.integers(1, 100, 500).astype(float)
+    aggregator = BarAggregator(intervals=['1m', '5m'], store=BarStore(str(tmp_path)), lateness=0)
+    # Batches arrive shuffled within themselves, as trades from one message can
+    for batch in np.array_split(np.arange(500), 37):
+        shuffled = rng.permutation(batch)
+        aggregator.add_ticks('AAPL', times[shuffled], prices[shuffled], volumes[shuffled])
+
+    ticks = pd.DataFrame({'price': prices, 'volume': volumes},
+                         index=pd.to_datetime(times, unit='s', utc=True))
+    for interval, rule in (('1m', '1min'), ('5m', '5min')):
+        expected = ticks['price'].resample(rule).ohlc().assign(volume=ticks['volume'].resample(rule).sum())
+        bars = aggregator.bars('AAPL', interval)
+        assert bars.index.tolist() == expected.index.tolist()
+        assert np.allclose(bars.values, expected[['open', 'high', 'low', 'close', 'volume']].values)
+
+def test_full_buffers_discard_the_oldest_half(tmp_path):
+    store = BarStore(str(tmp_path))
+    aggregator = BarAggregator(intervals=['1m'], store=store, lateness=0, size=4)
+    for minute in range(3):
+        aggregator.add_ticks('AAPL', [START + 60.0 * minute], [10.0], [1.0])
+    assert aggregator.flush() == 2
+    for minute in range(3, 6):
+        aggregator.add_ticks('AAPL', [START + 60.0 * minute], [10.0], [1.0])
+    stats = aggregator.stats()
+    assert stats['bars_held'] == 4
+    assert stats['bars_evicted_unflushed'] == 0
+    aggregator.stop()
+    assert len(store.read('AAPL', '1m')) == 5
@@ -0,0 +1,117 @@
+"""Tests for the quote and news caches"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from cache import SharedCache, TTLCache, cache_key, cached, cached_batch
+from models import NewsItem, ProviderError, Quote
+
+KEY = cache_key('Yahoo Finance', 'AAPL', 'quote')
+
+def test_shared_cache_is_visible_to_another_process(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    TTLCache(shared=SharedCache(path)).set(KEY, Quote('AAPL', price=1.5, source='Yahoo Finance'), 30)
+    reader = (
+        'from cache import SharedCache, TTLCache, cache_key\n'
+        f'cache = TTLCache(shared=SharedCache({path!r}))\n'
+        "print(cache.get(cache_key('Yahoo Finance', 'AAPL', 'quote')).price, cache.stats()['shared_hits'])\n"
+    )
+    result = subprocess.run([sys.executable, '-c', reader], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.stdout.split() == ['1.5', '1']
+
+def test_shared_entries_expire(tmp_path):
+    shared = SharedCache(str(tmp_path / 'cache.db'))
+    cache = TTLCache(shared=shared)
+    cache.set(KEY, Quote('AAPL', price=1.5), 0.05)
+    time.sleep(0.1)
+    assert shared.get(KEY) is None
+    assert cache.get(KEY) is None
+
+def test_unusable_shared_cache_reads_as_a_miss(tmp_path):
+    (tmp_path / 'file').write_text('')
+    cache = TTLCache(shared=SharedCache(str(tmp_path / 'file' / 'cache.db')))
+    cache.set(KEY, Quote('AAPL', price=1.5), 30)
+    cache.clear()
+    assert cache.get(KEY) is None
+
+def test_shared_entries_round_trip_as_records(tmp_path):
+    shared = SharedCache(str(tmp_path / 'cache.db'))
+    news = [NewsItem('Apple shares rise', url='https://example.com/a', published=1_720_000_000, sentiment='positive'),
+            ProviderError('No data available', 'Finnhub')]
+    shared.set(KEY, Quote('AAPL', price=1.5, volume=100, source='Yahoo Finance'), 30)
+    shared.set('news', news, 30)
+
+    assert shared.get(KEY)[1] == Quote('AAPL', price=1.5, volume=100, source='Yahoo Finance')
+    assert isinstance(shared.get(KEY)[1], Quote)
+    assert [type(item) for item in shared.get('news')[1]] == [NewsItem, ProviderError]
+    assert shared.get('news')[1][0].to_dict() == news[0].to_dict()
+    # Values that are not JSON or records are simply not shared
+    shared.set('other', object(), 30)
+    assert shared.get('other') is None
+
+def test_corrupt_shared_entries_read_as_misses(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = TTLCache(shared=SharedCache(path))
+    cache.set(KEY, Quote('AAPL', price=1.5), 30)
+    cache.set('unknown', Quote('AAPL', price=1.5), 30)
+    with sqlite3.connect(path) as conn:
+        conn.execute('UPDATE entries SET value = ? WHERE key = ?', (b'\x80\x04corrupt', repr(KEY)))
+        conn.execute('UPDATE entries SET value = ? WHERE key = ?', ('{"__record__": "Evil"}', repr('unknown')))
+    cache.clear()
+    assert cache.get(KEY) is None
+    assert cache.get('unknown') is None
+    assert cache.stats()['misses'] == 2
+
+def test_entries_expire_and_least_recently_used_are_evicted():
+    cache = TTLCache(max_size=2)
+    cache.set('a', 1, 30)
+    cache.set('b', 2, 30)
+    assert cache.get('a') == 1  # 'b' is now the least recently used
+    cache.set('c', 3, 30)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+    cache.set('short', 4, 0.05)
+    cache.set('never', 5, 0)
+    time.sleep(0.1)
+    assert cache.get('short') is None
+    assert cache.get('never') is None
+
+class FakeSource:
+    name = 'Fake'
+
+    def __init__(self):
+        self.cache = TTLCache()
+        self.calls = []
+
+    @cached('quote', {'Fake': 30})
+    def get_quote(self, symbol: str):
+        self.calls.append([symbol])
+        return Quote(symbol, price=1.0, source=self.name)
+
+    @cached_batch('quote', {'Fake': 30})
+    def get_quotes(self, symbols):
+        self.calls.append(list(symbols))
+        return {symbol: Quote(symbol, price=2.0, source=self.name) if symbol != 'BAD'
+                else ProviderError('No data available', self.name) for symbol in symbols}
+
+def test_cached_batch_fetches_only_the_misses():
+    source = FakeSource()
+    assert source.get_quote('AAPL').price == 1.0
+    quotes = source.get_quotes(['AAPL', 'MSFT', 'BAD'])
+    assert source.calls == [['AAPL'], ['MSFT', 'BAD']]
+    assert [quotes[symbol].price for symbol in ('AAPL', 'MSFT')] == [1.0, 2.0]
+    assert isinstance(quotes['BAD'], ProviderError)
+
+    # Batch results serve single-symbol calls; errors are never cached
+    assert source.get_quote('MSFT').price == 2.0
+    source.get_quotes(['MSFT', 'BAD'])
+    assert source.calls[2:] == [['BAD']]
+
+    source.get_quotes(['MSFT'], refresh=True)
+    source.get_quotes(['MSFT'], use_cache=False)
+    assert source.calls[3:] == [['MSFT'], ['MSFT']]
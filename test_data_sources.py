@@ -0,0 +1,26 @@
+"""Tests for building quotes from a multi-ticker download"""
+
+import numpy as np
+import pandas as pd
+from data_sources import YahooFinanceSource
+from models import ProviderError, Quote
+
+def download(frames: dict) -> pd.DataFrame:
+    """A frame shaped like yf.download(..., group_by='ticker')"""
+    return pd.concat(frames, axis=1)
+
+def bars(close, volume) -> pd.DataFrame:
+    close = np.asarray(close, dtype=float)
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': volume}, index=pd.bdate_range(end='2024-07-05', periods=len(close)))
+
+def test_one_bad_symbol_does_not_lose_the_batch():
+    frame = download({'AAPL': bars([100, 102], [1000, 2000]), 'MSFT': bars([300, 303], [1000, np.nan])})
+    source = YahooFinanceSource()
+    
+    aapl = source._quote_from_bars('AAPL', frame)
+    assert isinstance(aapl, Quote)
+    assert aapl.price == 102.0 and aapl.volume == 2000 and aapl.change == 2.0
+    
+    assert isinstance(source._quote_from_bars('MSFT', frame), ProviderError)
+    assert isinstance(source._quote_from_bars('NVDA', frame), ProviderError)
@@ -0,0 +1,65 @@
+"""Tests for URL canonicalization and near-duplicate headline detection"""
+
+import pytest
+from dedup import NearDuplicateIndex, canonical_url
+
+# The same story as carried by different providers or wires
+REPRINTS = [
+    ('Apple shares rise after strong iPhone sales', 'Apple Shares Rise After Strong iPhone Sales - Reuters'),
+    ('Fed holds rates steady, signals two cuts this year', 'Fed holds rates steady and signals two cuts this year'),
+    ('UPDATE 2-Tesla recalls 2 million vehicles over Autopilot defect',
+     'Tesla recalls 2 million vehicles over Autopilot defect'),
+    ('Nvidia (NVDA) stock hits record high on AI demand', 'Nvidia stock hits record high on AI demand'),
+    ('Microsoft to buy Activision Blizzard for $68.7 billion', 'Microsoft to buy Activision Blizzard for $68.7 bln'),
+    ('Amazon beats quarterly revenue estimates on cloud strength',
+     'Amazon beats quarterly revenue estimates on cloud strength | Reuters'),
+    ('Microsoft stock rises 2% today', 'Microsoft stock rises 2% today - MarketWatch'),
+    ('Tesla stock jumps 5% on delivery numbers', 'Tesla Stock Jumps 5% On Delivery Numbers'),
+]
+
+# Different stories that share most of their words
+OPPOSITES = [
+    ('Tesla stock jumps 5% on delivery numbers', 'Tesla stock drops 5% on delivery numbers'),
+    ('Microsoft stock rises 2% today', 'Microsoft stock falls 2% today'),
+    ('Amazon beats quarterly revenue estimates', 'Amazon misses quarterly revenue estimates'),
+    ('Analyst upgrades Apple to buy on iPhone demand', 'Analyst downgrades Apple to sell on iPhone demand'),
+    ('Analyst upgrades Apple on iPhone demand', 'Analyst downgrades Apple on iPhone demand'),
+    ('Nvidia shares gain after earnings beat expectations', 'Nvidia shares slide after earnings miss expectations'),
+    ('Intel stock surges as chip sales rebound in the second quarter',
+     'Intel stock plunges as chip sales slump in the second quarter'),
+    ('Netflix subscriber growth accelerates in third quarter', 'Netflix subscriber growth slows in third quarter'),
+]
+
+@pytest.mark.parametrize('original, reprint', REPRINTS)
+def test_wire_reprints_are_duplicates(original, reprint):
+    index = NearDuplicateIndex()
+    assert index.add_if_new(None, original)
+    assert not index.add_if_new(None, reprint)
+
+@pytest.mark.parametrize('headline, opposite', OPPOSITES)
+def test_opposite_headlines_are_distinct(headline, opposite):
+    index = NearDuplicateIndex()
+    assert index.add_if_new(None, headline)
+    assert index.add_if_new(None, opposite)
+
+def test_canonical_urls_match_across_tracking_variants():
+    assert canonical_url('http://www.Example.com/news/story/?utm_source=x&b=2&a=1#top') == \
+        canonical_url('https://example.com/news/story?a=1&b=2&fbclid=abc')
+    assert canonical_url(None) is None
+
+def test_matching_url_is_a_duplicate_whatever_the_headline():
+    index = NearDuplicateIndex()
+    assert index.add_if_new('https://example.com/a?utm_medium=feed', 'Apple reports record revenue')
+    assert not index.add_if_new('https://www.example.com/a', 'Something else entirely')
+    assert index.contains('https://example.com/a', '')
+
+def test_entries_expire_and_stay_bounded():
+    index = NearDuplicateIndex(ttl=0)
+    assert index.add_if_new(None, 'Apple reports record revenue')
+    assert index.add_if_new(None, 'Apple reports record revenue')
+
+    bounded = NearDuplicateIndex(max_entries=2)
+    for headline in ('Apple reports record revenue', 'Fed holds rates steady', 'Oil prices slip on demand worries'):
+        bounded.add_if_new(None, headline)
+    assert len(bounded) == 2
+    assert not bounded.contains(None, 'Apple reports record revenue')
@@ -0,0 +1,70 @@
+"""Tests for the local Feather bar store and its fetched-range bookkeeping"""
+
+import pandas as pd
+import pytest
+from history_store import BarStore, aligned_range, merge_ranges
+
+DAY = 86400
+START = 1_704_067_200  # 2024-01-01 00:00 UTC
+
+def daily(days, close=10.0) -> pd.DataFrame:
+    return pd.DataFrame(
+        {'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1e6},
+        index=pd.DatetimeIndex(pd.to_datetime([START + DAY * day for day in days], unit='s', utc=True),
+                               name='timestamp')
+    )
+
+def test_merge_ranges():
+    assert merge_ranges([(5, 8), (0, 2), (2, 4), (7, 10), (12, 12)]) == [(0, 4), (5, 10)]
+
+def test_coverage_records_empty_ranges_and_reports_gaps(tmp_path):
+    store = BarStore(str(tmp_path))
+    assert store.missing('AAPL', '1d', START, START + 10 * DAY) == [(START, START + 10 * DAY)]
+
+    # Days 5 and 6 are a weekend: covered although no bars came back
+    store.write('AAPL', '1d', daily([0, 1, 2, 3, 4]), covered=(START, START + 7 * DAY))
+    store.write('aapl', '1d', daily([9]), covered=(START + 9 * DAY, START + 10 * DAY))
+    assert store.coverage('AAPL', '1d') == [(START, START + 7 * DAY), (START + 9 * DAY, START + 10 * DAY)]
+    assert store.missing('AAPL', '1d', START, START + 12 * DAY) == \
+        [(START + 7 * DAY, START + 9 * DAY), (START + 10 * DAY, START + 12 * DAY)]
+    assert store.missing('AAPL', '1d', START + DAY, START + 5 * DAY) == []
+
+    store.write('AAPL', '1d', daily([7, 8]), covered=(START + 7 * DAY, START + 9 * DAY))
+    assert store.coverage('AAPL', '1d') == [(START, START + 10 * DAY)]
+    assert store.symbols('1d') == ['AAPL']
+
+def test_writes_merge_with_newer_values_winning(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write('AAPL', '1d', daily([0, 1, 2]), covered=(START, START + 3 * DAY))
+    store.write('AAPL', '1d', daily([2, 3], close=20.0), covered=(START + 2 * DAY, START + 4 * DAY))
+
+    bars = store.read('AAPL', '1d')
+    assert bars['close'].tolist() == [10.0, 10.0, 20.0, 20.0]
+    assert bars.index.is_monotonic_increasing
+    assert str(bars.index.tz) == 'UTC'
+    assert store.read('AAPL', '1d', START + DAY, START + 3 * DAY)['close'].tolist() == [10.0, 20.0]
+    assert store.read('MSFT', '1d').empty
+
+def test_forget_reopens_a_range(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write('AAPL', '1d', daily(range(10)), covered=(START, START + 10 * DAY))
+    store.forget('AAPL', '1d', START + 3 * DAY, START + 5 * DAY)
+    assert store.missing('AAPL', '1d', START, START + 10 * DAY) == [(START + 3 * DAY, START + 5 * DAY)]
+    # The bars themselves stay until a refetch replaces them
+    assert len(store.read('AAPL', '1d')) == 10
+
+def test_supplement_fills_only_unfetched_gaps(tmp_path):
+    store = BarStore(str(tmp_path))
+    assert store.supplement('AAPL', '1d', daily([0])) == 1
+
+    store.write('MSFT', '1d', daily([0, 1]), covered=(START, START + 3 * DAY))
+    store.write('MSFT', '1d', daily([5]))
+    assert store.supplement('MSFT', '1d', daily([1, 2, 4, 5, 6], close=99.0)) == 2
+    bars = store.read('MSFT', '1d')
+    assert bars['close'].tolist() == [10.0, 10.0, 99.0, 10.0, 99.0]
+    assert store.coverage('MSFT', '1d') == [(START, START + 3 * DAY)]
+
+def test_aligned_range_snaps_to_bar_boundaries():
+    assert aligned_range('1m', START + 30, START + 90) == (START, START + 120)
+    with pytest.raises(ValueError):
+        aligned_range('2m', START, START + 60)
@@ -0,0 +1,124 @@
+"""Tests for the technical-indicator engine"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from analyzer import StockAnalyzer
+from indicators import IndicatorEngine, last_close, trading_session
+from models import Quote
+
+def daily_bars(days: int, last: str = '2024-07-03', seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, days))
+    index = pd.bdate_range(end=last, periods=days, tz='UTC', name='timestamp')
+    return pd.DataFrame({
+        'open': close + rng.normal(0, 0.5, days),
+        'high': close + rng.uniform(0.5, 2, days),
+        'low': close - rng.uniform(0.5, 2, days),
+        'close': close,
+        'volume': rng.uniform(1e6, 2e6, days)
+    }, index=index)
+
+def eastern(text: str) -> pd.Timestamp:
+    return pd.Timestamp(text, tz='America/New_York')
+
+def test_trading_session_follows_the_exchange_calendar():
+    assert trading_session(eastern('2024-07-05 11:00')) == pd.Timestamp('2024-07-05')
+    assert trading_session(eastern('2024-07-04 11:00')) is None  # Independence Day
+    assert trading_session(eastern('2024-03-29 11:00')) is None  # Good Friday
+    assert trading_session(eastern('2024-07-06 11:00')) is None  # Saturday
+    assert trading_session(eastern('2024-07-05 09:00')) is None  # before the open
+    assert trading_session(eastern('2024-07-05 17:00')) is None  # after the close
+
+def test_last_close_is_the_latest_session_to_have_ended():
+    assert last_close(eastern('2024-07-05 17:00')) == eastern('2024-07-05 16:00')
+    assert last_close(eastern('2024-07-05 11:00')) == eastern('2024-07-03 16:00')  # after Independence Day
+    assert last_close(eastern('2024-07-07 11:00')) == eastern('2024-07-05 16:00')  # Sunday
+    assert last_close(eastern('2024-07-08 09:00')) == eastern('2024-07-05 16:00')  # Monday before the open
+
+def test_daily_indicators_go_stale_only_when_a_session_closes():
+    engine = IndicatorEngine('1d')
+    engine.seed({'AAPL': daily_bars(120, last='2024-07-05')})
+    for now in ('2024-07-06 11:00', '2024-07-07 11:00', '2024-07-08 09:00', '2024-07-08 15:00'):
+        assert StockAnalyzer._stale_indicators(engine, ['AAPL'], now=eastern(now)) == []
+    assert StockAnalyzer._stale_indicators(engine, ['AAPL'], now=eastern('2024-07-08 17:00')) == ['AAPL']
+
+    engine.seed({'AAPL': daily_bars(120)})  # through 2024-07-03, the eve of a holiday
+    for now in ('2024-07-04 11:00', '2024-07-05 09:00'):
+        assert StockAnalyzer._stale_indicators(engine, ['AAPL'], now=eastern(now)) == []
+
+def test_intraday_indicators_ending_with_the_last_session_stay_current():
+    engine = IndicatorEngine('5m')
+    index = pd.date_range('2024-07-05 13:30', periods=78, freq='5min', tz='UTC', name='timestamp')
+    engine.seed({'AAPL': daily_bars(78, seed=3).set_axis(index)})
+    for now in ('2024-07-05 17:00', '2024-07-07 11:00', '2024-07-08 09:00'):
+        assert StockAnalyzer._stale_indicators(engine, ['AAPL'], now=eastern(now)) == []
+    engine.seed({'AAPL': daily_bars(77, seed=3).set_axis(index[:-1])})
+    assert StockAnalyzer._stale_indicators(engine, ['AAPL'], now=eastern('2024-07-07 11:00')) == ['AAPL']
+
+def test_quotes_outside_a_session_leave_the_bars_alone():
+    engine = IndicatorEngine('1d')
+    engine.seed({'AAPL': daily_bars(120)})
+    before = engine.snapshot().loc['AAPL'].to_dict()
+    timestamp = engine.timestamp('AAPL')
+    quote = Quote('AAPL', price=150.0, high=151.0, low=149.0, volume=1000)
+
+    for now in ('2024-07-04 11:00', '2024-07-05 08:00'):
+        assert engine.update_quote(quote, now=eastern(now)) is None
+    assert engine.timestamp('AAPL') == timestamp
+    assert engine.snapshot().loc['AAPL'].to_dict() == before
+
+def test_quotes_in_a_session_open_and_revise_its_bar():
+    engine = IndicatorEngine('1d')
+    engine.seed({'AAPL': daily_bars(120)})
+    quote = Quote('AAPL', price=150.0, high=151.0, low=149.0, volume=1000)
+    assert engine.update_quote(quote, now=eastern('2024-07-05 10:00')) is not None
+    assert engine.timestamp('AAPL') == int(pd.Timestamp('2024-07-05', tz='UTC').timestamp())
+
+    quote.price = 152.0
+    engine.update_quote(quote, now=eastern('2024-07-05 15:00'))
+    assert engine.timestamp('AAPL') == int(pd.Timestamp('2024-07-05', tz='UTC').timestamp())
+    assert engine.snapshot().loc['AAPL', 'close'] == 152.0
+
+def feed(engine: IndicatorEngine, symbol: str, bars: pd.DataFrame):
+    for timestamp, bar in bars.iterrows():
+        values = engine.update(symbol, int(timestamp.timestamp()), bar['high'], bar['low'], bar['close'],
+                               bar['volume'])
+    return values
+
+def test_incremental_updates_match_batch_compute():
+    engine = IndicatorEngine('1d')
+    bars = daily_bars(120)
+    engine.seed({'AAPL': bars.iloc[:60]})
+    values = feed(engine, 'AAPL', bars.iloc[60:])
+
+    expected = engine.compute({'AAPL': bars})['AAPL'].iloc[-1]
+    assert values == pytest.approx(expected.to_dict(), rel=1e-9, nan_ok=True)
+    assert engine.snapshot().loc['AAPL', 'close'] == bars['close'].iloc[-1]
+
+def test_revising_the_bar_in_progress_matches_batch_compute():
+    engine = IndicatorEngine('1d')
+    bars = daily_bars(80, seed=1)
+    engine.seed({'AAPL': bars})
+    revised = bars.copy()
+    revised.iloc[-1, revised.columns.get_loc('close')] += 5
+    revised.iloc[-1, revised.columns.get_loc('high')] += 5
+    values = feed(engine, 'AAPL', revised.iloc[-1:])
+
+    expected = engine.compute({'AAPL': revised})['AAPL'].iloc[-1]
+    assert values == pytest.approx(expected.to_dict(), rel=1e-9, nan_ok=True)
+    # Bars older than the one in progress are ignored
+    assert feed(engine, 'AAPL', bars.iloc[-3:-2]) == values
+
+def test_intraday_vwap_restarts_each_session():
+    engine = IndicatorEngine('5m')
+    sessions = [pd.date_range(f'2024-07-0{day} 13:30', periods=78, freq='5min', tz='UTC') for day in (1, 2)]
+    bars = daily_bars(156, seed=2).set_axis(sessions[0].append(sessions[1]).rename('timestamp'))
+    engine.seed({'AAPL': bars.iloc[:100]})
+    values = feed(engine, 'AAPL', bars.iloc[100:])
+
+    expected = engine.compute({'AAPL': bars})['AAPL'].iloc[-1]
+    assert values == pytest.approx(expected.to_dict(), rel=1e-9, nan_ok=True)
+    session = bars.iloc[78:]
+    typical = (session['high'] + session['low'] + session['close']) / 3
+    assert values['vwap'] == pytest.approx((typical * session['volume']).sum() / session['volume'].sum())
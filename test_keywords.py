@@ -0,0 +1,83 @@
+"""Tests for the shared keyword matcher, checked against the original substring classifier"""
+
+import pytest
+from keywords import NEGATIVE_WORDS, POSITIVE_WORDS, PRICE_KEYWORDS, KeywordMatcher, inflections
+
+def baseline_sentiment(text: str) -> str:
+    """The per-source classifier the matcher replaced: plain substring counts"""
+    text = text.lower()
+    positive = sum(1 for word in POSITIVE_WORDS if word in text)
+    negative = sum(1 for word in NEGATIVE_WORDS if word in text)
+    return 'positive' if positive > negative else 'negative' if negative > positive else 'neutral'
+
+def baseline_price_related(text: str) -> bool:
+    text = text.lower()
+    return any(keyword in text for keyword in PRICE_KEYWORDS)
+
+# Headlines the substring classifier got right; whole-word matching must agree
+HEADLINES = [
+    'Tesla shares dropped 5% after earnings miss',
+    'Nvidia stock dropping as chip export curbs widen',
+    'Apple stock fell 3% after weak iPhone sales',
+    'Amazon shares rose after cloud revenue beat estimates',
+    'Microsoft shares slipped as cloud growth slowed',
+    'Meta stock surged 20% on strong advertising revenue',
+    'Netflix shares jumped after subscriber growth beat forecasts',
+    'Intel stock plunged after a weak revenue forecast',
+    'Boeing shares tumbled on new safety concerns',
+    'Analysts upgraded AMD to outperform on AI demand',
+    'Goldman downgrades Ford to sell on EV losses',
+    'Gold price climbing to a record high',
+    'Bitcoin crashed below $30,000 overnight',
+    'Retail sales declined for a second month',
+    'Alphabet profit soared on search and cloud strength',
+    'Walmart beat quarterly profit expectations',
+    'Disney missed revenue estimates as parks slowed',
+    'Treasury yields are falling after jobs data',
+    'Investors are buying the dip in chip stocks',
+    'Fund managers are selling tech stocks',
+    'Shares of Pfizer sinking after trial failure',
+    'Stock market closes flat ahead of Fed decision',
+    'Apple announces new developer tools at WWDC',
+    'Exxon earnings boosted by higher oil prices',
+    'Nike sees bearish sentiment after guidance cut',
+    'Bullish options bets pile up on Tesla',
+]
+
+# Inflected and irregular forms the substring classifier missed
+MISSED_BY_BASELINE = [
+    ('Insiders sold shares ahead of the earnings report', 'negative'),
+    ('Oil prices sank to a three-month low', 'negative'),
+    ('Dow rallies as inflation cools', 'positive'),
+    ('Coinbase shares are rising after SEC ruling', 'positive'),
+]
+
+@pytest.mark.parametrize('headline', HEADLINES)
+def test_matches_baseline_classifier(headline):
+    matcher = KeywordMatcher()
+    counts = matcher.classify(headline)
+    assert counts.sentiment == baseline_sentiment(headline)
+    assert counts.price_related == baseline_price_related(headline)
+
+@pytest.mark.parametrize('headline, sentiment', MISSED_BY_BASELINE)
+def test_catches_forms_the_baseline_missed(headline, sentiment):
+    assert baseline_sentiment(headline) == 'neutral'
+    assert KeywordMatcher().sentiment(headline) == sentiment
+
+def test_classify_many_matches_classify():
+    matcher = KeywordMatcher()
+    assert matcher.classify_many(HEADLINES) == [matcher.classify(headline) for headline in HEADLINES]
+
+def test_whole_words_only():
+    matcher = KeywordMatcher()
+    # 'up' in 'supply' and 'buy' in 'buyback' no longer count
+    assert matcher.classify('Supply chain update').positive == 0
+    assert matcher.classify('Apple announces buyback').positive == 0
+
+def test_inflections():
+    assert {'dropped', 'dropping', 'drops'} <= set(inflections('drop'))
+    assert {'fell', 'fallen', 'falling'} <= set(inflections('fall'))
+    assert {'rose', 'risen', 'rising', 'rises'} <= set(inflections('rise'))
+    assert 'sold' in inflections('sell')
+    assert 'gainned' not in inflections('gain')
+    assert 'beatted' not in inflections('beat')
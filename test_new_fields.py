@@ -3,6 +3,7 @@
 
 from data_sources import YahooFinanceSource, FinnhubSource, AlphaVantageSource
 import json
+from models import to_json
 
 print("Testing Enhanced Data Sources")
 print("=" * 60)
@@ -11,19 +12,19 @@ print("=" * 60)
 print("\n1. Yahoo Finance:")
 yahoo = YahooFinanceSource()
 result = yahoo.get_quote('AAPL')
-print(json.dumps(result, indent=2))
+print(json.dumps(result, indent=2, default=to_json))
 
 # Test Finnhub
 print("\n2. Finnhub:")
 finnhub = FinnhubSource()
 result = finnhub.get_quote('AAPL')
-print(json.dumps(result, indent=2))
+print(json.dumps(result, indent=2, default=to_json))
 
 # Test Alpha Vantage
 print("\n3. Alpha Vantage:")
 alpha = AlphaVantageSource()
 result = alpha.get_quote('AAPL')
-print(json.dumps(result, indent=2))
+print(json.dumps(result, indent=2, default=to_json))
 
 print("\n" + "=" * 60)
 print("✅ All sources now return comprehensive fields!")
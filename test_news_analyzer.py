@@ -0,0 +1,91 @@
+"""Tests for parallel news fetching with early termination, against fake sources"""
+
+import asyncio
+import threading
+import time
+import pytest
+from config import Config
+from models import NewsItem
+from news_analyzer import AsyncNewsAnalyzer, NewsAnalyzer
+from news_store import ArticleStore
+
+class FakeNewsSource:
+    """Returns `count` articles after `delay` seconds"""
+
+    def __init__(self, name: str, delay: float = 0.0, count: int = 3):
+        self.name = name
+        self.delay = delay
+        self.count = count
+
+    def _articles(self, symbol: str):
+        return [NewsItem(f'{self.name} story {i} about {symbol}', url=f'https://{self.name}.example/{i}',
+                         published=1_720_000_000 - i, provider=self.name) for i in range(self.count)]
+
+    def get_news(self, symbol: str, limit: int = 10, use_cache: bool = True, refresh: bool = False):
+        time.sleep(self.delay)
+        return self._articles(symbol)
+
+class AsyncFakeNewsSource(FakeNewsSource):
+    async def get_news(self, symbol: str, limit: int = 10, use_cache: bool = True, refresh: bool = False):
+        await asyncio.sleep(self.delay)
+        return self._articles(symbol)
+
+class SlowStore(ArticleStore):
+    """An article store whose writes take a while"""
+
+    def __init__(self):
+        super().__init__(':memory:')
+        self.added = threading.Event()
+
+    def add(self, symbol, items):
+        time.sleep(0.3)
+        added = super().add(symbol, items)
+        self.added.set()
+        return added
+
+@pytest.fixture(autouse=True)
+def timeouts(monkeypatch):
+    monkeypatch.setattr(Config, 'NEWS_TIMEOUT', 2.0)
+    monkeypatch.setattr(Config, 'NEWS_GRACE_PERIOD', 0.1)
+    monkeypatch.setattr(Config, 'ARCHIVE_FETCHED_NEWS', True)
+
+def news_analyzer(source=FakeNewsSource, store=None, **delays):
+    analyzer = (AsyncNewsAnalyzer if source is AsyncFakeNewsSource else NewsAnalyzer)(store=store or SlowStore())
+    analyzer.sources = {name: source(name, delay) for name, delay in delays.items()}
+    return analyzer
+
+def test_enough_articles_end_the_wait_after_the_grace_period():
+    analyzer = news_analyzer(finnhub=0.0, yahoo=0.05, alphavantage=1.5)
+    started = time.monotonic()
+    results = analyzer.get_news('AAPL', enough=3)
+    assert time.monotonic() - started < 0.5
+    # The source that answered within the grace period is kept, the slow one left out
+    assert list(results) == ['finnhub', 'yahoo']
+
+def test_without_enough_every_source_is_awaited():
+    analyzer = news_analyzer(finnhub=0.0, alphavantage=0.3)
+    assert list(analyzer.get_news('AAPL')) == ['finnhub', 'alphavantage']
+    assert list(analyzer.get_snapshot('AAPL').results) == ['finnhub', 'alphavantage']
+
+def test_archiving_does_not_delay_the_answer():
+    store = SlowStore()
+    analyzer = news_analyzer(store=store, finnhub=0.0)
+    started = time.monotonic()
+    analyzer.get_news('AAPL')
+    assert time.monotonic() - started < 0.2
+    assert store.added.wait(2)
+    assert len(store.get('AAPL')) == 3
+
+def test_async_enough_articles_end_the_wait():
+    store = SlowStore()
+    analyzer = news_analyzer(AsyncFakeNewsSource, store=store, finnhub=0.0, alphavantage=1.5)
+
+    async def fetch():
+        started = time.monotonic()
+        results = await analyzer.get_news('AAPL', enough=3)
+        return time.monotonic() - started, results
+
+    elapsed, results = asyncio.run(fetch())
+    assert elapsed < 0.5
+    assert list(results) == ['finnhub']
+    assert store.added.wait(2)
@@ -0,0 +1,65 @@
+"""Tests for the helpers shared by the news providers"""
+
+import asyncio
+import news_sources
+from news_sources import AlphaVantageNewsSource, AsyncAlphaVantageNewsSource, format_timestamp
+from news_store import ArticleStore
+
+def test_timestamps_display_in_utc_for_every_provider():
+    published = AlphaVantageNewsSource._published({'time_published': '20240705T143000'})
+    assert format_timestamp(published) == '2024-07-05 14:30:00'
+    assert format_timestamp(0) == '1970-01-01 00:00:00'
+
+def feed_item(published: str, *tickers: str) -> dict:
+    return {
+        'title': f'{" and ".join(tickers)} stock price moves', 'summary': 'Shares rose', 'source': 'Wire',
+        'url': f'https://example.com/{published}/{"-".join(tickers)}', 'time_published': published,
+        'ticker_sentiment': [{'ticker': ticker, 'ticker_sentiment_score': '0.2', 'ticker_sentiment_label': 'Bullish',
+                              'relevance_score': '0.5'} for ticker in tickers]
+    }
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+def test_batch_ingest_keeps_a_high_water_mark_per_symbol(monkeypatch):
+    feeds = [
+        [feed_item('20240705T150000', 'AAPL'), feed_item('20240705T140000', 'NVDA'),
+         feed_item('20240705T130000', 'MSFT')],
+        [feed_item('20240705T160000', 'AAPL', 'TSLA'), feed_item('20240705T150000', 'AAPL'),
+         feed_item('20240705T140000', 'NVDA'), feed_item('20240705T130000', 'MSFT')],
+    ]
+    requests = []
+
+    def get(url, params=None, rate_key=None):
+        requests.append(params)
+        return FakeResponse({'feed': feeds[len(requests) - 1]})
+
+    monkeypatch.setattr(news_sources.transport, 'get', get)
+    source = AlphaVantageNewsSource()
+    source.api_key = 'key'
+    store = ArticleStore(':memory:')
+
+    assert source.ingest_batch(['aapl', 'MSFT'], store=store) == {'AAPL': 1, 'MSFT': 1}
+    assert 'time_from' not in requests[0]
+    # NVDA was in the first feed but not watched, so it has no mark yet and the feed reaches back for it
+    assert source.ingest_batch(['AAPL', 'MSFT', 'NVDA', 'TSLA'], store=store) == \
+        {'AAPL': 1, 'MSFT': 0, 'NVDA': 1, 'TSLA': 1}
+    assert 'time_from' not in requests[1]
+    assert store.high_water_mark('Alpha Vantage', 'market:AAPL') == '20240705T160000'
+    assert store.high_water_mark('Alpha Vantage', 'market:MSFT') == '20240705T130000'
+    assert AlphaVantageNewsSource._since(source._batch_marks(['AAPL', 'MSFT'], None, store)) == '20240705T130000'
+
+def test_async_batch_ingest_matches_the_sync_source(monkeypatch):
+    async def async_get(url, params=None, rate_key=None):
+        return FakeResponse({'feed': [feed_item('20240705T150000', 'AAPL', 'MSFT')]})
+
+    monkeypatch.setattr(news_sources.transport, 'async_get', async_get)
+    source = AsyncAlphaVantageNewsSource()
+    source.sync_source.api_key = 'key'
+    store = ArticleStore(':memory:')
+    assert asyncio.run(source.ingest_batch(['aapl', 'msft'], store=store)) == {'AAPL': 1, 'MSFT': 1}
+    assert store.high_water_mark('Alpha Vantage', 'market:MSFT') == '20240705T150000'
@@ -0,0 +1,87 @@
+"""Tests for the SQLite article archive"""
+
+import time
+from models import NewsItem
+from news_store import ArticleStore, match_expression
+
+NOW = int(time.time())
+
+def article(headline: str, url: str = None, published: int = None, **fields) -> NewsItem:
+    return NewsItem(headline, url=url, published=int(time.time()) if published is None else published,
+                    provider='Finnhub', **fields)
+
+def test_symbols_match_whatever_their_case():
+    store = ArticleStore(':memory:')
+    assert store.add('aapl', [article('Apple unveils new iPhone', 'https://example.com/iphone',
+                                      sentiment='Bullish')]) == 1
+    assert store.add('AAPL', [article('Apple unveils new iPhone', 'https://example.com/iphone')]) == 0
+
+    assert [item.headline for item in store.get('Aapl')] == ['Apple unveils new iPhone']
+    assert [symbol for symbol, _ in store.search('iphone', symbol='aapl')] == ['AAPL']
+    assert store.aggregates.get('aapl')['symbol'] == 'AAPL'
+    assert store.aggregates.get('AAPL')['positive_count'] == 1
+
+    store.set_high_water_mark('Finnhub', 'aapl', 42)
+    assert store.high_water_mark('Finnhub', 'AAPL') == 42
+
+def test_high_water_marks_round_trip(tmp_path):
+    path = str(tmp_path / 'news.db')
+    store = ArticleStore(path)
+    assert store.high_water_mark('Finnhub', 'AAPL') is None
+    store.set_high_water_mark('Finnhub', 'AAPL', [1_720_000_000, 123])
+    store.set_high_water_mark('Alpha Vantage', 'AAPL', '20240705T143000')
+    store.set_high_water_mark('Finnhub', 'AAPL', [1_720_000_100, 7])
+    store.close()
+
+    reopened = ArticleStore(path)
+    assert reopened.high_water_mark('Finnhub', 'AAPL') == (1_720_000_100, 7)
+    assert reopened.high_water_mark('Alpha Vantage', 'AAPL') == '20240705T143000'
+    assert reopened.high_water_mark('Finnhub', 'MSFT') is None
+    assert reopened.stats()['high_water_marks'] == 2
+
+def test_exact_and_near_duplicates_are_stored_once():
+    store = ArticleStore(':memory:')
+    items = [
+        article('Apple shares rise after strong iPhone sales', 'https://example.com/a?utm_source=feed'),
+        article('Apple shares rise after strong iPhone sales', 'https://www.example.com/a'),
+        article('Apple Shares Rise After Strong iPhone Sales - Reuters', 'https://reuters.com/apple'),
+        article('Apple shares fall after weak iPhone sales', 'https://example.com/b'),
+    ]
+    assert store.add('AAPL', items) == 2
+    assert store.add('MSFT', items[:1]) == 1
+
+def test_search_is_full_text_with_filters():
+    store = ArticleStore(':memory:')
+    store.add('AAPL', [
+        article('Apple raised its dividend', 'https://example.com/1', published=NOW - 3600,
+                summary='The board approved a buyback', sentiment='Bullish'),
+        article('Apple faces antitrust suit', 'https://example.com/2', published=NOW - 60,
+                summary='Regulators say Apple raises prices', sentiment='Bearish'),
+        article('Dividend stocks to watch', 'https://example.com/3', published=NOW - 7200, sentiment='Neutral'),
+    ])
+    store.add('MSFT', [article('Microsoft raises its dividend', 'https://example.com/4', published=NOW - 30)])
+
+    def headlines(**kwargs):
+        return [item.headline for _, item in store.search(**kwargs)]
+
+    # Stemmed, newest first, across headline and summary
+    assert headlines(query='raises') == ['Microsoft raises its dividend', 'Apple faces antitrust suit',
+                                         'Apple raised its dividend']
+    assert headlines(query='raises', symbol='AAPL', sentiment='positive') == ['Apple raised its dividend']
+    assert headlines(query='divid*', until=NOW - 3000) == ['Apple raised its dividend', 'Dividend stocks to watch']
+    assert headlines(since=NOW - 100, provider='Finnhub') == ['Microsoft raises its dividend',
+                                                              'Apple faces antitrust suit']
+    # Headline hits rank above summary hits
+    assert headlines(query='raises', symbol='AAPL', order='relevance') == ['Apple raised its dividend',
+                                                                           'Apple faces antitrust suit']
+    assert headlines(query='"); DROP TABLE articles; --') == []
+
+def test_match_expression_quotes_user_input():
+    assert match_expression('Apple "iPhone" sales*') == '"Apple" "iPhone" "sales"*'
+    assert match_expression('  ') is None
+
+def test_prune_drops_only_old_articles():
+    store = ArticleStore(':memory:', retention_days=1)
+    store.add('AAPL', [article('Old news', published=NOW - 3 * 86400), article('Fresh news')])
+    assert store.prune() == 1
+    assert [item.headline for item in store.get('AAPL')] == ['Fresh news']
@@ -0,0 +1,107 @@
+"""Tests for the priority token buckets in front of provider requests"""
+
+import asyncio
+import threading
+import time
+import pytest
+from rate_limit import BACKGROUND, INTERACTIVE, RateLimiter, RateLimitExceeded, TokenBucket, priority
+
+def queued(bucket: TokenBucket, count: int):
+    deadline = time.monotonic() + 5
+    while len(bucket._waiters) < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+def test_interactive_requests_jump_the_background_queue():
+    bucket = TokenBucket(1, 0.5)
+    bucket.acquire()
+    served = []
+
+    def request(level: int):
+        with priority(level):
+            bucket.acquire(max_wait=5)
+        served.append(level)
+
+    background = threading.Thread(target=request, args=(BACKGROUND,))
+    background.start()
+    queued(bucket, 1)
+    interactive = threading.Thread(target=request, args=(INTERACTIVE,))
+    interactive.start()
+    background.join(5)
+    interactive.join(5)
+
+    assert served == [INTERACTIVE, BACKGROUND]
+
+def test_estimated_wait_only_counts_requests_served_first():
+    bucket = TokenBucket(1, 0.5)
+    bucket.acquire()
+    background = threading.Thread(target=bucket.acquire, args=(BACKGROUND, 5))
+    background.start()
+    queued(bucket, 1)
+
+    assert bucket.estimate_wait(INTERACTIVE) == pytest.approx(0.5, abs=0.05)
+    assert bucket.estimate_wait(BACKGROUND) == pytest.approx(1.0, abs=0.05)
+    background.join(5)
+
+def test_requests_fail_fast_beyond_their_wait_budget():
+    bucket = TokenBucket(2, 10)
+    bucket.acquire()
+    bucket.acquire()
+    started = time.monotonic()
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        bucket.acquire(max_wait=1)
+    assert time.monotonic() - started < 0.5
+    assert excinfo.value.retry_after == pytest.approx(5, abs=0.1)
+    # The rejected request did not join the queue
+    assert bucket._waiters == []
+
+def test_buckets_are_per_key_and_endpoint():
+    limiter = RateLimiter({'quote': (1, 10)})
+    assert limiter.bucket('key', 'news') is None
+    assert limiter.bucket('key', 'quote') is limiter.bucket('key', 'quote')
+    limiter.acquire('key', 'quote')
+    limiter.acquire('other', 'quote')
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire('key', 'quote', max_wait=0)
+
+def test_async_waiters_sleep_instead_of_holding_threads():
+    bucket = TokenBucket(5, 0.25)
+    threads = threading.active_count()
+    peak = []
+
+    async def request(level: int, served: list):
+        await bucket.acquire_async(level, max_wait=5)
+        served.append(level)
+        peak.append(threading.active_count())
+
+    async def main():
+        served = []
+        background = [asyncio.ensure_future(request(BACKGROUND, served)) for _ in range(40)]
+        await asyncio.sleep(0.01)
+        interactive = asyncio.ensure_future(request(INTERACTIVE, served))
+        await asyncio.gather(interactive, *background)
+        return served
+
+    started = time.monotonic()
+    served = asyncio.run(main())
+    assert len(served) == 41
+    # 5 tokens up front, then 20 per second
+    assert 1.5 <= time.monotonic() - started < 2.5
+    assert served.index(INTERACTIVE) <= 6
+    assert max(peak) <= threads
+    assert bucket._waiters == []
+
+def test_async_requests_fail_fast_and_leave_the_queue_when_cancelled():
+    bucket = TokenBucket(1, 10)
+
+    async def main():
+        await bucket.acquire_async()
+        with pytest.raises(RateLimitExceeded):
+            await bucket.acquire_async(max_wait=1)
+        waiter = asyncio.ensure_future(bucket.acquire_async(max_wait=20))
+        await asyncio.sleep(0.01)
+        assert len(bucket._waiters) == 1
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+    asyncio.run(main())
+    assert bucket._waiters == []
@@ -0,0 +1,28 @@
+"""Tests for vectorized batch sentiment scoring"""
+
+import pytest
+from news_sources import FinnhubNewsSource
+from sentiment import SentimentScorer
+
+@pytest.mark.parametrize('headlines, summaries', [
+    ([], []),
+    (['123'], ['456']),
+    (['Apple unveils new iPhone lineup at September event'], None),
+    (['x', None], [None, 'nothing to see']),
+])
+def test_batches_without_lexicon_hits_score_neutral(headlines, summaries):
+    result = SentimentScorer().score(headlines, summaries)
+    assert result.scores.tolist() == [0.0] * len(headlines)
+    assert result.codes.tolist() == [0] * len(headlines)
+
+def test_summaries_count_less_than_headlines():
+    result = SentimentScorer(summary_weight=0.5).score(
+        ['Shares surge', 'Shares surge', 'Quiet day'], ['Profit plunges', None, 'Stock rallies'])
+    assert result.labels.tolist() == ['positive', 'positive', 'positive']
+    assert 0 < result.scores[0] < result.scores[1] == 1.0
+
+def test_news_without_lexicon_hits_is_kept():
+    items = [{'headline': 'Apple stock price ahead of September event', 'summary': '', 'datetime': 1_720_000_000}]
+    news = FinnhubNewsSource()._parse_news(items, 10)
+    assert [item.sentiment for item in news] == ['neutral']
+    assert FinnhubNewsSource()._parse_news([], 10)[0].error == 'No price-related news found'
@@ -0,0 +1,32 @@
+"""Tests for the per-symbol time-decayed sentiment aggregates"""
+
+import pytest
+from models import NewsItem
+from sentiment_aggregates import SentimentAggregates, alpha_vantage_scale
+
+NOW = 1_720_000_000
+
+def test_alpha_vantage_scores_map_onto_the_lexicon_scale():
+    assert alpha_vantage_scale(0.0) == 0.0
+    assert alpha_vantage_scale(0.1) < 0.2
+    assert alpha_vantage_scale(-0.15) == pytest.approx(-0.2)
+    assert alpha_vantage_scale(0.35) == alpha_vantage_scale(0.9) == 1.0
+
+def test_providers_share_one_score_scale():
+    aggregates = SentimentAggregates(half_lives=[3600])
+    # Neutral in Alpha Vantage's own bands, so neutral here too
+    aggregates.update('AAPL', NewsItem('a', published=NOW, sentiment='neutral', sentiment_score=0.12,
+                                       relevance_score=0.9, provider='Alpha Vantage'))
+    aggregates.update('AAPL', NewsItem('b', published=NOW, sentiment='neutral', sentiment_score=0.12,
+                                       relevance_score=0.3, provider='Alpha Vantage'))
+    window = aggregates.get('AAPL', now=NOW)['half_lives']['1h']
+    assert window['overall_sentiment'] == 'neutral'
+    assert window['alpha_vantage_score'] == 0.12
+
+    aggregates.update('AAPL', NewsItem('c', published=NOW, sentiment='positive', sentiment_score=1.0,
+                                       provider='Finnhub'))
+    aggregates.update('AAPL', NewsItem('d', published=NOW, sentiment='bullish', sentiment_score=0.4,
+                                       relevance_score=1.0, provider='Alpha Vantage'))
+    trend = aggregates.get('aapl', now=NOW)
+    assert trend['half_lives']['1h']['sentiment_score'] == pytest.approx((2 * 0.16 + 1 + 1) / 4, abs=1e-3)
+    assert (trend['positive_count'], trend['neutral_count'], trend['total_articles']) == (2, 2, 4)
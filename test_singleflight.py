@@ -0,0 +1,48 @@
+"""Tests for coalescing identical in-flight lookups"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from singleflight import SingleFlight
+
+def test_single_flight_coalesces_concurrent_calls():
+    group = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'quote'
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(group.do, 'AAPL', fetch)
+        started.wait(5)
+        followers = [pool.submit(group.do, 'AAPL', fetch) for _ in range(3)]
+        while group.shared < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in [leader, *followers]]
+
+    assert results == ['quote'] * 4
+    assert calls == [1]
+    assert group.stats() == {'executed': 1, 'shared': 3}
+    # Once the call completes the key is free again
+    assert group.do('AAPL', lambda: 'fresh') == 'fresh'
+
+def test_single_flight_coalesces_coroutines():
+    group = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 'news'
+
+    async def main():
+        return await asyncio.gather(*(group.do_async('AAPL', fetch) for _ in range(3)))
+
+    assert asyncio.run(main()) == ['news'] * 3
+    assert calls == [1]
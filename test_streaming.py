@@ -0,0 +1,89 @@
+"""Tests for the real-time trade stream and its tick buffers"""
+
+import asyncio
+import json
+from collections import deque
+import numpy as np
+from streaming import FinnhubStream, TickBuffer, TickStore
+
+def trade_message(symbol: str, *trades) -> str:
+    return json.dumps({'type': 'trade', 'data': [{'s': symbol, 't': t * 1000, 'p': p, 'v': 1} for t, p in trades]})
+
+class FakeConnection:
+    """Replays messages, then stops the stream so run() returns"""
+
+    def __init__(self, stream: FinnhubStream, messages):
+        self.stream = stream
+        self.messages = messages
+        self.sent = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, message: str):
+        self.sent.append(json.loads(message))
+
+    async def __aiter__(self):
+        for message in self.messages:
+            yield message
+        self.stream._stopping.set()
+
+def test_listener_errors_do_not_drop_the_connection():
+    store = TickStore(size=16)
+    failed = []
+
+    def listener(symbol, timestamps, prices, volumes):
+        if not failed:
+            failed.append(symbol)
+            raise RuntimeError('listener failed')
+
+    store.add_listener(listener)
+    connections = []
+
+    def connect(url):
+        connections.append(FakeConnection(stream, [
+            trade_message('AAPL', (1, 10.0)),
+            'not json',
+            trade_message('AAPL', (2, 11.0), (3, 12.0)),
+        ]))
+        return connections[-1]
+
+    stream = FinnhubStream(['aapl'], store=store, api_key='key', connect=connect)
+    asyncio.run(stream.run())
+
+    assert len(connections) == 1
+    assert stream.reconnects == 0
+    assert stream.message_errors == 2
+    assert connections[0].sent == [{'type': 'subscribe', 'symbol': 'AAPL'}]
+    assert store.ticks('AAPL')['price'].tolist() == [10.0, 11.0, 12.0]
+
+def test_tick_buffer_keeps_the_newest_ticks_across_wraparound():
+    buffer = TickBuffer(7)
+    expected = deque(maxlen=7)
+    assert buffer.latest() is None
+    tick = 0
+    # Batches smaller than, equal to and larger than the ring, landing at every offset
+    for n in (1, 3, 5, 7, 2, 9, 4, 16, 6, 1, 1, 13):
+        timestamps = np.arange(tick, tick + n, dtype=float)
+        buffer.extend(timestamps, timestamps * 10, timestamps + 0.5)
+        expected.extend(range(tick, tick + n))
+        tick += n
+
+        timestamps, prices, volumes = buffer.recent()
+        assert timestamps.tolist() == list(expected)
+        assert prices.tolist() == [t * 10 for t in expected]
+        assert volumes.tolist() == [t + 0.5 for t in expected]
+        assert buffer.latest() == (tick - 1, (tick - 1) * 10, tick - 0.5)
+        assert buffer.recent(3)[0].tolist() == list(expected)[-3:]
+    assert buffer.total == tick
+
+def test_tick_store_reads_recent_ticks_without_a_stream():
+    store = TickStore(size=4)
+    store.extend('AAPL', [1.0, 2.0, 3.0, 4.0, 5.0], [10.0, 11.0, 12.0, 13.0, 14.0], [1, 1, 1, 1, 1])
+    assert store.ticks('AAPL')['price'].tolist() == [11.0, 12.0, 13.0, 14.0]
+    assert store.ticks('AAPL', limit=2, since=4.5)['price'].tolist() == [14.0]
+    assert store.latest('AAPL') == (5.0, 14.0, 1.0)
+    assert store.latest('MSFT') is None and store.ticks('MSFT').empty
@@ -0,0 +1,105 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from typing import Dict, Tuple
+from config import Config
+from rate_limit import rate_limiter
+
+# Responses worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# One async client per event loop; httpx clients cannot be shared across loops
+_async_clients = weakref.WeakKeyDictionary()
+
+def get_session(url: str) -> requests.Session:
+    """Get the pooled keep-alive session for the host of `url`"""
+    host = urlsplit(url).netloc
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.HTTP_POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[host] = session
+        return session
+
+def backoff_delay(attempt: int, response=None) -> float:
+    """Seconds to wait before retry `attempt`: Retry-After if given, else full-jitter exponential backoff"""
+    if response is not None:
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return min(float(retry_after), Config.HTTP_BACKOFF_MAX)
+    return random.uniform(0, min(Config.HTTP_BACKOFF_MAX, Config.HTTP_BACKOFF_BASE * 2 ** attempt))
+
+def get(url: str, params: Dict = None, timeout=None, rate_key: Tuple[str, str] = None) -> requests.Response:
+    """GET through the host's pooled session, retrying 429 and 5xx responses with backoff
+    
+    With `rate_key` = (api_key, endpoint) every attempt first takes a token from
+    the shared rate limiter, which raises RateLimitExceeded instead of sending a
+    request that is bound to be throttled.
+    """
+    session = get_session(url)
+    if timeout is None:
+        timeout = (Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_READ_TIMEOUT)
+    
+    attempt = 0
+    while True:
+        if rate_key is not None:
+            rate_limiter.acquire(*rate_key)
+        response = session.get(url, params=params, timeout=timeout)
+        if response.status_code not in RETRY_STATUSES or attempt >= Config.HTTP_MAX_RETRIES:
+            return response
+        time.sleep(backoff_delay(attempt, response))
+        attempt += 1
+
+def close_sessions():
+    """Close all pooled sessions and their connections"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+def get_async_client() -> httpx.AsyncClient:
+    """Get the pooled keep-alive async client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=Config.ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.HTTP_POOL_SIZE
+            ),
+            timeout=httpx.Timeout(Config.HTTP_READ_TIMEOUT, connect=Config.HTTP_CONNECT_TIMEOUT)
+        )
+        _async_clients[loop] = client
+    return client
+
+async def async_get(url: str, params: Dict = None, rate_key: Tuple[str, str] = None) -> httpx.Response:
+    """Async GET through the loop's pooled client, retrying 429 and 5xx responses with backoff"""
+    client = get_async_client()
+    
+    attempt = 0
+    while True:
+        if rate_key is not None:
+            await rate_limiter.acquire_async(*rate_key)
+        response = await client.get(url, params=params)
+        if response.status_code not in RETRY_STATUSES or attempt >= Config.HTTP_MAX_RETRIES:
+            return response
+        await asyncio.sleep(backoff_delay(attempt, response))
+        attempt += 1
+
+async def close_async_client():
+    """Close the running event loop's async client"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -1,11 +1,34 @@
+import os
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from analyzer import StockAnalyzer
 from news_analyzer import NewsAnalyzer
+from cache import default_cache
+from singleflight import single_flight
+from models import Record
+from streaming import configured_stream
+from bar_aggregator import bar_aggregator
+from history_store import bar_records
+from refresher import WatchlistRefresher
+from config import Config
 from datetime import datetime
 
+class RecordJSONProvider(DefaultJSONProvider):
+    """Serialize quote and news records like the dicts they replaced"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, Record):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
 app = Flask(__name__)
+app.json = RecordJSONProvider(app)
 stock_analyzer = StockAnalyzer()
 news_analyzer = NewsAnalyzer()
+stream = configured_stream()
+# Keeps quotes for the watchlist and popular symbols warm, when REFRESHER is enabled
+refresher = WatchlistRefresher(stock_analyzer) if Config.REFRESHER else None
 
 @app.route('/')
 def index():
@@ -16,10 +39,9 @@ def get_quote():
     data = request.json
     symbols = data.get('symbols', [])
     sources = data.get('sources', ['yahoo', 'alphavantage', 'finnhub'])
+    refresh = data.get('refresh', False)
     
-    results = {}
-    for symbol in symbols:
-        results[symbol] = stock_analyzer.get_quote(symbol.upper(), sources=sources)
+    results = stock_analyzer.get_quotes([symbol.upper() for symbol in symbols], sources=sources, refresh=refresh)
     
     return jsonify({
         'results': results,
@@ -31,22 +53,25 @@ def get_news():
     data = request.json
     symbol = data.get('symbol', '').upper()
     limit = data.get('limit', 10)
+    refresh = data.get('refresh', False)
     
     if not symbol:
         return jsonify({'error': 'Symbol is required'}), 400
     
-    # Get aggregated news
-    news = news_analyzer.get_aggregated_news(symbol, limit=limit)
+    # Fetch news once from every provider; the headlines, sentiment and
+    # correlation all come from this snapshot
+    snapshot = news_analyzer.get_snapshot(symbol, limit=limit, refresh=refresh)
+    news = news_analyzer.get_aggregated_news(symbol, limit=limit, snapshot=snapshot)
     
     # Get sentiment analysis
-    sentiment = news_analyzer.analyze_sentiment(symbol)
+    sentiment = news_analyzer.analyze_sentiment(symbol, snapshot=snapshot)
     
     # Get price data for correlation
-    quote = stock_analyzer.get_best_quote(symbol)
+    quote = stock_analyzer.get_best_quote(symbol, refresh=refresh)
     price_change = quote.get('change', 0) if 'error' not in quote else 0
     
     # Get correlation
-    correlation = news_analyzer.correlate_with_price(symbol, price_change)
+    correlation = news_analyzer.correlate_with_price(symbol, price_change, snapshot=snapshot)
     
     return jsonify({
         'symbol': symbol,
@@ -56,6 +81,78 @@ def get_news():
         'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     })
 
+@app.route('/api/sentiment/<symbol>', methods=['GET'])
+def get_sentiment_trend(symbol):
+    return jsonify(news_analyzer.get_sentiment_trend(symbol.upper()))
+
+@app.route('/api/news/search', methods=['GET'])
+def search_news():
+    args = request.args
+    try:
+        result = news_analyzer.search_news(
+            args.get('q'),
+            symbol=args.get('symbol', '').upper() or None,
+            source=args.get('source'),
+            sentiment=args.get('sentiment'),
+            since=args.get('since'),
+            until=args.get('until'),
+            limit=args.get('limit', 20, type=int),
+            order=args.get('order', 'recent')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(result)
+
+@app.route('/api/indicators', methods=['GET'])
+def get_indicators():
+    args = request.args
+    symbols = [symbol for symbol in args.get('symbols', '').split(',') if symbol.strip()]
+    if not symbols:
+        return jsonify({'error': 'Symbols are required'}), 400
+    
+    try:
+        results = stock_analyzer.get_indicators(
+            [symbol.strip() for symbol in symbols],
+            interval=args.get('interval', '1d'),
+            sources=args.get('sources').split(',') if args.get('sources') else None,
+            refresh=args.get('refresh', 'false').lower() == 'true'
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'results': results,
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    })
+
+@app.route('/api/live/<symbol>', methods=['GET'])
+def get_live_trades(symbol):
+    symbol = symbol.upper()
+    # Symbols are streamed from their first request on
+    if stream is not None:
+        stream.subscribe([symbol])
+    return jsonify(stock_analyzer.get_live_trades(symbol, limit=request.args.get('limit', 100, type=int)))
+
+@app.route('/api/live/<symbol>/bars', methods=['GET'])
+def get_live_bars(symbol):
+    symbol = symbol.upper()
+    if stream is not None:
+        stream.subscribe([symbol])
+    interval = request.args.get('interval', '1m')
+    if interval not in bar_aggregator.intervals:
+        return jsonify({'error': f"interval must be one of {', '.join(bar_aggregator.intervals)}"}), 400
+    
+    bars = stock_analyzer.get_live_bars(symbol, interval=interval, limit=request.args.get('limit', 100, type=int))
+    return jsonify({'symbol': symbol, 'interval': interval, 'bars': bar_records(bars)})
+
+@app.route('/api/cache', methods=['GET'])
+def get_cache_stats():
+    stats = {**default_cache.stats(), 'single_flight': single_flight.stats()}
+    if refresher is not None:
+        stats['refresher'] = refresher.stats()
+    return jsonify(stats)
+
 if __name__ == '__main__':
     print("\n" + "="*50)
     print("🚀 Stock Market Dashboard Starting...")
@@ -64,4 +161,13 @@ if __name__ == '__main__':
     print("   http://127.0.0.1:8080")
     print("   or http://localhost:8080")
     print("\n💡 Press Ctrl+C to stop the server\n")
+    # With debug=True the reloader runs this file twice, as a file watcher and
+    # as the server it restarts; only the server starts background threads
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        if stream is not None:
+            bar_aggregator.attach(stream.store)
+            bar_aggregator.start()
+            stream.start()
+        if refresher is not None:
+            refresher.start()
     app.run(debug=True, host='127.0.0.1', port=8080)